@@ -0,0 +1,127 @@
+import os
+import re
+import json
+import time
+import queue
+import logging
+import zipfile
+import threading
+
+from datetime import datetime
+from typing import Optional
+from Utils.logging_setup import current_log_context
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = "artifacts"
+DEFAULT_MAX_TOTAL_BYTES = 200 * 1024 * 1024
+
+
+class ArtifactCapture:
+    """Capture browser state at the moment of a failure and persist it off the automation thread.
+
+    Only the WebDriver calls (page source, URL, window handles, optional screenshot) run on the
+    caller's thread. Compression, disk writes and retention pruning happen on a daemon worker.
+    """
+
+    def __init__(self, base_dir: str = ARTIFACTS_DIR, max_total_bytes: Optional[int] = None,
+                 screenshots: Optional[bool] = None, max_pending: int = 20):
+        self.base_dir = base_dir
+        self.max_total_bytes = max_total_bytes or int(os.getenv("ARTIFACTS_MAX_BYTES", DEFAULT_MAX_TOTAL_BYTES))
+        if screenshots is None:
+            screenshots = os.getenv("ARTIFACTS_SCREENSHOTS", "").lower() in ("1", "true", "yes")
+        self.screenshots = screenshots
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._worker = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._worker.start()
+
+    def capture(self, driver, label: str, reason: str = "") -> bool:
+        """Snapshot the current browser state and queue it for writing. Never raises."""
+        if not driver:
+            return False
+        started = time.monotonic()
+        snapshot = {
+            "label": label,
+            "reason": reason,
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+            "context": current_log_context(),
+        }
+        try:
+            snapshot["url"] = driver.current_url
+            snapshot["window_handles"] = list(driver.window_handles)
+            snapshot["current_window"] = driver.current_window_handle
+            snapshot["title"] = driver.title
+            page_source = driver.page_source
+            screenshot = driver.get_screenshot_as_png() if self.screenshots else None
+        except Exception as e:
+            logger.warning(f"Failed to capture failure artifacts for {label}: {e}")
+            return False
+
+        try:
+            self._queue.put_nowait((snapshot, page_source, screenshot))
+        except queue.Full:
+            logger.warning(f"Artifact writer is backed up, dropping artifacts for {label}")
+            return False
+
+        logger.debug(f"Captured failure artifacts for {label} in {time.monotonic() - started:.2f}s")
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Wait for queued artifacts to be written."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Artifact writer did not drain in time")
+            return
+        self._worker.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                path = self._write(*item)
+                logger.info(f"Failure artifacts saved: {path}")
+                self._enforce_retention()
+            except Exception as e:
+                logger.error(f"Failed to write failure artifacts: {e}")
+
+    def _write(self, snapshot: dict, page_source: str, screenshot: Optional[bytes]) -> str:
+        os.makedirs(self.base_dir, exist_ok=True)
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", snapshot["label"])[:60]
+        file_name = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S_%f')}_{safe_label}.zip"
+        path = os.path.join(self.base_dir, file_name)
+        tmp_path = f"{path}.tmp"
+
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("meta.json", json.dumps(snapshot, indent=2, ensure_ascii=False))
+            archive.writestr("page.html", page_source or "")
+            if screenshot:
+                # PNG data is already compressed
+                archive.writestr("screenshot.png", screenshot, compress_type=zipfile.ZIP_STORED)
+        os.replace(tmp_path, path)
+        return path
+
+    def _enforce_retention(self):
+        """Delete the oldest archives until the directory fits in max_total_bytes."""
+        entries = []
+        for name in os.listdir(self.base_dir):
+            if not name.endswith(".zip"):
+                continue
+            path = os.path.join(self.base_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError as e:
+                logger.warning(f"Failed to prune artifact {path}: {e}")
@@ -0,0 +1,154 @@
+import os
+import logging
+
+from typing import Any, Dict, Optional, Tuple
+from Utils.chrome_profiles import CLONE_PREFIX, GOLDEN_PROFILE_DIR, scratch_root
+
+logger = logging.getLogger(__name__)
+
+# Recycle the browser between orders once any of these is exceeded (0 disables a limit)
+DEFAULT_MAX_RSS_MB = 2500
+DEFAULT_MAX_WINDOW_HANDLES = 4
+DEFAULT_RECYCLE_EVERY_ORDERS = 0
+
+CHROMEDRIVER_NAMES = {"chromedriver", "chromedriver.exe"}
+
+
+def _psutil():
+    """psutil is optional: without it only window handles are watched and orphans are not reaped."""
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+def _driver_pid(driver) -> Optional[int]:
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+class BrowserWatchdog:
+    """Sample the browser's memory and open windows between orders and decide when to recycle it."""
+
+    def __init__(self, max_rss_mb: Optional[int] = None, max_window_handles: Optional[int] = None,
+                 recycle_every_orders: Optional[int] = None):
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else int(os.getenv("CHROME_MAX_RSS_MB", DEFAULT_MAX_RSS_MB))
+        self.max_window_handles = (max_window_handles if max_window_handles is not None
+                                   else int(os.getenv("CHROME_MAX_WINDOW_HANDLES", DEFAULT_MAX_WINDOW_HANDLES)))
+        self.recycle_every_orders = (recycle_every_orders if recycle_every_orders is not None
+                                     else int(os.getenv("CHROME_RECYCLE_EVERY_ORDERS", DEFAULT_RECYCLE_EVERY_ORDERS)))
+        self.orders_since_start = 0
+        self._warned_no_psutil = False
+
+    def sample(self, driver) -> Dict[str, Any]:
+        """RSS of chromedriver plus all Chrome processes under it, and the number of open windows."""
+        sample: Dict[str, Any] = {"rss_mb": None, "processes": 0, "window_handles": None}
+        try:
+            sample["window_handles"] = len(driver.window_handles)
+        except Exception as e:
+            logger.warning(f"Browser did not report its windows: {e}")
+
+        psutil = _psutil()
+        pid = _driver_pid(driver)
+        if psutil is None:
+            if not self._warned_no_psutil:
+                logger.info("psutil not installed; browser memory is not monitored")
+                self._warned_no_psutil = True
+            return sample
+        if pid is None:
+            return sample
+
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return sample
+
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue
+        sample["rss_mb"] = round(rss / (1024 * 1024), 1)
+        sample["processes"] = len(processes)
+        return sample
+
+    def order_finished(self, driver) -> Tuple[bool, str]:
+        """Call at each order boundary. Returns (recycle, reason)."""
+        self.orders_since_start += 1
+        sample = self.sample(driver)
+        logger.debug(f"Browser health: {sample['rss_mb']} MB across {sample['processes']} processes, "
+                     f"{sample['window_handles']} windows")
+
+        if sample["window_handles"] is None:
+            return True, "browser is not responding"
+        if self.max_rss_mb and sample["rss_mb"] is not None and sample["rss_mb"] > self.max_rss_mb:
+            return True, f"memory {sample['rss_mb']} MB exceeds {self.max_rss_mb} MB"
+        if self.max_window_handles and sample["window_handles"] > self.max_window_handles:
+            return True, f"{sample['window_handles']} windows open (limit {self.max_window_handles})"
+        if self.recycle_every_orders and self.orders_since_start >= self.recycle_every_orders:
+            return True, f"scheduled recycle after {self.orders_since_start} orders"
+        return False, ""
+
+    def browser_restarted(self):
+        self.orders_since_start = 0
+
+
+def _is_our_profile(user_data_dir: str) -> bool:
+    """A profile this automation launches Chrome on: the golden chrome-dir or one of its clones."""
+    path = os.path.abspath(user_data_dir)
+    if path == os.path.abspath(GOLDEN_PROFILE_DIR):
+        return True
+    return (os.path.dirname(path) == os.path.abspath(scratch_root())
+            and os.path.basename(path).startswith(CLONE_PREFIX))
+
+
+def _runs_our_profile(processes, psutil) -> bool:
+    for process in processes:
+        try:
+            cmdline = process.cmdline()
+        except psutil.Error:
+            continue
+        for argument in cmdline:
+            if argument.startswith("--user-data-dir=") and _is_our_profile(argument.split("=", 1)[1]):
+                return True
+    return False
+
+
+def reap_orphaned_chromedrivers() -> int:
+    """Kill chromedriver processes (and their Chrome children) left behind by a crashed run of
+    this automation: the Python process that started them is gone and their Chrome runs on our
+    golden profile or one of its clones. Drivers of other users and tools are never touched."""
+    psutil = _psutil()
+    if psutil is None:
+        return 0
+
+    reaped = 0
+    for process in psutil.process_iter(["pid", "name", "ppid"]):
+        try:
+            if (process.info["name"] or "").lower() not in CHROMEDRIVER_NAMES:
+                continue
+            parent_pid = process.info["ppid"]
+            if parent_pid and parent_pid != 1 and psutil.pid_exists(parent_pid):
+                continue
+            children = process.children(recursive=True)
+            if not _runs_our_profile(children, psutil):
+                continue
+            victims = children + [process]
+            for victim in victims:
+                try:
+                    victim.kill()
+                except psutil.Error:
+                    pass
+            psutil.wait_procs(victims, timeout=5)
+            reaped += 1
+        except psutil.Error:
+            continue
+
+    if reaped:
+        logger.info(f"Reaped {reaped} orphaned chromedriver process tree(s)")
+    return reaped
@@ -0,0 +1,117 @@
+import os
+import time
+import shutil
+import logging
+import tempfile
+
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# The golden profile: the long-lived chrome-dir holding the saved logins (opened by init_browser.py)
+GOLDEN_PROFILE_DIR = os.path.join(BASE_DIR, "chrome-dir")
+CLONE_PREFIX = "chrome-profile-"
+
+# Caches, crash dumps and lock files that are rebuilt by Chrome and only slow down copying and startup
+PRUNED_NAMES = {
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "DawnCache",
+    "DawnGraphiteCache", "DawnWebGPUCache", "CacheStorage", "ScriptCache", "Crashpad",
+    "component_crx_cache", "optimization_guide_model_store", "Safe Browsing", "BrowserMetrics",
+    "SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile",
+}
+
+
+def profile_mode() -> str:
+    """'clone' (default) gives each browser its own copy of the golden profile; 'shared' uses it directly."""
+    return os.getenv("CHROME_PROFILE_MODE", "clone").strip().lower()
+
+
+def scratch_root() -> str:
+    """Where clones are created: CHROME_PROFILE_SCRATCH, else tmpfs (/dev/shm) when available, else the temp dir."""
+    configured = os.getenv("CHROME_PROFILE_SCRATCH")
+    if configured:
+        os.makedirs(configured, exist_ok=True)
+        return configured
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _ignore_pruned(directory, names):
+    return [name for name in names if name in PRUNED_NAMES]
+
+
+def _pid_alive(pid: int) -> Optional[bool]:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name != "posix":
+        return None  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_clones(root: Optional[str] = None) -> int:
+    """Delete clones left behind by processes that exited without cleaning up."""
+    root = root or scratch_root()
+    removed = 0
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.startswith(CLONE_PREFIX):
+            continue
+        try:
+            pid = int(entry[len(CLONE_PREFIX):].split("-")[0])
+        except ValueError:
+            continue
+        if pid == os.getpid() or _pid_alive(pid) is not False:
+            continue
+        shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info(f"Removed {removed} stale Chrome profile clone(s) from {root}")
+    return removed
+
+
+def clone_profile(label: str = "browser", golden_dir: str = GOLDEN_PROFILE_DIR) -> Optional[str]:
+    """Copy the golden profile, minus caches, into a fresh scratch directory and return its path."""
+    started = time.monotonic()
+    root = scratch_root()
+    remove_stale_clones(root)
+    clone_dir = tempfile.mkdtemp(prefix=f"{CLONE_PREFIX}{os.getpid()}-{label}-", dir=root)
+
+    if not os.path.isdir(golden_dir):
+        logger.warning(f"Golden profile not found at {golden_dir}; starting from an empty profile")
+        return clone_dir
+
+    try:
+        shutil.copytree(golden_dir, clone_dir, ignore=_ignore_pruned, symlinks=True, dirs_exist_ok=True)
+    except shutil.Error as e:
+        # Files locked by a Chrome that has the golden profile open are skipped; the rest is usable
+        logger.warning(f"Some golden profile files could not be copied ({len(e.args[0])} skipped)")
+    except OSError as e:
+        logger.error(f"Failed to clone Chrome profile: {e}")
+        shutil.rmtree(clone_dir, ignore_errors=True)
+        return None
+
+    logger.info(f"Cloned Chrome profile to {clone_dir} in {time.monotonic() - started:.2f}s")
+    return clone_dir
+
+
+def release_profile(clone_dir: Optional[str]):
+    """Delete a clone once its browser has quit. The golden profile is never removed."""
+    if not clone_dir or os.path.abspath(clone_dir) == os.path.abspath(GOLDEN_PROFILE_DIR):
+        return
+    if not os.path.basename(clone_dir).startswith(CLONE_PREFIX):
+        return
+    shutil.rmtree(clone_dir, ignore_errors=True)
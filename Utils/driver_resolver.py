@@ -0,0 +1,151 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import subprocess
+
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DRIVER_CACHE_DIR = os.path.join(BASE_DIR, "drivers")
+DRIVER_PIN_FILE = os.path.join(DRIVER_CACHE_DIR, "chromedriver_pin.json")
+
+# Where Chrome usually lives when it is not on PATH
+CHROME_BINARY_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+]
+
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+
+def _major(version: Optional[str]) -> Optional[str]:
+    return version.split(".")[0] if version else None
+
+
+def _binary_version(binary: str) -> Optional[str]:
+    """Run `<binary> --version` and extract the dotted version number."""
+    try:
+        output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output or "")
+    return match.group(0) if match else None
+
+
+def _windows_registry_chrome_version() -> Optional[str]:
+    try:
+        import winreg
+    except ImportError:
+        return None
+    for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+        try:
+            with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                return winreg.QueryValueEx(key, "version")[0]
+        except OSError:
+            continue
+    return None
+
+
+def installed_chrome_version() -> Optional[str]:
+    """Version of the locally installed Chrome, found without any network access."""
+    version = _windows_registry_chrome_version()
+    if version:
+        return version
+
+    # chrome.exe --version prints nothing on Windows, so this is for macOS/Linux and CHROME_BINARY
+    candidates = [os.getenv("CHROME_BINARY")] + CHROME_BINARY_CANDIDATES
+    for binary in filter(None, candidates):
+        if os.path.isabs(binary) and not os.path.exists(binary):
+            continue
+        if not os.path.isabs(binary) and not shutil.which(binary):
+            continue
+        version = _binary_version(binary)
+        if version:
+            return version
+    return None
+
+
+def _read_pin() -> dict:
+    try:
+        with open(DRIVER_PIN_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_pin(pin: dict):
+    os.makedirs(DRIVER_CACHE_DIR, exist_ok=True)
+    temp_path = DRIVER_PIN_FILE + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(pin, f, indent=2)
+    os.replace(temp_path, DRIVER_PIN_FILE)
+
+
+def _download_and_pin(chrome_version: Optional[str]) -> Optional[str]:
+    """Fetch a matching chromedriver once through webdriver_manager and copy it into the local cache."""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        logger.error("No cached chromedriver matches Chrome and webdriver_manager is not installed")
+        return None
+
+    downloaded = ChromeDriverManager().install()
+    driver_version = _binary_version(downloaded)
+    major = _major(driver_version) or _major(chrome_version) or "unknown"
+    target_dir = os.path.join(DRIVER_CACHE_DIR, major)
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, os.path.basename(downloaded))
+    shutil.copy2(downloaded, target)
+
+    _write_pin({
+        "driver_path": target,
+        "driver_version": driver_version,
+        "chrome_version": chrome_version,
+        "pinned_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    logger.info(f"Pinned chromedriver {driver_version} for Chrome {chrome_version} at {target}")
+    return target
+
+
+def resolve_chromedriver() -> Optional[str]:
+    """Path to a chromedriver matching the installed Chrome, resolved locally whenever possible.
+
+    Order: CHROMEDRIVER_PATH, then the pinned binary in Utils/drivers when its major version
+    matches Chrome (no network), and only on a miss a one-time download that is pinned for
+    later starts.
+    """
+    started = time.monotonic()
+
+    override = os.getenv("CHROMEDRIVER_PATH")
+    if override:
+        if os.path.exists(override):
+            return override
+        logger.warning(f"CHROMEDRIVER_PATH does not exist: {override}")
+
+    chrome_version = installed_chrome_version()
+    pin = _read_pin()
+    pinned_path = pin.get("driver_path")
+    if pinned_path and os.path.exists(pinned_path):
+        pinned_major = _major(pin.get("driver_version"))
+        if chrome_version is None or pinned_major == _major(chrome_version):
+            logger.info(f"Using pinned chromedriver {pin.get('driver_version')} "
+                        f"(Chrome {chrome_version or 'version unknown'}, resolved in {time.monotonic() - started:.2f}s)")
+            return pinned_path
+        logger.info(f"Pinned chromedriver {pin.get('driver_version')} does not match Chrome {chrome_version}, re-pinning")
+
+    try:
+        return _download_and_pin(chrome_version)
+    except Exception as e:
+        logger.error(f"Failed to download chromedriver: {e}")
+        # A mismatched driver may still start; better than no driver at all
+        return pinned_path if pinned_path and os.path.exists(pinned_path) else None
@@ -1,18 +1,22 @@
 import re
 import os
-import csv
 import time
 import logging
 
 from dotenv import load_dotenv
+from selenium.common.exceptions import StaleElementReferenceException
 from courses import AvailableCourses
-from selenium.webdriver.common.by import By
-from typing import Optional, Tuple, List, Dict, Any
+from reference_data import ReferenceDataError, get_reference_data
+from orders import Order, list_row_kind, parse_order, parse_order_link
+from Utils import locators
+from Utils.macros import ScriptMacro
+from Utils.instructors import InstructorMatchError, select_instructor
+from typing import Optional, List, Dict, Any, Iterator
 from Utils.utils import (
-    input_element, select_by_text,
+    input_element, select_by_text, select_option,
     move_to_element, get_element_text,
     click_element_by_js, safe_navigate_to_url,
-    check_element_exists,
+    check_element_exists, SAFE_PROFILE,
 )
 
 
@@ -29,6 +33,11 @@ REQUIRED_ENV_VARS = [
     "SHOP_CPR_USERNAME", "SHOP_CPR_PASSWORD", "SHOP_CPR_SECURITY_ID"
 ]
 
+TC_PRODUCT_ORDERS_URL = "https://www.enrollware.com/admin/tc-product-order-list-tc.aspx"
+ECARDS_INVENTORY_URL = "https://ecards.heart.org/inventory"
+# Upper bound on order list pages walked per scan
+MAX_ORDER_LIST_PAGES = int(os.getenv("ORDER_LIST_MAX_PAGES", 50))
+
 def validate_environment_variables() -> bool:
     """Validate that all required environment variables are set."""
     missing_vars = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
@@ -42,6 +51,8 @@ def get_available_courses():
     """Get available courses instance with error handling."""
     try:
         return AvailableCourses()
+    except ReferenceDataError:
+        raise  # Malformed course data must stop the automation, not degrade it
     except Exception as e:
         logger.error(f"Failed to initialize AvailableCourses: {e}")
         return None
@@ -62,23 +73,23 @@ def login_to_enrollware_and_navigate_to_tc_product_orders(driver, max_retries: i
             time.sleep(5)
 
             # Check if already logged in
-            validation_button = check_element_exists(driver, (By.ID, "loginButton"), timeout=5)
+            validation_button = check_element_exists(driver, locators.ENROLLWARE_LOGIN_BUTTON, timeout=5)
 
             if validation_button:
                 # Input credentials with validation
-                if not input_element(driver, (By.ID, "username"), os.getenv("ENROLLWARE_USERNAME")):
+                if not input_element(driver, locators.ENROLLWARE_USERNAME, os.getenv("ENROLLWARE_USERNAME")):
                     logger.error("Failed to input username")
                     continue
 
-                if not input_element(driver, (By.ID, "password"), os.getenv("ENROLLWARE_PASSWORD")):
+                if not input_element(driver, locators.ENROLLWARE_PASSWORD, os.getenv("ENROLLWARE_PASSWORD")):
                     logger.error("Failed to input password")
                     continue
 
                 # Optional remember me checkbox
-                click_element_by_js(driver, (By.ID, "rememberMe"))
+                click_element_by_js(driver, locators.ENROLLWARE_REMEMBER_ME)
                 time.sleep(1)
 
-                if not click_element_by_js(driver, (By.ID, "loginButton")):
+                if not click_element_by_js(driver, locators.ENROLLWARE_LOGIN_BUTTON):
                     logger.error("Failed to click login button")
                     continue
 
@@ -107,8 +118,7 @@ def login_to_enrollware_and_navigate_to_tc_product_orders(driver, max_retries: i
 def navigate_to_tc_product_orders(driver) -> bool | None:
     """Navigate to TC Product Orders with error handling."""
     try:
-        url = "https://www.enrollware.com/admin/tc-product-order-list-tc.aspx"
-        if safe_navigate_to_url(driver, url):
+        if safe_navigate_to_url(driver, TC_PRODUCT_ORDERS_URL):
             logger.info("Successfully navigated to TC Product Orders")
             return True
     except Exception as e:
@@ -118,7 +128,7 @@ def navigate_to_tc_product_orders(driver) -> bool | None:
 
 def login_to_ecards(driver, username=os.getenv("ATLAS_USERNAME"), password=os.getenv("ATLAS_PASSWORD")) -> bool:
     """Login to eCards with comprehensive error handling and retry logic."""
-    other_account = check_element_exists(driver, (By.XPATH, "//label[text()= 'Training Site']"), timeout=3)
+    other_account = check_element_exists(driver, locators.ECARDS_OTHER_ACCOUNT_LABEL, timeout=3)
     if other_account:
         logout_from_aha(driver)
     if not validate_environment_variables():
@@ -129,11 +139,11 @@ def login_to_ecards(driver, username=os.getenv("ATLAS_USERNAME"), password=os.ge
             return True
 
         # Check for sign-in button
-        sign_in_button = check_element_exists(driver, (By.XPATH, "(//button[text()= 'Sign In | Sign Up'])[1]"), timeout=3)
+        sign_in_button = check_element_exists(driver, locators.ECARDS_SIGN_IN_BUTTON, timeout=3)
 
 
         if sign_in_button:
-            if not click_element_by_js(driver, (By.XPATH, "(//button[text()= 'Sign In | Sign Up'])[1]")):
+            if not click_element_by_js(driver, locators.ECARDS_SIGN_IN_BUTTON):
                 return False
 
             time.sleep(3)
@@ -143,13 +153,13 @@ def login_to_ecards(driver, username=os.getenv("ATLAS_USERNAME"), password=os.ge
                 return True
 
         # Proceed with login if email field exists
-        if check_element_exists(driver, (By.ID, "Email"), timeout=5):
-            if not input_element(driver, (By.ID, "Email"), username):
+        if check_element_exists(driver, locators.SSO_EMAIL, timeout=5):
+            if not input_element(driver, locators.SSO_EMAIL, username):
                 return False
 
             time.sleep(1)
 
-            if not input_element(driver, (By.ID, "Password"), password):
+            if not input_element(driver, locators.SSO_PASSWORD, password):
                 return False
 
             time.sleep(1)
@@ -162,7 +172,7 @@ def login_to_ecards(driver, username=os.getenv("ATLAS_USERNAME"), password=os.ge
             # time.sleep(1)
 
             # Click sign-in button
-            if not click_element_by_js(driver, (By.ID, "btnSignIn")):
+            if not click_element_by_js(driver, locators.SSO_SIGN_IN):
                 return False
 
             time.sleep(5)
@@ -180,128 +190,182 @@ def login_to_ecards(driver, username=os.getenv("ATLAS_USERNAME"), password=os.ge
         return False
 
 
-def get_indexes_to_process(driver, condition) -> List[int]:
-    """Get valid row indexes to process with comprehensive error handling."""
-    valid_indexes = []
-    
-    try:
-        # Wait for table to load
-        if not check_element_exists(driver, (By.XPATH, "//tbody/tr"), timeout=10):
-            logger.warning("No table rows found")
-            return valid_indexes
+def read_order_list_page(driver) -> List[Dict[str, Any]]:
+    """Reference each open order on the order list page the browser is showing, in table order.
 
-        # Find all rows inside the table
-        rows = driver.find_elements(By.XPATH, "//tbody/tr")
+    Each reference holds the order ID, the detail page URL (when the link is a plain URL),
+    the row index at scan time and its kind ("aha" or "redcross"), so processors can open the
+    order directly instead of clicking a row position that shifts once others are completed.
+    """
+    orders = []
+    if not check_element_exists(driver, locators.ORDER_LIST_ROWS, timeout=10):
+        logger.warning("No table rows found")
+        return orders
 
-        for i, row in enumerate(rows, start=1):  # start=1 for 1-based index
-            try:
-                # Get text from columns safely
-                td2_element = row.find_elements(By.XPATH, ".//td[2]")
-                td2 = td2_element[0].text.strip().lower() if td2_element else ""
+    # Find all rows inside the table
+    rows = driver.find_elements(*locators.ORDER_LIST_ROWS)
+
+    for i, row in enumerate(rows, start=1):  # start=1 for 1-based index
+        try:
+            # Get text from columns safely
+            td2_element = row.find_elements(*locators.ORDER_ROW_CELL(column=2))
+            td2 = td2_element[0].text.strip().lower() if td2_element else ""
 
-                td4_element = row.find_elements(By.XPATH, ".//td[4]")
-                td4 = td4_element[0].text.strip().lower() if td4_element else ""
+            td4_element = row.find_elements(*locators.ORDER_ROW_CELL(column=4))
+            td4 = td4_element[0].text.strip().lower() if td4_element else ""
 
-                if condition == "redcross":
-                    # Inclusion conditions for Red Cross
-                    if "redcross" not in td2 and "red cross" not in td2:
-                        continue
+            kind = list_row_kind(td2, td4)
+            if kind is None:
+                continue
 
-                    if "complete" in td4 or "cancelled" in td4:
-                        continue
+            # The pager row has no order link
+            link_element = row.find_elements(*locators.ORDER_ROW_LINK)
+            if not link_element:
+                continue
+            td1_element = row.find_elements(*locators.ORDER_ROW_CELL(column=1))
+            row_key = td1_element[0].text.strip() if td1_element else ""
+            order_ref = parse_order_link(link_element[0].get_attribute("href") or "", row_key)
+            order_ref["index"] = i
+            order_ref["kind"] = kind
+            orders.append(order_ref)
 
-                elif condition == "non-redcross":
-                    # Exclusion conditions
-                    if "redcross" in td2 or "red cross" in td2:
-                        continue
+        except:
+            continue
 
-                    if "complete" in td4 or "cancelled" in td4:
-                        continue
+    return orders
 
-                else:
-                    logger.error(f"Unknown condition: {condition}")
-                    return valid_indexes
 
-                # If not excluded, keep index
-                valid_indexes.append(i)
+def _open_next_order_list_page(driver, page: int) -> bool:
+    """Click the pager link after `page` and wait for the table to be replaced."""
+    links = driver.find_elements(*locators.ORDER_LIST_PAGE_LINK(page=str(page + 1)))
+    if not links:
+        # Past the last numbered link of this group of pages
+        links = driver.find_elements(*locators.ORDER_LIST_MORE_PAGES_LINK)
+    if not links:
+        return False
+
+    first_row = driver.find_elements(*locators.ORDER_LIST_ROWS)[:1]
+    links[0].click()
+    deadline = time.time() + 15
+    while first_row and time.time() < deadline:
+        try:
+            first_row[0].tag_name  # raises once the postback has replaced the table
+        except StaleElementReferenceException:
+            return True
+        time.sleep(0.25)
+    logger.warning(f"Order list page {page + 1} did not load")
+    return False
+
 
-            except:
+def scan_order_pages(driver, max_pages: int = MAX_ORDER_LIST_PAGES) -> Iterator[Dict[str, Any]]:
+    """Walk every page of the TC Product Orders list in the browser, yielding each open order once.
+
+    Starts from the page the browser is on (the first page after login) and leaves the browser
+    on the last page read.
+    """
+    seen = set()
+    for page in range(1, max_pages + 1):
+        new_on_page = 0
+        for order_ref in read_order_list_page(driver):
+            key = order_ref["order_id"] or order_ref["row_key"]
+            if key in seen:
                 continue
+            seen.add(key)
+            new_on_page += 1
+            yield order_ref
+        if page > 1 and not new_on_page:
+            return
+        if not _open_next_order_list_page(driver, page):
+            return
+    logger.warning(f"Order list has more than {max_pages} pages; the rest is read next cycle")
+
 
-        return valid_indexes
+def get_orders_to_process(driver, condition) -> List[Dict[str, Any]]:
+    """Scan every page of the TC Product Orders list and return a reference for each
+    Red Cross ("redcross") or AHA ("non-redcross") order to process."""
+    if condition not in ("redcross", "non-redcross"):
+        logger.error(f"Unknown condition: {condition}")
+        return []
 
+    try:
+        return [order_ref for order_ref in scan_order_pages(driver)
+                if (order_ref["kind"] == "redcross") == (condition == "redcross")]
     except Exception as e:
-        logger.error(f"Error getting indexes to process: {e}")
-        return valid_indexes
+        logger.error(f"Error getting orders to process: {e}")
+        return []
 
 
-def create_xpath(title: str) -> str:
-    """Create XPath for order data extraction with validation."""
-    if not title:
-        logger.warning("Empty title provided for XPath creation")
-        return ""
-    return f"//label[text()= '{title}:']/parent::div/following-sibling::div"
+def navigate_to_order(driver, order_ref: Dict[str, Any]) -> bool:
+    """Open an order's detail page by URL, falling back to locating its row by order ID."""
+    try:
+        if order_ref.get("detail_url"):
+            if safe_navigate_to_url(driver, order_ref["detail_url"]):
+                return True
+            logger.warning(f"Direct navigation failed for order {order_ref.get('order_id')}, locating row in list")
 
+        # Postback links have no URL: find the row by its ID, never by position
+        if driver.current_url.split('?')[0].lower() != TC_PRODUCT_ORDERS_URL.lower():
+            if not safe_navigate_to_url(driver, TC_PRODUCT_ORDERS_URL):
+                return False
 
-def get_order_data(driver) -> Tuple[List[Dict[str, Any]], int]:
-    """Get order data with comprehensive error handling and validation."""
-    try:
-        order_data = []
+        order_id = order_ref.get("order_id", "")
+        if order_ref.get("href_id"):
+            link_locator = locators.ORDER_LINK_BY_HREF(order_id=order_id)
+        else:
+            link_locator = locators.ORDER_LINK_BY_ROW_KEY(row_key=order_ref.get('row_key', ''))
+        # The order may be on a later page of the list
+        check_element_exists(driver, locators.ORDER_LIST_ROWS, timeout=10)
+        for page in range(1, MAX_ORDER_LIST_PAGES + 1):
+            if driver.find_elements(*link_locator):
+                return click_element_by_js(driver, link_locator)
+            if not _open_next_order_list_page(driver, page):
+                break
+        logger.error(f"Order {order_id} not found in TC Product Orders list")
+        return False
+
+    except Exception as e:
+        logger.error(f"Failed to open order {order_ref.get('order_id')}: {e}")
+        return False
 
+
+def get_order_data(driver, order_id: str = "") -> Optional[Order]:
+    """Read the open order detail page into a classified Order, or None if it has no product lines."""
+    try:
         # Get training site
-        training_site_xpath = create_xpath('Training Site')
-        training_site = get_element_text(driver, (By.XPATH, training_site_xpath), default="Unknown").strip()
+        training_site = get_element_text(driver, locators.ORDER_DETAIL_FIELD(label='Training Site:'), default="Unknown").strip()
 
         # Get name/address
-        name_xpath = create_xpath('Name/Address')
-        name = get_element_text(driver, (By.XPATH, name_xpath), default="Unknown")
+        name = get_element_text(driver, locators.ORDER_DETAIL_FIELD(label='Name/Address:'), default="Unknown")
         name = name.split('\n')[0].strip() if "\n" in name else name.strip()
 
         # Get number of orders
-        products_xpath = f"{create_xpath('Products')}//tr"
-        product_rows = driver.find_elements(By.XPATH, products_xpath)
+        product_rows = driver.find_elements(*locators.ORDER_PRODUCT_ROWS)
         num_of_orders = max(0, len(product_rows) - 1)  # Subtract header row
 
         if num_of_orders == 0:
-            return [], 0
+            return None
 
         # Get order details
-        quantity_elements = driver.find_elements(By.XPATH, f"{create_xpath('Products')}//td[1]")
-        product_code_elements = driver.find_elements(By.XPATH, f"{create_xpath('Products')}//td[2]")
-        course_name_elements = driver.find_elements(By.XPATH, f"{create_xpath('Products')}//td[3]")
+        quantity_elements = driver.find_elements(*locators.ORDER_PRODUCT_CELLS(column=1))
+        product_code_elements = driver.find_elements(*locators.ORDER_PRODUCT_CELLS(column=2))
+        course_name_elements = driver.find_elements(*locators.ORDER_PRODUCT_CELLS(column=3))
 
         # Validate element counts
-        min_count = min(len(quantity_elements), len(product_code_elements), len(course_name_elements))
-        if min_count < num_of_orders:
-            num_of_orders = min_count
+        num_of_orders = min(num_of_orders, len(quantity_elements), len(product_code_elements), len(course_name_elements))
 
-        # Extract order data
+        rows = []
         for i in range(num_of_orders):
             try:
-                quantity = quantity_elements[i].text.strip() if i < len(quantity_elements) else ""
-                product_code = product_code_elements[i].text.strip() if i < len(product_code_elements) else ""
-                course_name = course_name_elements[i].text.strip() if i < len(course_name_elements) else ""
-
-                # Validate required fields
-                if not all([quantity, product_code, course_name]):
-                    continue
-
-                order_data.append({
-                    "training_site": training_site,
-                    "name": name,
-                    "quantity": quantity,
-                    "product_code": product_code,
-                    "course_name": course_name
-                })
-
-            except Exception as e:
+                rows.append((quantity_elements[i].text.strip(), product_code_elements[i].text.strip(),
+                             course_name_elements[i].text.strip()))
+            except Exception:
                 continue
 
-        return order_data, len(order_data)
+        return parse_order(order_id, training_site, name, rows, available_courses)
 
     except Exception as e:
         logger.error(f"Critical error in get_order_data: {e}")
-        return [], 0
+        return None
 
 
 def mark_order_as_complete(driver, max_retries: int = 3) -> bool:
@@ -309,33 +373,33 @@ def mark_order_as_complete(driver, max_retries: int = 3) -> bool:
     for attempt in range(max_retries):
         try:
             # Select 'Complete' status
-            if not select_by_text(driver, (By.ID, "mainContent_status"), 'Complete'):
+            if not select_by_text(driver, locators.ORDER_STATUS_SELECT, 'Complete'):
                 logger.error("Failed to select 'Complete' status")
                 continue
 
             # Click status update button
-            if not click_element_by_js(driver, (By.ID, "mainContent_statusUpdateBtn")):
+            if not click_element_by_js(driver, locators.ORDER_STATUS_UPDATE_BUTTON):
                 logger.error("Failed to click status update button")
                 continue
 
             time.sleep(2)
 
             # Click email button
-            if not click_element_by_js(driver, (By.ID, "mainContent_emailBtn")):
+            if not click_element_by_js(driver, locators.ORDER_EMAIL_BUTTON):
                 logger.error("Failed to click email button")
                 continue
 
             time.sleep(1)
 
             # Click send button
-            if not click_element_by_js(driver, (By.ID, "mainContent_sendButton")):
+            if not click_element_by_js(driver, locators.ORDER_SEND_BUTTON):
                 logger.error("Failed to click send button")
                 continue
 
             time.sleep(1)
 
             # Click back button
-            if not click_element_by_js(driver, (By.ID, "mainContent_backButton")):
+            if not click_element_by_js(driver, locators.ORDER_BACK_BUTTON):
                 logger.error("Failed to click back button")
                 continue
 
@@ -352,53 +416,6 @@ def mark_order_as_complete(driver, max_retries: int = 3) -> bool:
     return False
 
 
-def go_back(driver, max_retries: int = 3) -> bool:
-    """Go back by closing tabs with comprehensive error handling."""
-    for attempt in range(max_retries):
-        try:
-            initial_handles = len(driver.window_handles)
-
-            if initial_handles > 1:
-                # Close current tab
-                driver.close()
-                time.sleep(1)
-
-                # Switch to the last remaining window
-                remaining_handles = driver.window_handles
-                if remaining_handles:
-                    driver.switch_to.window(remaining_handles[-1])
-                    time.sleep(1)
-
-                    # If still multiple tabs, close one more
-                    if len(remaining_handles) > 1:
-                        driver.close()
-                        time.sleep(1)
-
-                        # Switch to the first window
-                        final_handles = driver.window_handles
-                        if final_handles:
-                            driver.switch_to.window(final_handles[0])
-                            time.sleep(1)
-
-                    logger.info("Successfully navigated back by closing tabs")
-                    return True
-                else:
-                    logger.error("No window handles remaining after closing")
-                    return False
-            else:
-                logger.info("Only one window handle, no need to go back")
-                return True
-
-        except Exception as e:
-            logger.error(f"Go back attempt {attempt + 1} failed: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2)
-                continue
-
-    logger.error("Failed to go back after all attempts")
-    return False
-
-
 def assign_to_instructor(driver, name: str, quantity: str, product_code: str, max_retries: int = 3) -> bool:
     """Assign to instructor with comprehensive error handling."""
     if not available_courses:
@@ -408,86 +425,79 @@ def assign_to_instructor(driver, name: str, quantity: str, product_code: str, ma
     for attempt in range(max_retries):
         try:
             # Click on the course
-            available_course_selector = f"//td[contains(text(), '{product_code}')]/preceding-sibling::td[@role='button']"
-            if not click_element_by_js(driver, (By.XPATH, available_course_selector)):
+            available_course_selector = locators.INVENTORY_COURSE_BUTTON(product_code=product_code)
+            if not click_element_by_js(driver, available_course_selector):
                 continue
 
             time.sleep(1)
 
             # Click 'Assign to Instructor'
-            if not click_element_by_js(driver, (By.XPATH, "//div/a[contains(text(), 'Assign to Instructor')]")):
+            if not click_element_by_js(driver, locators.INVENTORY_ASSIGN_TO_INSTRUCTOR):
                 continue
 
             time.sleep(2)
 
-            # Select TC Admin role
-            if not select_by_text(driver, (By.ID, "RoleId"), 'TC Admin'):
-                continue
-
-            time.sleep(1)
-
-            # Select course
             course_name_on_ecard = available_courses.course_name_on_eCard(product_code)
             if not course_name_on_ecard:
                 logger.error(f"Course name not found for product code: {product_code}")
                 continue
 
-            if not select_by_text(driver, (By.ID, "CourseId"), course_name_on_ecard):
-                continue
-
-            time.sleep(1)
-
-            # Select training center
-            if not select_by_text(driver, (By.ID, "ddlTC"), 'Shell CPR, LLC.'):
+            # Select TC Admin role, course and training center in one round trip
+            selection = (ScriptMacro("instructor assignment selections")
+                         .select(locators.ASSIGN_ROLE_SELECT, 'TC Admin')
+                         .select(locators.ASSIGN_COURSE_SELECT, course_name_on_ecard)
+                         .select(locators.ASSIGN_TC_SELECT, 'Shell CPR, LLC.')
+                         .run(driver))
+            if not selection.ok:
+                logger.error(selection.describe())
                 continue
 
-            time.sleep(1)
-
             # Click assign to dropdown
-            if not click_element_by_js(driver, (By.XPATH, "//select[@id= 'assignTo']/following-sibling::div/button")):
+            if not click_element_by_js(driver, locators.ASSIGN_TO_DROPDOWN_BUTTON):
                 continue
 
             time.sleep(1)
 
             # Select instructor by name
-            instructor_name = format_name(name)
-            instructor_xpath = f"(//label[contains(text(), '{instructor_name}')])[1]"
-            if not click_element_by_js(driver, (By.XPATH, instructor_xpath)):
+            if not select_instructor(driver, name, ('TC Admin', course_name_on_ecard, 'Shell CPR, LLC.')):
                 continue
 
             time.sleep(1)
 
             # Click move next
-            if not click_element_by_js(driver, (By.ID, "btnMoveNext")):
+            if not click_element_by_js(driver, locators.ASSIGN_MOVE_NEXT):
                 continue
 
             time.sleep(1)
 
             # Input quantity
-            if not input_element(driver, (By.ID, "qty1"), str(quantity)):
+            if not input_element(driver, locators.ASSIGN_QUANTITY, str(quantity)):
                 continue
 
             time.sleep(1)
 
             # Click confirm
-            if not click_element_by_js(driver, (By.ID, "btnConfirm")):
+            if not click_element_by_js(driver, locators.ASSIGN_CONFIRM):
                 continue
 
             time.sleep(1)
 
             # Click complete
-            if not click_element_by_js(driver, (By.ID, "btnComplete")):
+            if not click_element_by_js(driver, locators.ASSIGN_COMPLETE):
                 continue
 
             time.sleep(1)
 
             # Go to inventory
-            if not click_element_by_js(driver, (By.XPATH, "//a[text()= 'Go To Inventory']")):
+            if not click_element_by_js(driver, locators.GO_TO_INVENTORY):
                 continue
 
             logger.info(f"Successfully assigned {quantity} of {product_code} ({'Individual' if available_courses.is_individual_course(product_code) else 'Bundle'}) to instructor {name}")
             return True
 
+        except InstructorMatchError:
+            # Retrying cannot fix the name; the line is left for review
+            raise
         except Exception as e:
             if attempt < max_retries - 1:
                 time.sleep(3)
@@ -510,59 +520,53 @@ def assign_to_training_center(driver, name: str, quantity: str, product_code: st
     for attempt in range(max_retries):
         try:
             # Click on the course
-            available_course_selector = f"//td[contains(text(), '{product_code}')]/preceding-sibling::td[@role='button']"
-            if not click_element_by_js(driver, (By.XPATH, available_course_selector)):
+            available_course_selector = locators.INVENTORY_COURSE_BUTTON(product_code=product_code)
+            if not click_element_by_js(driver, available_course_selector):
                 continue
 
             time.sleep(1)
 
             # Click 'Assign to Training Site'
-            if not click_element_by_js(driver, (By.XPATH, "//div/a[contains(text(), 'Assign to Training Site')]")):
+            if not click_element_by_js(driver, locators.INVENTORY_ASSIGN_TO_TRAINING_SITE):
                 continue
 
             time.sleep(2)
 
             # Select training center
-            if not select_by_text(driver, (By.ID, "tcId"), 'Shell CPR, LLC.'):
+            if not select_option(driver, locators.SITE_ASSIGN_TC_SELECT, 'Shell CPR, LLC.'):
                 continue
 
-            time.sleep(1)
-
             # Select training site
-            if not select_by_text(driver, (By.ID, "tsList"), training_site):
+            if not select_option(driver, locators.SITE_ASSIGN_SITE_SELECT, training_site):
                 continue
 
-            time.sleep(1)
-
             # Select course
             course_name_on_ecard = available_courses.course_name_on_eCard(product_code)
             if not course_name_on_ecard:
                 logger.error(f"Course name not found for product code: {product_code}")
                 continue
 
-            if not select_by_text(driver, (By.ID, "courseId"), course_name_on_ecard):
+            if not select_option(driver, locators.SITE_ASSIGN_COURSE_SELECT, course_name_on_ecard):
                 continue
 
-            time.sleep(1)
-
             # Input quantity
-            if not input_element(driver, (By.ID, "qty"), str(quantity)):
+            if not input_element(driver, locators.SITE_ASSIGN_QUANTITY, str(quantity)):
                 continue
 
             # Click validate
-            if not click_element_by_js(driver, (By.ID, "btnValidate")):
+            if not click_element_by_js(driver, locators.SITE_ASSIGN_VALIDATE):
                 continue
 
             time.sleep(1)
 
             # Click complete
-            if not click_element_by_js(driver, (By.ID, "btnComplete")):
+            if not click_element_by_js(driver, locators.ASSIGN_COMPLETE):
                 continue
 
             time.sleep(1)
 
             # Go to inventory
-            if not click_element_by_js(driver, (By.XPATH, "//a[text()= 'Go To Inventory']")):
+            if not click_element_by_js(driver, locators.GO_TO_INVENTORY):
                 continue
 
             if training_site != 'Code Blue CPR Services, LLC':
@@ -572,14 +576,14 @@ def assign_to_training_center(driver, name: str, quantity: str, product_code: st
             safe_navigate_to_url(driver, "https://ecards.heart.org/inventory")
             login_to_ecards(driver, username=os.getenv("AHA_NEW_USERNAME"), password=os.getenv("AHA_NEW_PASSWORD"))
 
-            if not click_element_by_js(driver, (By.XPATH, available_course_selector)):
+            if not click_element_by_js(driver, available_course_selector):
                 continue
 
             # Click 'Assign to Instructor'
-            if not click_element_by_js(driver, (By.XPATH, "//div/a[contains(text(), 'Assign to Instructor')]")):
+            if not click_element_by_js(driver, locators.INVENTORY_ASSIGN_TO_INSTRUCTOR):
                 continue
 
-            if not select_by_text(driver, (By.ID, "RoleId"), 'TSC'):
+            if not select_option(driver, locators.ASSIGN_ROLE_SELECT, 'TSC'):
                 logger.error("Failed to select TS Admin")
                 continue
 
@@ -589,61 +593,55 @@ def assign_to_training_center(driver, name: str, quantity: str, product_code: st
                 logger.error(f"Course name not found for product code: {product_code}")
                 continue
 
-            if not select_by_text(driver, (By.ID, "CourseId"), course_name_on_ecard):
-                    continue
+            if not select_option(driver, locators.ASSIGN_COURSE_SELECT, course_name_on_ecard):
+                continue
 
             # Select training center
-            if not select_by_text(driver, (By.ID, "ddlTC"), 'Shell CPR, LLC.'):
+            if not select_option(driver, locators.ASSIGN_TC_SELECT, 'Shell CPR, LLC.'):
                 continue
 
-            time.sleep(1)
-
             # Select training site
-            if not select_by_text(driver, (By.ID, "ddlSite"), training_site):
+            if not select_option(driver, locators.ASSIGN_SITE_SELECT, training_site):
                 continue
 
-            time.sleep(1)
-
             # Click assign to dropdown
-            if not click_element_by_js(driver, (By.XPATH, "//select[@id= 'assignTo']/following-sibling::div/button")):
+            if not click_element_by_js(driver, locators.ASSIGN_TO_DROPDOWN_BUTTON):
                 continue
 
             time.sleep(1)
 
             # Select instructor by name
-            instructor_name = format_name(name)
-            instructor_xpath = f"(//label[contains(text(), '{instructor_name}')])[1]"
-            if not click_element_by_js(driver, (By.XPATH, instructor_xpath)):
+            if not select_instructor(driver, name, ('TSC', course_name_on_ecard, 'Shell CPR, LLC.', training_site)):
                 continue
 
             time.sleep(1)
 
             # Click move next
-            if not click_element_by_js(driver, (By.ID, "btnMoveNext")):
+            if not click_element_by_js(driver, locators.ASSIGN_MOVE_NEXT):
                 continue
 
             time.sleep(1)
 
             # Input quantity
-            if not input_element(driver, (By.ID, "qty1"), str(quantity)):
+            if not input_element(driver, locators.ASSIGN_QUANTITY, str(quantity)):
                 continue
 
             time.sleep(1)
 
             # Click confirm
-            if not click_element_by_js(driver, (By.ID, "btnConfirm")):
+            if not click_element_by_js(driver, locators.ASSIGN_CONFIRM):
                 continue
 
             time.sleep(1)
 
             # Click complete
-            if not click_element_by_js(driver, (By.ID, "btnComplete")):
+            if not click_element_by_js(driver, locators.ASSIGN_COMPLETE):
                 continue
 
             time.sleep(1)
 
             # Go to inventory
-            if not click_element_by_js(driver, (By.XPATH, "//a[text()= 'Go To Inventory']")):
+            if not click_element_by_js(driver, locators.GO_TO_INVENTORY):
                 continue
 
             logout_from_aha(driver)
@@ -652,6 +650,9 @@ def assign_to_training_center(driver, name: str, quantity: str, product_code: st
             logger.info(f"Successfully assigned {quantity} of {product_code} ({'Individual' if available_courses.is_individual_course(product_code) else 'Bundle'}) to training site {training_site}")
             return True
 
+        except InstructorMatchError:
+            # Retrying cannot fix the name; the line is left for review
+            raise
         except Exception as e:
             if attempt < max_retries - 1:
                 time.sleep(3)
@@ -663,58 +664,64 @@ def assign_to_training_center(driver, name: str, quantity: str, product_code: st
 
 def logout_from_aha(driver):
     try:
-        click_element_by_js(driver, (By.XPATH, "//img[@id= 'profileImg']/parent::button"))
-        click_element_by_js(driver, (By.ID, "logoutId"))
+        click_element_by_js(driver, locators.ECARDS_PROFILE_BUTTON)
+        click_element_by_js(driver, locators.ECARDS_LOGOUT_ID)
         time.sleep(1)
-        header_username = (By.XPATH, "//span[contains(@class, 'Header_userName')]/ancestor::button")
+        header_username = locators.ECARDS_HEADER_USERNAME
         ele = check_element_exists(driver, header_username)
         if not ele:
             return
         move_to_element(driver, header_username)
-        click_element_by_js(driver, (By.XPATH, "//a[text()= 'Logout']"))
+        click_element_by_js(driver, locators.ECARDS_LOGOUT_LINK)
     except Exception as e:
         logger.error(f"Error during logout from AHA: {e}")
 
 
 def get_training_site_name(code: str) -> Optional[str]:
-    """Get training site name from CSV with comprehensive error handling."""
+    """Get training site name for a site code from the reference data bundle."""
     if not code:
         logger.warning("Empty code provided for training site lookup")
         return None
 
-    csv_path = os.path.join('data', 'training_sites.csv')
-
-    try:
-        if not os.path.exists(csv_path):
-            logger.error(f"Training sites CSV file not found: {csv_path}")
-            return None
+    training_site_name = get_reference_data()["sites"].get(code.strip())
+    if not training_site_name:
+        logger.warning(f"Training site code not found: {code}")
+        return None
+    logger.debug(f"Found training site: {code} -> {training_site_name}")
+    return training_site_name
 
-        with open(csv_path, 'r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
 
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 because of header
-                try:
-                    if row.get('Code', '').strip() == code.strip():
-                        training_site_name = row.get('Text', '').strip()
-                        if training_site_name:
-                            logger.info(f"Found training site: {code} -> {training_site_name}")
-                            return training_site_name
-                        else:
-                            logger.warning(f"Empty training site name for code: {code}")
-                            return None
-                except Exception as e:
-                    logger.error(f"Error processing CSV row {row_num}: {e}")
+def get_inventory_snapshot(driver) -> Dict[str, int]:
+    """Read available quantity per product code from the eCards inventory page in one call."""
+    try:
+        if not check_element_exists(driver, locators.INVENTORY_ROWS, timeout=10):
+            logger.warning("eCards inventory table not found")
+            return {}
+
+        # Each inventory row has the available quantity in the cell just before the product code
+        rows = driver.execute_script("""
+            return Array.from(document.querySelectorAll('tbody tr')).map(
+                tr => Array.from(tr.querySelectorAll('td')).map(td => td.innerText.trim()));
+        """) or []
+
+        inventory = {}
+        for cells in rows:
+            for position, text in enumerate(cells):
+                match = re.search(r"\b\d{2}-\d{4}\b", text)
+                if not match or position == 0:
                     continue
+                quantity_text = cells[position - 1].replace(',', '')
+                if quantity_text.isdigit():
+                    sku = match.group(0)
+                    inventory[sku] = inventory.get(sku, 0) + int(quantity_text)
+                break
 
-        logger.warning(f"Training site code not found: {code}")
-        return None
+        logger.info(f"Inventory snapshot: {len(inventory)} products in stock")
+        return inventory
 
-    except FileNotFoundError:
-        logger.error(f"Training sites CSV file not found: {csv_path}")
-        return None
     except Exception as e:
-        logger.error(f"Error reading training sites CSV: {e}")
-        return None
+        logger.error(f"Failed to read eCards inventory snapshot: {e}")
+        return {}
 
 
 def login_to_shop_cpr(driver, max_retries: int = 3) -> bool:
@@ -736,12 +743,12 @@ def login_to_shop_cpr(driver, max_retries: int = 3) -> bool:
             time.sleep(5)
 
             # Check if already logged in
-            sign_in_btn = check_element_exists(driver, (By.XPATH, "//a[contains(@href, 'login')]"), timeout=5)
+            sign_in_btn = check_element_exists(driver, locators.SHOPCPR_SIGN_IN_LINK, timeout=5)
 
             if sign_in_btn:
                 logger.info("Logging into ShopCPR")
 
-                if not click_element_by_js(driver, (By.XPATH, "//a[contains(@href, 'login')]")):
+                if not click_element_by_js(driver, locators.SHOPCPR_SIGN_IN_LINK):
                     logger.error("Failed to click sign-in link")
                     continue
 
@@ -752,26 +759,26 @@ def login_to_shop_cpr(driver, max_retries: int = 3) -> bool:
                     return True
 
                 # Input credentials
-                if not input_element(driver, (By.ID, "Email"), os.getenv("SHOP_CPR_USERNAME")):
+                if not input_element(driver, locators.SSO_EMAIL, os.getenv("SHOP_CPR_USERNAME")):
                     logger.error("Failed to input ShopCPR email")
                     continue
 
                 time.sleep(1)
 
-                if not input_element(driver, (By.ID, "Password"), os.getenv("SHOP_CPR_PASSWORD")):
+                if not input_element(driver, locators.SSO_PASSWORD, os.getenv("SHOP_CPR_PASSWORD")):
                     logger.error("Failed to input ShopCPR password")
                     continue
 
                 time.sleep(1)
 
-                if not click_element_by_js(driver, (By.ID, "btnSignIn")):
+                if not click_element_by_js(driver, locators.SSO_SIGN_IN):
                     logger.error("Failed to click ShopCPR sign-in button")
                     continue
 
                 time.sleep(3)
 
                 # Verify login success
-                if shop_cpr_url == driver.current_url.lower() or not check_element_exists(driver, (By.XPATH, "//a[contains(@href, 'login')]"), timeout=3):
+                if shop_cpr_url == driver.current_url.lower() or not check_element_exists(driver, locators.SHOPCPR_SIGN_IN_LINK, timeout=3):
                     logger.info("Successfully logged into ShopCPR")
                     return True
                 else:
@@ -794,10 +801,10 @@ def login_to_shop_cpr(driver, max_retries: int = 3) -> bool:
 def checkout_popup_handling(driver) -> bool:
     """Handle checkout popup with error handling."""
     try:
-        popup = check_element_exists(driver, (By.XPATH, "//div[@id= 'org-form']"), timeout=5)
+        popup = check_element_exists(driver, locators.SHOPCPR_ORG_POPUP, timeout=5)
         if popup:
             logger.info("Handling checkout popup")
-            if click_element_by_js(driver, (By.XPATH, "//button[text()= 'Continue']")):
+            if click_element_by_js(driver, locators.SHOPCPR_POPUP_CONTINUE):
                 time.sleep(2)
                 logger.info("Successfully handled checkout popup")
                 return True
@@ -820,7 +827,7 @@ def clear_cart_on_shop_cpr(driver, max_retries: int = 2) -> bool:
     for attempt in range(max_retries):
         try:
             # Check if cart is empty
-            cart_count = get_element_text(driver, (By.CLASS_NAME, "scpr-cartcount"), timeout=3)
+            cart_count = get_element_text(driver, locators.SHOPCPR_CART_COUNT, timeout=3)
             cart_count = cart_count.replace("(", "").replace(")", "").strip() if "(" in cart_count else cart_count.strip()
             logger.info(f"Cart: {cart_count}")
             if int(cart_count) == 0:
@@ -829,19 +836,19 @@ def clear_cart_on_shop_cpr(driver, max_retries: int = 2) -> bool:
 
 
             # Navigate to cart
-            if not click_element_by_js(driver, (By.ID, "aha-showcart")):
+            if not click_element_by_js(driver, locators.SHOPCPR_SHOW_CART):
                 logger.error("Failed to click show cart")
                 continue
 
             time.sleep(2)
 
             # Click delete buttons
-            delete_buttons = driver.find_elements(By.XPATH, "//a[contains(@id, 'delete-item')]")
+            delete_buttons = driver.find_elements(*locators.SHOPCPR_CART_DELETE_BUTTONS)
             for btn in delete_buttons:
                 try:
                     btn.click()
                     time.sleep(1)
-                    click_element_by_js(driver, (By.ID, "remove-product"))
+                    click_element_by_js(driver, locators.SHOPCPR_CART_REMOVE_CONFIRM)
                     time.sleep(1)
                 except Exception as e:
                     logger.error(f"Failed to click delete button: {e}")
@@ -850,7 +857,7 @@ def clear_cart_on_shop_cpr(driver, max_retries: int = 2) -> bool:
             time.sleep(2)
 
             # Verify cart is empty
-            empty_cart_msg = check_element_exists(driver, (By.XPATH, "//p[contains(text(), 'You have no items in your shopping cart.')]"), timeout=5)
+            empty_cart_msg = check_element_exists(driver, locators.SHOPCPR_CART_EMPTY_MESSAGE, timeout=5)
             if empty_cart_msg:
                 logger.info("Successfully cleared the cart")
                 return True
@@ -873,6 +880,8 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
         return False
 
     is_individual = available_courses.is_individual_course(product_code) if available_courses else False
+    search_text, via_details = (available_courses.shopcpr_search(product_code) if available_courses
+                                else (product_code, not is_individual))
 
     try:
         # Login to ShopCPR
@@ -886,74 +895,73 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
             return False
 
         # Navigate to Course Cards
-        if not click_element_by_js(driver, (By.XPATH, "//span[text()= 'Course Cards']/parent::a")):
+        if not click_element_by_js(driver, locators.SHOPCPR_MENU_COURSE_CARDS):
             logger.error("Failed to click Course Cards")
             return False
 
         time.sleep(1)
 
         # Navigate to Heartsaver Bundles
-        if not click_element_by_js(driver, (By.XPATH, "//span[text()= 'Heartsaver Bundles']/parent::a")):
+        if not click_element_by_js(driver, locators.SHOPCPR_MENU_HEARTSAVER_BUNDLES):
             logger.error("Failed to click Heartsaver Bundles")
             return False
 
         time.sleep(1)
 
         # check if the results are displaying if not then clear the site cookies and refresh the page
-        product_elements = "(//div[@data-container= 'product-list'])[1]"
-        if not check_element_exists(driver, (By.XPATH, product_elements), timeout=5):
+        if not check_element_exists(driver, locators.SHOPCPR_PRODUCT_LIST, timeout=5):
             driver.delete_all_cookies()
             driver.refresh()
             time.sleep(5)
-            if not check_element_exists(driver, (By.XPATH, product_elements), timeout=5):
+            if not check_element_exists(driver, locators.SHOPCPR_PRODUCT_LIST, timeout=5):
                 logger.error("Failed to load Course Cards page after clearing cookies")
                 return False
 
         # Click search button
-        if not click_element_by_js(driver, (By.XPATH, "//button[@title= 'Search Product']")):
+        if not click_element_by_js(driver, locators.SHOPCPR_SEARCH_TOGGLE):
             logger.error("Failed to click search button")
             return False
 
         time.sleep(1)
 
         # Search for product
-        if not input_element(driver, (By.XPATH, "//input[@id= 'searchtext']"), product_code):
+        if not input_element(driver, locators.SHOPCPR_SEARCH_INPUT, search_text):
             logger.error("Failed to input product code for search")
             return False
 
         time.sleep(1)
 
-        if not click_element_by_js(driver, (By.XPATH, "//button[@id= 'btnsearch']")):
+        if not click_element_by_js(driver, locators.SHOPCPR_SEARCH_SUBMIT):
             logger.error("Failed to click search button")
             return False
 
         time.sleep(2)
 
-        if not is_individual:
-            if not click_element_by_js(driver, (By.XPATH, "//a[@title= 'View Details']")):
+        if via_details:
+            if not click_element_by_js(driver, locators.SHOPCPR_VIEW_DETAILS):
                 logger.error("Failed to click View Details for bundle")
                 return False
 
             time.sleep(2)
 
-            if not click_element_by_js(driver, (By.XPATH, "//button[@id= 'bundle-slide']")):
+            if not click_element_by_js(driver, locators.SHOPCPR_BUNDLE_SLIDE):
                 logger.error("Failed to click Add to Cart for bundle")
                 return False
 
 
         time.sleep(1)
 
-        if not click_element_by_js(driver, (By.XPATH, "//a[contains(@id, 'title-quick-view')]")):
+        if not click_element_by_js(driver, locators.SHOPCPR_QUICK_VIEW):
             logger.error("Failed to add to cart")
             return False
 
         # Input quantity
-        if not input_element(driver, (By.CSS_SELECTOR, "input[id=qty]"), str(quantity_to_order)):
+        if not input_element(driver, locators.SHOPCPR_QUANTITY, str(quantity_to_order)):
             logger.error("Failed to input quantity")
             return False
 
         # Add to cart
-        if not click_element_by_js(driver, (By.CSS_SELECTOR, "button[id=product-addtocart-button]")):
+        if not click_element_by_js(driver, locators.SHOPCPR_ADD_TO_CART):
             logger.error("Failed to add to cart")
             return False
 
@@ -961,15 +969,15 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
         time.sleep(5)
 
         # Show cart
-        if not check_element_exists(driver, (By.ID, "minicart-content-wrapper"), timeout=5):
-            if not click_element_by_js(driver, (By.XPATH, "//a[@id= 'aha-showcart']")):
+        if not check_element_exists(driver, locators.SHOPCPR_MINICART, timeout=5):
+            if not click_element_by_js(driver, locators.SHOPCPR_SHOW_CART):
                 logger.error("Failed to show cart")
                 return False
 
         time.sleep(2)
 
         # Checkout
-        if not click_element_by_js(driver, (By.ID, "top-cart-btn-checkout")):
+        if not click_element_by_js(driver, locators.SHOPCPR_CHECKOUT):
             logger.error("Failed to click checkout")
             return False
 
@@ -980,60 +988,60 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
         time.sleep(1)
 
         # check if the item can't be buyed
-        if check_element_exists(driver, (By.XPATH, "//span[contains(text(), 'requires attention')]"), timeout=5):
+        if check_element_exists(driver, locators.SHOPCPR_REQUIRES_ATTENTION, timeout=5):
             logger.error(f"Product {product_code} is not available for purchase")
             return False
 
         # Input security ID
         security_id = os.getenv("SHOP_CPR_SECURITY_ID")
-        if not input_element(driver, (By.XPATH, "//input[@id= 'sid']"), security_id):
+        if not input_element(driver, locators.SHOPCPR_SECURITY_ID, security_id):
             logger.error("Failed to input security ID")
             return False
 
         time.sleep(1)
 
         # Proceed to checkout
-        if not click_element_by_js(driver, (By.ID, "proceed-checkout")):
+        if not click_element_by_js(driver, locators.SHOPCPR_PROCEED_CHECKOUT):
             logger.error("Failed to proceed to checkout")
             return False
 
         time.sleep(2)
 
         if not is_individual: # If the order is a bundle
-            if not click_element_by_js(driver, (By.ID, "taxStatus")):
+            if not click_element_by_js(driver, locators.SHOPCPR_TAX_STATUS):
                 logger.error("Failed to click purchase code")
                 return False
 
             time.sleep(1)
             training_site_name = get_training_site_name(product_code)
-            is_training_site_availabel = check_element_exists(driver, (By.XPATH, f"//a[contains(text(), '{training_site_name}')]"))
+            is_training_site_availabel = check_element_exists(driver, locators.SHOPCPR_PURCHASE_CODE_LINK(text=training_site_name))
 
             if is_training_site_availabel:
-                if not click_element_by_js(driver, (By.XPATH, f"//a[contains(text(), '{training_site_name}')]")):
+                if not click_element_by_js(driver, locators.SHOPCPR_PURCHASE_CODE_LINK(text=training_site_name)):
                     logger.error("Failed to select training site")
                     return False
             else:
-                if not click_element_by_js(driver, (By.XPATH, "//a[contains(text(), '3SLHD-619865-Shell CPR')]")):
+                if not click_element_by_js(driver, locators.SHOPCPR_PURCHASE_CODE_LINK(text='3SLHD-619865-Shell CPR')):
                     logger.error("Failed to select purchase code")
                     return False
 
             time.sleep(1)
 
-            if not click_element_by_js(driver, (By.ID, "purchase-continue-btn")):
+            if not click_element_by_js(driver, locators.SHOPCPR_PURCHASE_CONTINUE):
                 logger.error("Failed to apply purchase code")
                 return False
 
             time.sleep(1)
 
         # Input PO number
-        if not input_element(driver, (By.ID, "po_number"), name):
+        if not input_element(driver, locators.SHOPCPR_PO_NUMBER, name):
             logger.error("Failed to input PO number")
             return False
 
         time.sleep(1)
 
-        # Proceed to payment
-        if not click_element_by_js(driver, (By.XPATH, "//button[text()= 'Proceed to Payment']")):
+        # Proceed to payment (paced like a person: this submits the order)
+        if not click_element_by_js(driver, locators.SHOPCPR_PROCEED_TO_PAYMENT, profile=SAFE_PROFILE):
             logger.error("Failed to proceed to payment")
             return False
 
@@ -1042,7 +1050,6 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
         # Check order confirmation
         if "orderconfirmation" in driver.current_url:
             logger.info(f"Successfully purchased {quantity_to_order} of {product_code} eCards for {name}")
-            safe_navigate_to_url(driver, "https://ecards.heart.org/inventory")
             return True
         else:
             logger.error(f"Purchase failed - not on confirmation page. Current URL: {driver.current_url}")
@@ -1053,8 +1060,14 @@ def make_purchase_on_shop_cpr(driver, product_code: str, quantity_to_order: int,
         return False
 
 
-def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: str, max_retries: int = 2) -> bool:
-    """Assign to Admin Instructor - For ACLS/PALS courses."""
+def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: str, max_retries: int = 2,
+                               batch: bool = False) -> bool:
+    """Assign to Admin Instructor - For ACLS/PALS courses.
+
+    In a batch (several assignments back to back) the role, Training Center and Training Site
+    are only selected when the form does not already show them, and the assignment ends on the
+    completion page instead of going back to the inventory.
+    """
     if not available_courses:
         logger.error("Available courses not initialized")
         return False
@@ -1064,77 +1077,57 @@ def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: s
     for attempt in range(max_retries):
         try:
             # Step 1: Move to manage eCards
-            manage_eCard_selector = "//a[contains(@id, 'accessible-megamenu')]"
-            if not move_to_element(driver, (By.XPATH, manage_eCard_selector)):
+            if not move_to_element(driver, locators.MANAGE_ECARDS_MENU):
                 logger.error("Failed to hover over manage eCards menu")
                 continue
 
             time.sleep(1)
 
             # Step 2: Click 'Assign to Instructors'
-            if not click_element_by_js(driver, (By.XPATH, "//a[text()= 'Assign to Instructors']")):
+            if not click_element_by_js(driver, locators.MENU_ASSIGN_TO_INSTRUCTORS):
                 logger.error("Failed to click 'Assign to Instructors'")
                 continue
 
             time.sleep(2)
 
-            # Step 3: Select TS Admin role
-            if not select_by_text(driver, (By.ID, "RoleId"), 'TS Admin'):
-                logger.error("Failed to select TS Admin")
-                continue
-
-            time.sleep(1)
-
-            # Step 4: Select course
             course_name_on_ecard = available_courses.course_name_on_eCard(product_code)
             if not course_name_on_ecard:
                 logger.error(f"Course name not found for product code: {product_code}")
                 continue
 
-            if not select_by_text(driver, (By.ID, "CourseId"), course_name_on_ecard):
-                logger.error("Failed to select course for Admin Instructor")
-                continue
-
-            time.sleep(1)
-
-            # Step 5: Select Training Center
-            if not select_by_text(driver, (By.ID, "ddlTC"), 'CPR Suppliers, LLC'):
-                logger.error("Failed to select Training Center")
+            # Steps 3-6: Select TS Admin role, course, Training Center and Training Site in one round trip
+            selection = (ScriptMacro("admin instructor selections")
+                         .select(locators.ASSIGN_ROLE_SELECT, 'TS Admin', keep=batch)
+                         .select(locators.ASSIGN_COURSE_SELECT, course_name_on_ecard)
+                         .select(locators.ASSIGN_TC_SELECT, 'CPR Suppliers, LLC', keep=batch)
+                         .select(locators.ASSIGN_SITE_SELECT, 'Shell CPR', keep=batch)
+                         .run(driver))
+            if not selection.ok:
+                logger.error(selection.describe())
                 continue
 
-            time.sleep(1)
-
-            # Step 6: Select Training Site
-            if not select_by_text(driver, (By.ID, "ddlSite"), 'Shell CPR'):
-                logger.error("Failed to select Training Site")
-                continue
-
-            time.sleep(1)
-
             # Step 7: Select Instructor
-            if not click_element_by_js(driver, (By.XPATH, "//select[@id= 'assignTo']/following-sibling::div/button")):
+            if not click_element_by_js(driver, locators.ASSIGN_TO_DROPDOWN_BUTTON):
                 logger.error("Failed to open instructor dropdown")
                 continue
 
             time.sleep(1)
 
-            instructor_name = format_name(name)
-            instructor_xpath = f"(//label[contains(text(), '{instructor_name}')])[1]"
-            if not click_element_by_js(driver, (By.XPATH, instructor_xpath)):
+            if not select_instructor(driver, name, ('TS Admin', course_name_on_ecard, 'CPR Suppliers, LLC', 'Shell CPR')):
                 logger.error(f"Failed to select instructor: {name}")
                 continue
 
             time.sleep(1)
 
             # Step 8: Click Submit button
-            if not click_element_by_js(driver, (By.ID, "btnMoveNext")):
+            if not click_element_by_js(driver, locators.ASSIGN_MOVE_NEXT):
                 logger.error("Failed to click Submit button")
                 continue
 
             time.sleep(1)
 
             # Check available quantity
-            available_qyt_element = get_element_text(driver, (By.ID, "tdAvailQty"), default="0")
+            available_qyt_element = get_element_text(driver, locators.ASSIGN_AVAILABLE_QUANTITY, default="0")
             available_qyt = int(available_qyt_element) if available_qyt_element.isdigit() else 0
 
             if available_qyt < int(quantity):
@@ -1143,7 +1136,7 @@ def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: s
                 # Navigate back to inventory without retrying
                 try:
                     # Try to go back to inventory directly
-                    if click_element_by_js(driver, (By.XPATH, "//a[text()= 'Go To Inventory']")):
+                    if click_element_by_js(driver, locators.GO_TO_INVENTORY):
                         logger.info("Successfully returned to inventory due to insufficient quantity")
                     else:
                         # Alternative method: try to navigate back via browser back
@@ -1156,34 +1149,37 @@ def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: s
                 return False  # Return False but don't retry
 
             # Input quantity
-            if not input_element(driver, (By.ID, "qty1"), str(quantity)):
+            if not input_element(driver, locators.ASSIGN_QUANTITY, str(quantity)):
                 logger.error("Failed to input quantity")
                 continue
 
             time.sleep(1)
 
             # Click confirm
-            if not click_element_by_js(driver, (By.ID, "btnConfirm")):
+            if not click_element_by_js(driver, locators.ASSIGN_CONFIRM):
                 logger.error("Failed to confirm assignment")
                 continue
 
             time.sleep(1)
 
             # Click complete
-            if not click_element_by_js(driver, (By.ID, "btnComplete")):
+            if not click_element_by_js(driver, locators.ASSIGN_COMPLETE):
                 logger.error("Failed to complete assignment")
                 continue
 
             time.sleep(1)
 
-            # Go to inventory
-            if not click_element_by_js(driver, (By.XPATH, "//a[text()= 'Go To Inventory']")):
+            # Go to inventory (a batch goes straight on to the next assignment from the menu)
+            if not batch and not click_element_by_js(driver, locators.GO_TO_INVENTORY):
                 logger.error("Failed to return to inventory")
                 continue
 
             logger.info(f"Successfully assigned {quantity} of {product_code} (ACLS/PALS) to Admin Instructor for {name}")
             return True
 
+        except InstructorMatchError:
+            # Retrying cannot fix the name; the line is left for review
+            raise
         except Exception as e:
             logger.error(f"Admin Instructor assignment attempt {attempt + 1} failed: {e}")
 
@@ -1200,42 +1196,15 @@ def assign_to_admin_instructor(driver, name: str, quantity: str, product_code: s
     return False
 
 
-def add_error_log(driver, error_txt: str):
+def add_error_log(driver, error_txt: str) -> bool:
     """Add error log to error_logs.txt with timestamp."""
     try:
-        comment_already_exists = check_element_exists(driver,
-                                                      (By.XPATH, f'''//td[contains(text(), "{error_txt}")]'''))
+        comment_already_exists = check_element_exists(driver, locators.ORDER_COMMENT_WITH_TEXT(text=error_txt))
         if not comment_already_exists:
-            input_element(driver, (By.ID, "mainContent_addEntryTxt"), error_txt)
-            click_element_by_js(driver, (By.ID, "mainContent_entrySubBtn"))
+            if not input_element(driver, locators.ORDER_COMMENT_INPUT, error_txt):
+                return False
+            return click_element_by_js(driver, locators.ORDER_COMMENT_SUBMIT)
+        return True
     except Exception as e:
         logger.error(f"Failed to write to error log: {e}")
-
-
-def format_name(name: str) -> str:
-    """Format a full name with smart title casing (handles Mc, Mac, O', and hyphens)."""
-
-    def smart_cap(word: str) -> str:
-        # NEW: Handle hyphenated names (e.g., Abdul-Majied, Anne-Marie)
-        # We split the word by the hyphen, process each part individually, and rejoin.
-        if "-" in word:
-            return "-".join(smart_cap(part) for part in word.split("-"))
-
-        # --- Existing Logic Below ---
-        w = word.lower().capitalize()
-
-        # Handle O' prefix (e.g., O'Neil, O'Connor)
-        if re.match(r"^o'[a-z]", w.lower()):
-            return "O'" + w[2:].capitalize()
-
-        # Handle Mc prefix (e.g., McKinney, McDonald)
-        if w.lower().startswith("mc") and len(w) > 2:
-            return "Mc" + w[2].upper() + w[3:]
-
-        # Handle Mac prefix (e.g., MacArthur, MacGregor)
-        if w.lower().startswith("mac") and len(w) > 3:
-            return "Mac" + w[3].upper() + w[4:]
-
-        return w
-
-    return " ".join(smart_cap(word) for word in name.split())
+        return False
@@ -0,0 +1,173 @@
+import re
+import time
+import bisect
+import difflib
+import logging
+import unicodedata
+
+from typing import Dict, List, Optional, Tuple
+from Utils import locators
+from Utils.utils import click_element_by_js
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy matches must be at least this similar (difflib ratio) and clearly ahead of the runner-up
+FUZZY_CUTOFF = 0.88
+FUZZY_MARGIN = 0.04
+
+# Option (value, text) pairs of the "assign to" select, once it has been filled for the selected course and TC/site
+READ_OPTIONS_JS = """
+const select = document.getElementById(arguments[0]);
+if (!select) return null;
+return Array.from(select.options).filter(o => o.value).map(o => [o.value, o.text.trim()]);
+"""
+
+# Directories per browser session and assignment form (role, course, training center, training site)
+_directories: Dict[Tuple[str, Tuple[str, ...]], "InstructorDirectory"] = {}
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case, accent-free, punctuation-free form of a person's name; "Last, First" becomes
+    "first last". Hyphens and apostrophes only separate or join words (O'Neil -> oneil)."""
+    if name.count(",") == 1:
+        last, first = name.split(",")
+        name = f"{first} {last}"
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char)).lower()
+    name = re.sub(r"['’.]", "", name)
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", name).split())
+
+
+# Only these tiers pick an instructor on their own; an eCard assignment cannot be undone
+AUTO_ASSIGN_TIERS = ("exact", "word order")
+
+# Whether the live "assign to" select still offers this option value
+HAS_OPTION_JS = """
+const select = document.getElementById(arguments[0]);
+return !!select && Array.from(select.options).some(o => o.value === arguments[1]);
+"""
+
+
+class InstructorMatchError(LookupError):
+    """The instructor cannot be picked safely (unknown, ambiguous or only a near match); the line
+    is left for a human instead of assigning eCards to someone who may be the wrong person."""
+
+
+class InstructorDirectory:
+    """The options of the eCards "assign to" dropdown, indexed by normalized name.
+
+    lookup() tries, in order: the exact name, the same words in another order, options starting
+    with or containing the name, and close spellings. Only the first two are trusted by match();
+    the others are suggestions for a human to confirm.
+    """
+
+    def __init__(self, options: List[Tuple[str, str]]):
+        self.options = options
+        self._by_name: Dict[str, List[Tuple[str, str]]] = {}
+        self._by_words: Dict[Tuple[str, ...], List[Tuple[str, str]]] = {}
+        for value, text in options:
+            key = normalize_name(text)
+            if not key:
+                continue
+            self._by_name.setdefault(key, []).append((value, text))
+            self._by_words.setdefault(tuple(sorted(key.split())), []).append((value, text))
+        self._names = sorted(self._by_name)
+
+    def __len__(self) -> int:
+        return len(self.options)
+
+    def lookup(self, name: str) -> Tuple[List[Tuple[str, str]], str]:
+        """The (option value, option text) candidates of the first tier that has any, and that
+        tier's name; ([], "") if nothing comes close."""
+        key = normalize_name(name)
+        if not key:
+            return [], ""
+        for tier, candidates in (("exact", lambda: self._by_name.get(key, [])),
+                                 ("word order", lambda: self._by_words.get(tuple(sorted(key.split())), [])),
+                                 ("prefix", lambda: self._prefixed(key)),
+                                 ("contains", lambda: self._containing(key)),
+                                 ("fuzzy", lambda: self._close(key))):
+            found = candidates()
+            if found:
+                return found, tier
+        return [], ""
+
+    def match(self, name: str) -> Optional[Tuple[str, str]]:
+        """The one option that is this instructor by exact name or word order, else None."""
+        candidates, tier = self.lookup(name)
+        return candidates[0] if tier in AUTO_ASSIGN_TIERS and len(candidates) == 1 else None
+
+    def _prefixed(self, key: str) -> List[Tuple[str, str]]:
+        # Names are sorted, so every name starting with key follows it directly
+        found = []
+        for candidate in self._names[bisect.bisect_left(self._names, key):]:
+            if not candidate.startswith(key):
+                break
+            if len(candidate) > len(key) and candidate[len(key)] == " ":
+                found.extend(self._by_name[candidate])
+        return found
+
+    def _containing(self, key: str) -> List[Tuple[str, str]]:
+        # Option texts may carry more than the name, e.g. an ID or e-mail after it
+        padded = f" {key} "
+        return [option for candidate in self._names if padded in f" {candidate} "
+                for option in self._by_name[candidate]]
+
+    def _close(self, key: str) -> List[Tuple[str, str]]:
+        scored = sorted(((difflib.SequenceMatcher(None, key, candidate).ratio(), candidate)
+                         for candidate in self._names), reverse=True)[:2]
+        if not scored or scored[0][0] < FUZZY_CUTOFF:
+            return []
+        if len(scored) > 1 and scored[0][0] - scored[1][0] < FUZZY_MARGIN:
+            return [option for _, candidate in scored for option in self._by_name[candidate]]
+        return self._by_name[scored[0][1]]
+
+
+def read_directory(driver, timeout: float = 10) -> InstructorDirectory:
+    """Scrape the "assign to" options in one script call, waiting for them to be filled in."""
+    deadline = time.time() + timeout
+    while True:
+        options = driver.execute_script(READ_OPTIONS_JS, locators.ASSIGN_TO_SELECT.value) or []
+        if options or time.time() >= deadline:
+            return InstructorDirectory([(str(value), text) for value, text in options])
+        time.sleep(0.25)
+
+
+def instructor_directory(driver, form: Tuple[str, ...], refresh: bool = False) -> InstructorDirectory:
+    """The directory for this assignment form, scraped on first use in this browser session."""
+    key = (driver.session_id, form)
+    directory = _directories.get(key)
+    if directory is None or refresh:
+        directory = read_directory(driver)
+        # A restarted browser is a new session; its predecessor's directories are dropped
+        for stale in [other for other in _directories if other[0] != driver.session_id]:
+            del _directories[stale]
+        _directories[key] = directory
+        logger.info(f"Read {len(directory)} instructors for {' / '.join(form)}")
+    return directory
+
+
+def select_instructor(driver, name: str, form: Tuple[str, ...]) -> bool:
+    """Tick the instructor in the open "assign to" dropdown by option value.
+
+    form names the role, course, training center and training site selected above it, which
+    decide the options. Unless the cached directory gives one trusted match whose value the page
+    still offers, the options are read again first. Raises InstructorMatchError, without waiting
+    on the page, when the name is unknown, ambiguous or only a near match.
+    """
+    match = instructor_directory(driver, form).match(name)
+    if match is None or not driver.execute_script(HAS_OPTION_JS, locators.ASSIGN_TO_SELECT.value, match[0]):
+        directory = instructor_directory(driver, form, refresh=True)
+        match = directory.match(name)
+        if match is None:
+            candidates, tier = directory.lookup(name)
+            where = " / ".join(form)
+            if not candidates:
+                raise InstructorMatchError(f"Instructor '{name}' not found in the assign-to list for {where}")
+            if len(candidates) > 1:
+                raise InstructorMatchError(f"Instructor '{name}' is ambiguous ({tier}) for {where}: "
+                                           f"{[text for _, text in candidates]}")
+            raise InstructorMatchError(f"Instructor '{name}' has no exact match for {where}; closest is "
+                                       f"'{candidates[0][1]}' ({tier}), not assigned - needs review")
+
+    return click_element_by_js(driver, locators.ASSIGN_TO_INSTRUCTOR_OPTION(value=match[0]))
@@ -0,0 +1,277 @@
+import threading
+
+from typing import Dict, Tuple
+from selenium.webdriver.common.by import By
+
+
+class Locator(tuple):
+    """A (by, value) pair usable anywhere Selenium expects a locator, tagged with a registry name."""
+
+    def __new__(cls, name: str, by: str, value: str):
+        locator = super().__new__(cls, (by, value))
+        locator.name = name
+        return locator
+
+    @property
+    def by(self) -> str:
+        return self[0]
+
+    @property
+    def value(self) -> str:
+        return self[1]
+
+
+def xpath_literal(value: str) -> str:
+    """Quote a value for XPath 1.0, including values with both kinds of quotes (e.g. O'Neil)."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+def css_literal(value: str) -> str:
+    """Quote a value for a CSS attribute selector."""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class LocatorTemplate:
+    """A parameterized locator. String parameters are quoted for the selector language,
+    so templates reference them bare: //td[contains(text(), {product_code})]."""
+
+    _MAX_CACHED = 512
+
+    def __init__(self, name: str, by: str, template: str):
+        self.name = name
+        self.by = by
+        self.template = template
+        self._quote = css_literal if by == By.CSS_SELECTOR else xpath_literal
+        self._cache: Dict[Tuple, Locator] = {}
+
+    def __call__(self, **params) -> Locator:
+        key = tuple(sorted(params.items()))
+        locator = self._cache.get(key)
+        if locator is None:
+            if len(self._cache) >= self._MAX_CACHED:
+                self._cache.clear()
+            quoted = {k: self._quote(v) if isinstance(v, str) else v for k, v in params.items()}
+            locator = Locator(self.name, self.by, self.template.format(**quoted))
+            self._cache[key] = locator
+        return locator
+
+
+REGISTRY: Dict[str, object] = {}
+
+
+def _register(name: str, by: str, value: str, parameterized: bool = False):
+    if name in REGISTRY:
+        raise ValueError(f"Duplicate locator name: {name}")
+    locator = LocatorTemplate(name, by, value) if parameterized else Locator(name, by, value)
+    REGISTRY[name] = locator
+    return locator
+
+
+# --- Enrollware: login ---
+ENROLLWARE_LOGIN_BUTTON = _register("enrollware.login.button", By.ID, "loginButton")
+ENROLLWARE_USERNAME = _register("enrollware.login.username", By.ID, "username")
+ENROLLWARE_PASSWORD = _register("enrollware.login.password", By.ID, "password")
+ENROLLWARE_REMEMBER_ME = _register("enrollware.login.remember_me", By.ID, "rememberMe")
+
+# --- Enrollware: TC Product Orders list ---
+ORDER_LIST_ROWS = _register("enrollware.orders.rows", By.CSS_SELECTOR, "tbody > tr")
+ORDER_ROW_CELL = _register("enrollware.orders.row_cell", By.XPATH, ".//td[{column}]", parameterized=True)
+ORDER_ROW_LINK = _register("enrollware.orders.row_link", By.XPATH, ".//td[7]/a")
+# The id query parameter exactly: id=12 must not match id=123
+ORDER_LINK_BY_HREF = _register("enrollware.orders.link_by_href", By.XPATH,
+                               "//tbody/tr/td[7]/a[contains(concat(@href, '&'), concat('?id=', {order_id}, '&'))"
+                               " or contains(concat(@href, '&'), concat('&id=', {order_id}, '&'))]",
+                               parameterized=True)
+ORDER_LINK_BY_ROW_KEY = _register("enrollware.orders.link_by_row_key", By.XPATH,
+                                  "//tbody/tr[normalize-space(td[1])= {row_key}]/td[7]/a", parameterized=True)
+# GridView pager: numbered __doPostBack('...','Page$N') links, plus "..." for the next group of pages
+ORDER_LIST_PAGE_LINK = _register("enrollware.orders.page_link", By.XPATH,
+                                 "//a[contains(@href, 'Page$')][normalize-space(.)= {page}]", parameterized=True)
+ORDER_LIST_MORE_PAGES_LINK = _register("enrollware.orders.more_pages_link", By.XPATH,
+                                       "(//a[contains(@href, 'Page$')][normalize-space(.)= '...'])[last()]")
+
+# --- Enrollware: order detail ---
+ORDER_DETAIL_FIELD = _register("enrollware.order.field", By.XPATH,
+                               "//label[text()= {label}]/parent::div/following-sibling::div", parameterized=True)
+ORDER_PRODUCT_ROWS = _register("enrollware.order.product_rows", By.XPATH,
+                               "//label[text()= 'Products:']/parent::div/following-sibling::div//tr")
+ORDER_PRODUCT_CELLS = _register("enrollware.order.product_cells", By.XPATH,
+                                "//label[text()= 'Products:']/parent::div/following-sibling::div//td[{column}]",
+                                parameterized=True)
+ORDER_STATUS_SELECT = _register("enrollware.order.status", By.ID, "mainContent_status")
+ORDER_STATUS_UPDATE_BUTTON = _register("enrollware.order.status_update", By.ID, "mainContent_statusUpdateBtn")
+ORDER_EMAIL_BUTTON = _register("enrollware.order.email", By.ID, "mainContent_emailBtn")
+ORDER_SEND_BUTTON = _register("enrollware.order.send", By.ID, "mainContent_sendButton")
+ORDER_BACK_BUTTON = _register("enrollware.order.back", By.ID, "mainContent_backButton")
+ORDER_COMMENT_INPUT = _register("enrollware.order.comment_input", By.ID, "mainContent_addEntryTxt")
+ORDER_COMMENT_SUBMIT = _register("enrollware.order.comment_submit", By.ID, "mainContent_entrySubBtn")
+ORDER_COMMENT_WITH_TEXT = _register("enrollware.order.comment_with_text", By.XPATH,
+                                    "//td[contains(text(), {text})]", parameterized=True)
+
+# --- Enrollware: Red Cross roster ---
+REDCROSS_VIEW_ROSTER = _register("enrollware.redcross.view_roster", By.XPATH, "//a[text()= 'view roster']")
+REDCROSS_CARD_PRINT = _register("enrollware.redcross.card_print", By.ID, "mainContent_cardPrint")
+REDCROSS_SUBMIT = _register("enrollware.redcross.submit", By.ID, "mainContent_arcSubmitBtn")
+REDCROSS_PLEASE_WAIT = _register("enrollware.redcross.please_wait", By.ID, "arcPleaseWaitRow")
+REDCROSS_STATUS_ERROR = _register("enrollware.redcross.status_error", By.CSS_SELECTOR, "div[class*='statusbarerror']")
+
+# --- AHA single sign-on (eCards and Shop CPR) ---
+SSO_EMAIL = _register("aha_sso.email", By.ID, "Email")
+SSO_PASSWORD = _register("aha_sso.password", By.ID, "Password")
+SSO_SIGN_IN = _register("aha_sso.sign_in", By.ID, "btnSignIn")
+
+# --- eCards: session ---
+ECARDS_MAINTENANCE_NOTICE = _register("ecards.maintenance_notice", By.XPATH,
+                                      "//span[contains(text(), 'Our site will be under maintenance')]")
+ECARDS_OTHER_ACCOUNT_LABEL = _register("ecards.login.other_account", By.XPATH, "//label[text()= 'Training Site']")
+ECARDS_SIGN_IN_BUTTON = _register("ecards.login.sign_in_button", By.XPATH, "(//button[text()= 'Sign In | Sign Up'])[1]")
+ECARDS_PROFILE_BUTTON = _register("ecards.logout.profile_button", By.XPATH, "//img[@id= 'profileImg']/parent::button")
+ECARDS_LOGOUT_ID = _register("ecards.logout.logout", By.ID, "logoutId")
+ECARDS_HEADER_USERNAME = _register("ecards.logout.header_username", By.XPATH,
+                                   "//span[contains(@class, 'Header_userName')]/ancestor::button")
+ECARDS_LOGOUT_LINK = _register("ecards.logout.logout_link", By.XPATH, "//a[text()= 'Logout']")
+
+# --- eCards: inventory ---
+INVENTORY_ROWS = _register("ecards.inventory.rows", By.CSS_SELECTOR, "tbody > tr")
+INVENTORY_COURSE_BUTTON = _register("ecards.inventory.course_button", By.XPATH,
+                                    "//td[contains(text(), {product_code})]/preceding-sibling::td[@role='button']",
+                                    parameterized=True)
+INVENTORY_AVAILABLE_QUANTITY = _register("ecards.inventory.available_quantity", By.XPATH,
+                                         "//td[contains(text(), {product_code})]/preceding-sibling::td[1]",
+                                         parameterized=True)
+INVENTORY_ASSIGN_TO_INSTRUCTOR = _register("ecards.inventory.assign_to_instructor", By.XPATH,
+                                           "//div/a[contains(text(), 'Assign to Instructor')]")
+INVENTORY_ASSIGN_TO_TRAINING_SITE = _register("ecards.inventory.assign_to_training_site", By.XPATH,
+                                              "//div/a[contains(text(), 'Assign to Training Site')]")
+MANAGE_ECARDS_MENU = _register("ecards.menu.manage_ecards", By.CSS_SELECTOR, "a[id*='accessible-megamenu']")
+MENU_ASSIGN_TO_INSTRUCTORS = _register("ecards.menu.assign_to_instructors", By.XPATH, "//a[text()= 'Assign to Instructors']")
+
+# --- eCards: assignment wizard ---
+ASSIGN_ROLE_SELECT = _register("ecards.assign.role", By.ID, "RoleId")
+ASSIGN_COURSE_SELECT = _register("ecards.assign.course", By.ID, "CourseId")
+ASSIGN_TC_SELECT = _register("ecards.assign.training_center", By.ID, "ddlTC")
+ASSIGN_SITE_SELECT = _register("ecards.assign.training_site", By.ID, "ddlSite")
+ASSIGN_TO_SELECT = _register("ecards.assign.assign_to", By.ID, "assignTo")
+ASSIGN_TO_DROPDOWN_BUTTON = _register("ecards.assign.assign_to_button", By.CSS_SELECTOR, "#assignTo ~ div > button")
+# Checkbox of one instructor in the dropdown, by the option value of the hidden #assignTo select
+ASSIGN_TO_INSTRUCTOR_OPTION = _register("ecards.assign.instructor_option", By.CSS_SELECTOR,
+                                        "#assignTo ~ div input[value={value}]", parameterized=True)
+ASSIGN_MOVE_NEXT = _register("ecards.assign.move_next", By.ID, "btnMoveNext")
+ASSIGN_AVAILABLE_QUANTITY = _register("ecards.assign.available_quantity", By.ID, "tdAvailQty")
+ASSIGN_QUANTITY = _register("ecards.assign.quantity", By.ID, "qty1")
+ASSIGN_CONFIRM = _register("ecards.assign.confirm", By.ID, "btnConfirm")
+ASSIGN_COMPLETE = _register("ecards.assign.complete", By.ID, "btnComplete")
+GO_TO_INVENTORY = _register("ecards.assign.go_to_inventory", By.XPATH, "//a[text()= 'Go To Inventory']")
+SITE_ASSIGN_TC_SELECT = _register("ecards.site_assign.training_center", By.ID, "tcId")
+SITE_ASSIGN_SITE_SELECT = _register("ecards.site_assign.training_site", By.ID, "tsList")
+SITE_ASSIGN_COURSE_SELECT = _register("ecards.site_assign.course", By.ID, "courseId")
+SITE_ASSIGN_QUANTITY = _register("ecards.site_assign.quantity", By.ID, "qty")
+SITE_ASSIGN_VALIDATE = _register("ecards.site_assign.validate", By.ID, "btnValidate")
+
+# --- Shop CPR ---
+SHOPCPR_SIGN_IN_LINK = _register("shopcpr.login.sign_in_link", By.CSS_SELECTOR, "a[href*='login']")
+SHOPCPR_ORG_POPUP = _register("shopcpr.checkout.org_popup", By.ID, "org-form")
+SHOPCPR_POPUP_CONTINUE = _register("shopcpr.checkout.popup_continue", By.XPATH, "//button[text()= 'Continue']")
+SHOPCPR_CART_COUNT = _register("shopcpr.cart.count", By.CLASS_NAME, "scpr-cartcount")
+SHOPCPR_SHOW_CART = _register("shopcpr.cart.show", By.ID, "aha-showcart")
+SHOPCPR_CART_DELETE_BUTTONS = _register("shopcpr.cart.delete_buttons", By.CSS_SELECTOR, "a[id*='delete-item']")
+SHOPCPR_CART_REMOVE_CONFIRM = _register("shopcpr.cart.remove_confirm", By.ID, "remove-product")
+SHOPCPR_CART_EMPTY_MESSAGE = _register("shopcpr.cart.empty_message", By.XPATH,
+                                       "//p[contains(text(), 'You have no items in your shopping cart.')]")
+SHOPCPR_MENU_COURSE_CARDS = _register("shopcpr.menu.course_cards", By.XPATH, "//span[text()= 'Course Cards']/parent::a")
+SHOPCPR_MENU_HEARTSAVER_BUNDLES = _register("shopcpr.menu.heartsaver_bundles", By.XPATH,
+                                            "//span[text()= 'Heartsaver Bundles']/parent::a")
+SHOPCPR_PRODUCT_LIST = _register("shopcpr.search.product_list", By.CSS_SELECTOR, "div[data-container='product-list']")
+SHOPCPR_SEARCH_TOGGLE = _register("shopcpr.search.toggle", By.CSS_SELECTOR, "button[title='Search Product']")
+SHOPCPR_SEARCH_INPUT = _register("shopcpr.search.input", By.ID, "searchtext")
+SHOPCPR_SEARCH_SUBMIT = _register("shopcpr.search.submit", By.ID, "btnsearch")
+SHOPCPR_VIEW_DETAILS = _register("shopcpr.product.view_details", By.CSS_SELECTOR, "a[title='View Details']")
+SHOPCPR_BUNDLE_SLIDE = _register("shopcpr.product.bundle_slide", By.ID, "bundle-slide")
+SHOPCPR_QUICK_VIEW = _register("shopcpr.product.quick_view", By.CSS_SELECTOR, "a[id*='title-quick-view']")
+SHOPCPR_QUANTITY = _register("shopcpr.product.quantity", By.ID, "qty")
+SHOPCPR_ADD_TO_CART = _register("shopcpr.product.add_to_cart", By.ID, "product-addtocart-button")
+SHOPCPR_MINICART = _register("shopcpr.cart.minicart", By.ID, "minicart-content-wrapper")
+SHOPCPR_CHECKOUT = _register("shopcpr.cart.checkout", By.ID, "top-cart-btn-checkout")
+SHOPCPR_REQUIRES_ATTENTION = _register("shopcpr.checkout.requires_attention", By.XPATH,
+                                       "//span[contains(text(), 'requires attention')]")
+SHOPCPR_SECURITY_ID = _register("shopcpr.checkout.security_id", By.ID, "sid")
+SHOPCPR_PROCEED_CHECKOUT = _register("shopcpr.checkout.proceed", By.ID, "proceed-checkout")
+SHOPCPR_TAX_STATUS = _register("shopcpr.checkout.tax_status", By.ID, "taxStatus")
+SHOPCPR_PURCHASE_CODE_LINK = _register("shopcpr.checkout.purchase_code", By.XPATH,
+                                       "//a[contains(text(), {text})]", parameterized=True)
+SHOPCPR_PURCHASE_CONTINUE = _register("shopcpr.checkout.purchase_continue", By.ID, "purchase-continue-btn")
+SHOPCPR_PO_NUMBER = _register("shopcpr.checkout.po_number", By.ID, "po_number")
+SHOPCPR_PROCEED_TO_PAYMENT = _register("shopcpr.checkout.proceed_to_payment", By.XPATH,
+                                       "//button[text()= 'Proceed to Payment']")
+
+
+class _LookupStats:
+    __slots__ = ("lookups", "timeouts", "absent", "total_seconds", "max_seconds")
+
+    def __init__(self):
+        self.lookups = 0
+        self.timeouts = 0
+        self.absent = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+
+_stats: Dict[str, _LookupStats] = {}
+_stats_lock = threading.Lock()
+
+
+def locator_name(by_locator) -> str:
+    """Registry name of a locator, or its raw selector for ad hoc tuples."""
+    return getattr(by_locator, "name", None) or f"{by_locator[0]}={by_locator[1]}"
+
+
+def record_lookup(by_locator, elapsed: float, found: bool, probe: bool = False):
+    """Record how long waiting for a locator took and whether it timed out.
+
+    A probe is a check whether an element is there at all; when it is not, that is counted as
+    absent rather than as a timeout.
+    """
+    name = locator_name(by_locator)
+    with _stats_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = _LookupStats()
+        stats.lookups += 1
+        stats.total_seconds += elapsed
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+        if not found and probe:
+            stats.absent += 1
+        elif not found:
+            stats.timeouts += 1
+
+
+def locator_stats() -> Dict[str, Dict[str, float]]:
+    with _stats_lock:
+        return {
+            name: {
+                "lookups": s.lookups,
+                "timeouts": s.timeouts,
+                "absent": s.absent,
+                "avg_seconds": s.total_seconds / s.lookups if s.lookups else 0.0,
+                "max_seconds": s.max_seconds,
+                "total_seconds": s.total_seconds,
+            }
+            for name, s in _stats.items()
+        }
+
+
+def locator_report(top: int = 15) -> str:
+    """The locators that cost the most wall-clock time, slowest first."""
+    stats = sorted(locator_stats().items(), key=lambda item: item[1]["total_seconds"], reverse=True)[:top]
+    if not stats:
+        return "No locator lookups recorded"
+    lines = ["LOCATOR TIMINGS (total / avg / max seconds, lookups, timeouts, absent on probe)"]
+    for name, s in stats:
+        lines.append(f"  {name}: {s['total_seconds']:.1f} / {s['avg_seconds']:.2f} / {s['max_seconds']:.2f}, "
+                     f"{s['lookups']} lookups, {s['timeouts']} timeouts, {s['absent']} absent")
+    return "\n".join(lines)
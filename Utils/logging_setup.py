@@ -0,0 +1,174 @@
+import os
+import sys
+import gzip
+import json
+import time
+import queue
+import atexit
+import shutil
+import logging
+import contextvars
+
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+# Structured fields attached to every record emitted while an order is being worked on
+CONTEXT_FIELDS = ("order_id", "sku", "stage")
+_log_context = contextvars.ContextVar("log_context", default={})
+
+_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach order_id / sku / stage to all log records emitted inside the block."""
+    token = _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def set_log_context(**fields):
+    """Update the current log context in place, e.g. to advance the stage of an order.
+
+    Passing None for a field removes it.
+    """
+    context = dict(_log_context.get())
+    for key, value in fields.items():
+        if value is None:
+            context.pop(key, None)
+        else:
+            context[key] = value
+    _log_context.set(context)
+
+
+def current_log_context() -> dict:
+    """Return a copy of the fields currently attached to log records."""
+    return dict(_log_context.get())
+
+
+class OrderContextFilter(logging.Filter):
+    """Copy the current log context onto the record on the emitting thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field, "-"))
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line so logs can be queried with jq or loaded into a dataframe."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            entry[field] = getattr(record, field, "-")
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """Rotate when the file exceeds max_bytes or when the rotation interval elapses.
+
+    Rotated files are gzip-compressed; backups keep the RotatingFileHandler numbering.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int,
+                 interval_seconds: int = 24 * 60 * 60, encoding: str = 'utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.interval_seconds = interval_seconds
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._gzip_rotator
+        self.next_rollover_at = time.time() + interval_seconds
+
+    @staticmethod
+    def _gzip_rotator(source: str, dest: str):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.next_rollover_at and os.path.exists(self.baseFilename) \
+                and os.path.getsize(self.baseFilename) > 0:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.next_rollover_at = time.time() + self.interval_seconds
+
+
+def setup_logging(log_dir: str = 'logs', json_lines: Optional[bool] = None) -> str:
+    """Route all logging through a queue to rotating file, console and optional JSON-lines sinks.
+
+    The automation thread only enqueues records; formatting, rotation, compression and disk
+    writes happen on the QueueListener thread. Returns the path of the active log file.
+    """
+    global _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    max_bytes = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    backup_count = int(os.getenv("LOG_BACKUP_COUNT", 10))
+    interval_seconds = int(os.getenv("LOG_ROTATE_SECONDS", 24 * 60 * 60))
+    if json_lines is None:
+        json_lines = os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes")
+
+    log_file = os.path.join(log_dir, 'python.log')
+
+    # Console handler with simplified format
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+
+    # File handler with detailed format
+    file_handler = SizeAndTimeRotatingFileHandler(log_file, max_bytes, backup_count, interval_seconds)
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(levelname)s - [%(order_id)s|%(sku)s|%(stage)s] - %(message)s'
+    ))
+
+    handlers = [console_handler, file_handler]
+    if json_lines:
+        json_handler = SizeAndTimeRotatingFileHandler(
+            os.path.join(log_dir, 'python.jsonl'), max_bytes, backup_count, interval_seconds)
+        json_handler.setLevel(logging.DEBUG)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    if _listener:
+        _listener.stop()
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(OrderContextFilter())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    return log_file
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,169 @@
+import logging
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+from Utils.locators import locator_name, record_lookup
+
+logger = logging.getLogger(__name__)
+
+# Runs the queued operations in order inside the page. Each operation polls (every 100 ms, up to
+# its own timeout) until its element or option is there, so dependent dropdowns that load
+# after the previous selection need no waits from Python. Stops at the first failure.
+MACRO_JS = """
+const ops = arguments[0], done = arguments[arguments.length - 1];
+const results = [];
+
+function find(by, value) {
+    if (by === 'id') return document.getElementById(value);
+    if (by === 'css selector') return document.querySelector(value);
+    if (by === 'class name') return document.getElementsByClassName(value)[0] || null;
+    if (by === 'xpath') {
+        return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    throw new Error('unsupported locator strategy: ' + by);
+}
+
+function fire(element) {
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+}
+
+function run(op) {
+    const element = find(op.by, op.value);
+    if (!element) return {ok: false, retry: true, error: 'element not found'};
+    if (op.op === 'select') {
+        // keep: an option already selected is left alone, so its dependent dropdowns are not reloaded
+        const current = element.selectedIndex >= 0 ? element.options[element.selectedIndex] : null;
+        if (op.keep && current && current.text.trim() === op.text) return {ok: true, value: current.value};
+        const option = Array.from(element.options).find(o => o.text.trim() === op.text);
+        if (!option) return {ok: false, retry: true, error: 'option not found: ' + op.text};
+        element.value = option.value;
+        fire(element);
+        const selected = element.options[element.selectedIndex];
+        if (!selected || selected.text.trim() !== op.text) return {ok: false, error: 'selection did not stick'};
+        return {ok: true, value: option.value};
+    }
+    if (op.op === 'click') {
+        element.scrollIntoView({block: 'center', inline: 'nearest'});
+        element.click();
+        return {ok: true};
+    }
+    return {ok: false, error: 'unknown operation: ' + op.op};
+}
+
+function step(index) {
+    if (index >= ops.length) return done(results);
+    const op = ops[index], started = Date.now();
+    (function attempt() {
+        let outcome;
+        try { outcome = run(op); } catch (e) { outcome = {ok: false, error: String(e)}; }
+        if (!outcome.ok && outcome.retry && Date.now() - started < op.timeout_ms) return setTimeout(attempt, 100);
+        results.push({ok: outcome.ok, value: outcome.value === undefined ? null : outcome.value,
+                      error: outcome.error || null, elapsed_ms: Date.now() - started});
+        if (!outcome.ok) return done(results);
+        step(index + 1);
+    })();
+}
+step(0);
+"""
+
+SUPPORTED_STRATEGIES = (By.ID, By.CSS_SELECTOR, By.CLASS_NAME, By.XPATH)
+
+
+@dataclass
+class MacroStep:
+    op: str
+    locator: Any
+    text: str = ""
+    timeout: float = 10
+    keep: bool = False
+    ok: Optional[bool] = None
+    value: Optional[str] = None
+    error: Optional[str] = None
+    elapsed_ms: int = 0
+
+    def describe(self) -> str:
+        target = f"{self.op} {locator_name(self.locator)}"
+        if self.text:
+            target += f" '{self.text}'"
+        if self.ok:
+            return f"{target}: ok ({self.elapsed_ms} ms)"
+        if self.ok is None:
+            return f"{target}: not run"
+        return f"{target}: failed after {self.elapsed_ms} ms - {self.error}"
+
+
+@dataclass
+class MacroResult:
+    name: str
+    steps: List[MacroStep] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.steps) and all(step.ok for step in self.steps)
+
+    @property
+    def failed_step(self) -> Optional[MacroStep]:
+        return next((step for step in self.steps if step.ok is False), None)
+
+    def describe(self) -> str:
+        return f"Macro '{self.name}':\n" + "\n".join(f"  {step.describe()}" for step in self.steps)
+
+
+class ScriptMacro:
+    """A sequence of select/click operations run in the page with one execute_script.
+
+    Builder methods chain; run() returns a MacroResult with the outcome of every operation.
+    """
+
+    def __init__(self, name: str, timeout: float = 10):
+        self.name = name
+        self.timeout = timeout
+        self._steps: List[MacroStep] = []
+
+    def select(self, locator, text: str, timeout: Optional[float] = None, keep: bool = False) -> "ScriptMacro":
+        """Select the option with this text. With keep, a select already showing it is not touched."""
+        return self._add("select", locator, text, timeout, keep)
+
+    def click(self, locator, timeout: Optional[float] = None) -> "ScriptMacro":
+        return self._add("click", locator, "", timeout)
+
+    def _add(self, op: str, locator, text: str, timeout: Optional[float], keep: bool = False) -> "ScriptMacro":
+        if locator[0] not in SUPPORTED_STRATEGIES:
+            raise ValueError(f"Locator strategy '{locator[0]}' is not supported in script macros")
+        self._steps.append(MacroStep(op, locator, text, self.timeout if timeout is None else timeout, keep))
+        return self
+
+    def compile(self) -> List[Dict[str, Any]]:
+        """The operations as the JSON-serializable argument of MACRO_JS."""
+        return [{"op": step.op, "by": step.locator[0], "value": step.locator[1], "text": step.text,
+                 "keep": step.keep, "timeout_ms": int(step.timeout * 1000)} for step in self._steps]
+
+    def run(self, driver) -> MacroResult:
+        steps = [MacroStep(step.op, step.locator, step.text, step.timeout, step.keep) for step in self._steps]
+        result = MacroResult(self.name, steps)
+        if not steps:
+            return result
+
+        previous_timeout = driver.timeouts.script
+        try:
+            # The page polls for each step, so the script may legitimately run for the sum of the timeouts
+            driver.set_script_timeout(sum(step.timeout for step in steps) + 5)
+            outcomes = driver.execute_async_script(MACRO_JS, self.compile()) or []
+        except WebDriverException as e:
+            steps[0].ok = False
+            steps[0].error = f"script failed: {e}"
+            return result
+        finally:
+            # Later execute_async_script calls in the session keep their own timeout
+            driver.set_script_timeout(previous_timeout)
+
+        for step, outcome in zip(steps, outcomes):
+            step.ok = bool(outcome.get("ok"))
+            step.value = outcome.get("value")
+            step.error = outcome.get("error")
+            step.elapsed_ms = int(outcome.get("elapsed_ms") or 0)
+            record_lookup(step.locator, step.elapsed_ms / 1000, found=step.ok or step.error != "element not found")
+        return result
@@ -81,3 +81,24 @@ def generate_email(record_data: dict, days_left: int) -> str:
                 border-radius: 4px; font-weight: bold; font-size: 12px;">REQUEST A ZOOM MEETING With Nathaniel 
                 Shell</a> </p> </div> </div> </body> </html>"""
     return html_content
+
+
+# Per-recipient fields substituted by Brevo at send time, mapped to their params key
+TEMPLATE_FIELDS = {
+    'Instructor': 'INSTRUCTOR',
+    'Student Name': 'STUDENT_NAME',
+    'Student Email': 'STUDENT_EMAIL',
+    'Course': 'COURSE',
+    'Course Date': 'COURSE_DATE',
+}
+
+
+def generate_email_template(days_left: int) -> str:
+    """Render the reminder once with Brevo params placeholders for the per-recipient fields."""
+    placeholders = {field: f"{{{{ params.{key} }}}}" for field, key in TEMPLATE_FIELDS.items()}
+    return generate_email(placeholders, days_left)
+
+
+def template_params(record_data: dict) -> dict:
+    """Build the Brevo params dict that fills a template from generate_email_template."""
+    return {key: str(record_data.get(field, '') or '') for field, key in TEMPLATE_FIELDS.items()}
@@ -1,4 +1,5 @@
 import os
+import time
 import requests
 from dotenv import load_dotenv
 
@@ -39,3 +40,67 @@ def send_email(text_content):
             print(response.text)
     except Exception as e:
         print(f"Connection Error: {e}")
+
+
+# Brevo accepts at most this many messageVersions in one /smtp/email request
+MAX_MESSAGE_VERSIONS = 1000
+# Longest wait between attempts, whatever Retry-After asks for
+MAX_RETRY_DELAY = 60
+
+
+def send_batch_email(subject, html_content, versions, max_retries=3):
+    """Send one templated email to many recipients through Brevo messageVersions.
+
+    Each version is a dict with "to" (list of {"email", "name"}) and "params".
+    Returns True when Brevo accepted the whole batch. Only requests Brevo answered with 429 or
+    5xx, or that never reached it, are retried: after a read timeout or a dropped connection the
+    batch may already have been accepted, and sending it again would mail everyone twice.
+    """
+    if not versions:
+        return True
+    if len(versions) > MAX_MESSAGE_VERSIONS:
+        raise ValueError(f"Brevo allows at most {MAX_MESSAGE_VERSIONS} message versions per request")
+
+    payload = {
+        "sender": {
+            "name": "Code Blue CPR Services",
+            "email": os.getenv("SENDER_EMAIL")
+        },
+        "subject": subject,
+        "htmlContent": html_content,
+        "messageVersions": versions
+    }
+
+    for attempt in range(max_retries):
+        last_attempt = attempt == max_retries - 1
+        try:
+            response = requests.post(URL, json=payload, headers=headers, timeout=60)
+        except requests.exceptions.ConnectTimeout as e:
+            # Nothing was sent, so trying again cannot duplicate the batch
+            print(f"Connection Error: {e}")
+            if not last_attempt:
+                time.sleep(2 ** attempt)
+            continue
+        except Exception as e:
+            print(f"Connection Error: {e}")
+            print("The batch may have been accepted; check the Brevo logs before sending it again")
+            return False
+
+        if response.status_code == 201:
+            return True
+        if response.status_code == 429 or response.status_code >= 500:
+            if last_attempt:
+                print(f"Brevo returned {response.status_code}, giving up after {max_retries} attempts")
+                break
+            # Rate limited or transient failure: honour Retry-After when Brevo sends one
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.replace(".", "", 1).isdigit() else 2 ** attempt
+            delay = min(delay, MAX_RETRY_DELAY)
+            print(f"Brevo returned {response.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        print(f"Error: {response.status_code}")
+        print(response.text)
+        return False
+
+    return False
@@ -0,0 +1,189 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import argparse
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+from Utils.mail_sender.email_generator import generate_email_template, template_params
+from Utils.mail_sender.email_sender import send_batch_email, MAX_MESSAGE_VERSIONS
+
+logger = logging.getLogger(__name__)
+
+# Instructors get this many business days after the notice date to submit the roster
+BUSINESS_DAYS_ALLOWED = 5
+REMINDER_SUBJECT = "Action Required: Class Roster Not Submitted in Enrollware"
+CURSOR_FILE = "roster_reminder_cursor.json"
+DEFAULT_SQLITE_QUERY = "SELECT * FROM roster_deficiencies"
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y", "%Y-%m-%d %H:%M:%S")
+
+
+def parse_date(value: str) -> Optional[date]:
+    """Parse a dataset date in any of the formats exported by Enrollware or the eCards site."""
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def business_days_between(start: date, end: date) -> int:
+    """Count the weekdays in [start, end) without walking the calendar day by day."""
+    if end <= start:
+        return 0
+    weeks, remainder = divmod((end - start).days, 7)
+    count = weeks * 5
+    weekday = start.weekday()
+    for offset in range(remainder):
+        if (weekday + offset) % 7 < 5:
+            count += 1
+    return count
+
+
+def business_days_remaining(notice_date: date, today: Optional[date] = None) -> int:
+    """Business days left before the roster deadline (0 once the deadline has passed)."""
+    elapsed = business_days_between(notice_date, today or date.today())
+    return max(0, BUSINESS_DAYS_ALLOWED - elapsed)
+
+
+def load_records(source: str, query: str = DEFAULT_SQLITE_QUERY) -> Iterator[Dict[str, Any]]:
+    """Yield roster-deficiency records from a CSV file or a SQLite database."""
+    if source.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        connection = sqlite3.connect(source)
+        connection.row_factory = sqlite3.Row
+        try:
+            for row in connection.execute(query):
+                yield dict(row)
+        finally:
+            connection.close()
+        return
+
+    with open(source, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield row
+
+
+def dataset_fingerprint(source: str) -> str:
+    """Identify a dataset by path, size and mtime so a cursor is never reused on new data."""
+    stat = os.stat(source)
+    raw = f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def load_cursor(run_key: str) -> int:
+    """Return how many versions of this run were already sent."""
+    try:
+        with open(CURSOR_FILE, 'r', encoding='utf-8') as f:
+            cursor = json.load(f)
+        return int(cursor.get("sent", 0)) if cursor.get("run_key") == run_key else 0
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def save_cursor(run_key: str, sent: int):
+    """Persist progress atomically so an interrupted run resumes at the next chunk."""
+    tmp_path = f"{CURSOR_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"run_key": run_key, "sent": sent, "updated": datetime.now().isoformat()}, f)
+    os.replace(tmp_path, CURSOR_FILE)
+
+
+def build_versions(records, today: Optional[date] = None,
+                   date_field: str = "Notice Date") -> Dict[int, List[Dict[str, Any]]]:
+    """Group records by business days remaining and turn each into a Brevo message version."""
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    skipped = 0
+    for row_num, record in enumerate(records, start=1):
+        email = (record.get("Instructor Email") or "").strip()
+        notice_date = parse_date(record.get(date_field) or record.get("Course Date", ""))
+        if not email or not notice_date:
+            logger.warning(f"Record {row_num}: missing instructor email or notice date, skipping")
+            skipped += 1
+            continue
+
+        days_left = business_days_remaining(notice_date, today)
+        if days_left <= 0:
+            logger.info(f"Record {row_num}: deadline passed for {email}, no reminder sent")
+            skipped += 1
+            continue
+
+        grouped.setdefault(days_left, []).append({
+            "to": [{"email": email, "name": record.get("Instructor", "")}],
+            "params": template_params(record),
+        })
+
+    if skipped:
+        logger.info(f"Skipped {skipped} records")
+    return grouped
+
+
+def send_reminders(source: str, query: str = DEFAULT_SQLITE_QUERY, chunk_size: int = 500,
+                   requests_per_second: float = 2.0, dry_run: bool = False,
+                   today: Optional[date] = None) -> int:
+    """Send roster reminders for a dataset in Brevo batches, resuming from the saved cursor."""
+    today = today or date.today()
+    chunk_size = max(1, min(chunk_size, MAX_MESSAGE_VERSIONS))
+    min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+
+    grouped = build_versions(load_records(source, query), today)
+    run_key = f"{dataset_fingerprint(source)}:{today.isoformat()}"
+    already_sent = 0 if dry_run else load_cursor(run_key)
+    if already_sent:
+        logger.info(f"Resuming after {already_sent} previously sent reminders")
+
+    position = 0
+    sent = already_sent
+    last_request = 0.0
+    # Highest days_left first so the deterministic order never changes between resumes
+    for days_left in sorted(grouped, reverse=True):
+        versions = grouped[days_left]
+        html_content = generate_email_template(days_left)
+
+        for start in range(0, len(versions), chunk_size):
+            chunk = versions[start:start + chunk_size]
+            chunk_end = position + len(chunk)
+            if chunk_end <= already_sent:
+                position = chunk_end
+                continue
+            # A partially sent chunk (cursor moved mid-chunk by a smaller chunk size) resumes exactly
+            chunk = chunk[max(0, already_sent - position):]
+
+            if dry_run:
+                logger.info(f"[dry-run] {len(chunk)} reminders with {days_left} business days remaining")
+                position = chunk_end
+                continue
+
+            wait = min_interval - (time.monotonic() - last_request)
+            if wait > 0:
+                time.sleep(wait)
+            last_request = time.monotonic()
+
+            if not send_batch_email(REMINDER_SUBJECT, html_content, chunk):
+                logger.error(f"Batch failed after {sent} reminders; rerun to resume from here")
+                return sent
+
+            position = chunk_end
+            sent = chunk_end
+            save_cursor(run_key, sent)
+            logger.info(f"Sent {sent} reminders ({days_left} business days remaining batch)")
+
+    logger.info(f"Roster reminders complete: {sent} sent")
+    return sent
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Send roster-deficiency reminders through Brevo")
+    parser.add_argument("source", help="CSV file or SQLite database with roster-deficiency records")
+    parser.add_argument("--query", default=DEFAULT_SQLITE_QUERY, help="SQL query when source is SQLite")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum Brevo requests per second")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    send_reminders(args.source, args.query, args.chunk_size, args.rate, args.dry_run)
@@ -0,0 +1,166 @@
+import os
+import re
+import logging
+import requests
+
+from lxml import html as lxml_html
+from urllib.parse import urljoin
+from typing import Any, Dict, Iterator, Optional, Tuple
+from courses import AvailableCourses
+from orders import Order, list_row_kind, parse_order, parse_order_link
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on list pages walked per scan (ORDER_LIST_MAX_PAGES)
+MAX_LIST_PAGES = int(os.getenv("ORDER_LIST_MAX_PAGES", 50))
+PAGER_POSTBACK = re.compile(r"__doPostBack\('([^']*)','(Page\$[^']*)'\)")
+
+
+def create_http_session(driver) -> requests.Session:
+    """Create a requests session that reuses the browser's Enrollware login cookies."""
+    session = requests.Session()
+    try:
+        session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    except Exception:
+        pass
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return session
+
+
+def _field_text(tree, title: str) -> str:
+    """Text of the value div next to a '<title>:' label, with <br> rendered as newlines."""
+    nodes = tree.xpath(f"//label[text()= '{title}:']/parent::div/following-sibling::div")
+    if not nodes:
+        return ""
+    return "".join(nodes[0].itertext()).strip()
+
+
+def parse_order_detail(page_source: str, order_id: str, courses: AvailableCourses) -> Optional[Order]:
+    """Parse an order detail page into the same Order get_order_data builds from the DOM."""
+    tree = lxml_html.fromstring(page_source)
+    for br in tree.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+
+    training_site = _field_text(tree, "Training Site") or "Unknown"
+    name = _field_text(tree, "Name/Address") or "Unknown"
+    name = name.split('\n')[0].strip()
+
+    rows = []
+    for row in tree.xpath("//label[text()= 'Products:']/parent::div/following-sibling::div//tr"):
+        cells = [" ".join(cell.text_content().split()) for cell in row.xpath("./td")]
+        if len(cells) < 3:
+            continue  # header row
+        rows.append((cells[0], cells[1], cells[2]))
+
+    return parse_order(order_id, training_site, name, rows, courses)
+
+
+def parse_order_list(tree, page_url: str) -> Iterator[Dict[str, Any]]:
+    """Order references for the open orders on one TC Product Orders page, in table order.
+
+    Mirrors get_orders_to_process: complete and cancelled rows are left out and each
+    reference carries its kind ("aha" or "redcross"). Header and pager rows have fewer cells
+    and are skipped. (The served HTML has no <tbody>; only browsers insert one.)
+    """
+    for index, row in enumerate(tree.xpath("//tr[td]"), 1):
+        cells = row.xpath("./td")
+        if len(cells) < 7:
+            continue
+        kind = list_row_kind(cells[1].text_content().strip(), cells[3].text_content().strip())
+        links = cells[6].xpath("./a")
+        if kind is None or not links:
+            continue
+        order_ref = parse_order_link(urljoin(page_url, links[0].get("href") or ""), cells[0].text_content().strip())
+        order_ref["index"] = index
+        order_ref["kind"] = kind
+        yield order_ref
+
+
+def _next_page_postback(tree, page: int) -> Optional[Tuple[str, str]]:
+    """(__EVENTTARGET, __EVENTARGUMENT) of the pager link to the page after `page`, if any."""
+    numbered, next_link = {}, None
+    for href in tree.xpath("//a/@href"):
+        match = PAGER_POSTBACK.search(href)
+        if not match:
+            continue
+        target, argument = match.groups()
+        number = argument[len("Page$"):]
+        if number.isdigit():
+            numbered[int(number)] = (target, argument)
+        elif number == "Next":
+            next_link = (target, argument)
+    if page + 1 in numbered:
+        return numbered[page + 1]
+    # "..." after the last numbered link jumps to the first page of the next group
+    later = [number for number in numbered if number > page]
+    return numbered[min(later)] if later else next_link
+
+
+def _form_fields(tree) -> Dict[str, str]:
+    """The page's form state (view state, event validation, current filter values) for a postback."""
+    fields = {}
+    for field in tree.xpath("//form//input[@name]"):
+        if (field.get("type") or "text").lower() in ("hidden", "text"):
+            fields[field.get("name")] = field.get("value") or ""
+    for select in tree.xpath("//form//select[@name]"):
+        selected = select.xpath(".//option[@selected]/@value") or select.xpath(".//option[1]/@value")
+        if selected:
+            fields[select.get("name")] = selected[0]
+    return fields
+
+
+def fetch_order_list(session: requests.Session, url: str, timeout: int = 30,
+                     max_pages: int = MAX_LIST_PAGES) -> Iterator[Dict[str, Any]]:
+    """Walk every page of the TC Product Orders list over HTTP, yielding each open order once.
+
+    Pages are requested one at a time as the consumer asks for more, so only the current page
+    and the set of order IDs already yielded are held. Raises if the session is not logged in.
+    """
+    response = session.get(url, timeout=timeout)
+    seen = set()
+    for page in range(1, max_pages + 1):
+        response.raise_for_status()
+        if "login.aspx" in response.url.lower():
+            raise PermissionError("HTTP session is not logged into Enrollware")
+
+        tree = lxml_html.fromstring(response.text)
+        new_on_page = 0
+        for order_ref in parse_order_list(tree, response.url):
+            key = order_ref["order_id"] or order_ref["row_key"]
+            if key in seen:
+                continue
+            seen.add(key)
+            new_on_page += 1
+            yield order_ref
+
+        postback = _next_page_postback(tree, page)
+        if postback is None:
+            return
+        if page > 1 and not new_on_page:
+            logger.warning(f"Order list page {page} repeated earlier orders; stopping the page walk")
+            return
+        form = _form_fields(tree)
+        form["__EVENTTARGET"], form["__EVENTARGUMENT"] = postback
+        response = session.post(response.url, data=form, timeout=timeout)
+        logger.debug(f"Reading order list page {page + 1}")
+
+    logger.warning(f"Order list has more than {max_pages} pages; the rest is read next cycle")
+
+
+def fetch_order(session: requests.Session, order_ref: Dict[str, Any], courses: AvailableCourses,
+                timeout: int = 30) -> Optional[Order]:
+    """Fetch and parse an order's detail page, or None if it must be read from the browser."""
+    if not order_ref.get("detail_url"):
+        return None  # postback link: only the browser can open it
+    response = session.get(order_ref["detail_url"], timeout=timeout)
+    response.raise_for_status()
+    if "login.aspx" in response.url.lower():
+        logger.warning("HTTP session is not logged in; order will be read in the browser")
+        return None
+
+    order = parse_order_detail(response.text, order_ref.get("order_id"), courses)
+    if order is not None:
+        logger.debug(f"Fetched order {order.order_id}: {len(order.lines)} product lines")
+    return order
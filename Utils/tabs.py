@@ -0,0 +1,122 @@
+import logging
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Tab:
+    name: str
+    handle: str
+    last_url: str = ""
+
+
+class TabRegistry:
+    """Named browser tabs (enrollware, ecards, shopcpr) so switching never guesses by position.
+
+    A tab is reused for as long as its window exists; ensure() only loads a page when the tab
+    is not already on it.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._tabs: Dict[str, Tab] = {}
+        self.current: Optional[str] = None
+
+    def adopt(self, name: str) -> Tab:
+        """Register the window the driver is on now under name."""
+        tab = Tab(name, self.driver.current_window_handle, self._current_url())
+        self._tabs[name] = tab
+        self.current = name
+        return tab
+
+    def has(self, name: str) -> bool:
+        tab = self._tabs.get(name)
+        if tab is None:
+            return False
+        if tab.handle not in self.driver.window_handles:
+            logger.info(f"Tab '{name}' was closed outside the registry")
+            del self._tabs[name]
+            if self.current == name:
+                self.current = None
+            return False
+        return True
+
+    def switch(self, name: str) -> bool:
+        """Switch to a registered tab. Returns False if it does not exist (any more)."""
+        if not self.has(name):
+            return False
+        if self.current == name:
+            return True
+        self._remember_url()
+        self.driver.switch_to.window(self._tabs[name].handle)
+        self.current = name
+        return True
+
+    def ensure(self, name: str, url: Optional[str] = None, reload: bool = False) -> Tab:
+        """Switch to the named tab, opening it if needed, and load url unless it is already there.
+
+        With reload the page is loaded again even when the tab is on it, for reads that must be
+        current (a reused tab keeps whatever it showed last).
+        """
+        if not self.switch(name):
+            self._remember_url()
+            known = set(self.driver.window_handles)
+            self.driver.execute_script("window.open('');")
+            new_handles = [handle for handle in self.driver.window_handles if handle not in known]
+            if not new_handles:
+                raise WebDriverException(f"Opening tab '{name}' did not create a window")
+            self.driver.switch_to.window(new_handles[0])
+            self._tabs[name] = Tab(name, new_handles[0])
+            self.current = name
+            logger.debug(f"Opened tab '{name}'")
+
+        tab = self._tabs[name]
+        if url and (reload or not self._current_url().lower().startswith(url.lower())):
+            self.driver.get(url)
+        tab.last_url = self._current_url()
+        return tab
+
+    def close(self, name: str, then: Optional[str] = None):
+        """Close the named tab and switch to then (or any remaining registered tab)."""
+        if self.has(name):
+            self.driver.switch_to.window(self._tabs[name].handle)
+            self.driver.close()
+            del self._tabs[name]
+            self.current = None
+        for candidate in [then] + list(self._tabs):
+            if candidate and self.switch(candidate):
+                return
+        remaining = self.driver.window_handles
+        if remaining:
+            self.driver.switch_to.window(remaining[0])
+
+    def close_unregistered(self):
+        """Close windows opened by the sites themselves (pop-ups) that no registered tab owns."""
+        registered = {tab.handle for tab in self._tabs.values()}
+        stray = [handle for handle in self.driver.window_handles if handle not in registered]
+        if not stray:
+            return
+        for handle in stray:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        logger.info(f"Closed {len(stray)} unregistered window(s)")
+        if self.current and self.current in self._tabs:
+            self.driver.switch_to.window(self._tabs[self.current].handle)
+
+    def last_url(self, name: str) -> str:
+        tab = self._tabs.get(name)
+        return tab.last_url if tab else ""
+
+    def _current_url(self) -> str:
+        try:
+            return self.driver.current_url
+        except WebDriverException:
+            return ""
+
+    def _remember_url(self):
+        if self.current in self._tabs:
+            self._tabs[self.current].last_url = self._current_url()
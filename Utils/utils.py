@@ -2,12 +2,13 @@ import os
 import time
 import logging
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver import ActionChains
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.select import Select
@@ -15,13 +16,66 @@ from selenium.common.exceptions import (
     TimeoutException, NoSuchElementException, WebDriverException,
     ElementNotInteractableException, StaleElementReferenceException
 )
+from Utils.locators import record_lookup
+from Utils.driver_resolver import resolve_chromedriver
+from Utils.chrome_profiles import GOLDEN_PROFILE_DIR, profile_mode, clone_profile, release_profile
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Interaction profiles: "fast" scrolls instantly, skips fixed sleeps and sets input values in one
+# script call; "safe" keeps the smooth scroll, sleeps and keystroke typing for pages that need it.
+FAST_PROFILE = "fast"
+SAFE_PROFILE = "safe"
+DEFAULT_PROFILE = os.getenv("INTERACTION_PROFILE", FAST_PROFILE).strip().lower()
+
+# Scrolls into view, sets the value through the native setter (so framework-bound inputs see it),
+# fires input/change and returns what the field now holds for verification
+FAST_INPUT_JS = """
+const element = arguments[0], value = arguments[1];
+element.scrollIntoView({block: 'center', inline: 'nearest'});
+element.focus();
+const descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value');
+if (descriptor && descriptor.set) { descriptor.set.call(element, value); } else { element.value = value; }
+element.dispatchEvent(new Event('input', {bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+return element.value;
+"""
+
+# Locator strategies SELECT_OPTION_JS can resolve; select_option hands others to select_by_text
+SELECT_OPTION_STRATEGIES = (By.ID, By.CSS_SELECTOR, By.XPATH)
+
+# Selects an option by value in one call. Without a usable cached value (none given, or the option
+# count changed) the options are read and matched by text, and returned for the cache.
+SELECT_OPTION_JS = """
+const [by, locator, text, cachedValue, cachedCount] = arguments;
+let select;
+if (by === 'id') select = document.getElementById(locator);
+else if (by === 'css selector') select = document.querySelector(locator);
+else select = document.evaluate(locator, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!select || !select.options) return {status: 'no_select'};
+const count = select.options.length;
+let value = cachedValue !== null && count === cachedCount ? cachedValue : null;
+let options = null;
+if (value === null) {
+    options = Array.from(select.options).map(o => [o.text.trim(), o.value]);
+    const option = options.find(o => o[0] === text);
+    if (!option) return {status: 'no_option', count: count, options: options};
+    value = option[1];
+}
+select.value = value;
+select.dispatchEvent(new Event('input', {bubbles: true}));
+select.dispatchEvent(new Event('change', {bubbles: true}));
+const selected = select.options[select.selectedIndex];
+if (!selected || selected.text.trim() !== text) return {status: 'mismatch', count: count, options: options};
+return {status: 'ok', count: count, options: options};
+"""
+
+# (page path, select locator) -> (option count, {visible text: value}), filled as selects are used
+_option_cache: Dict[Tuple[str, str], Tuple[int, Dict[str, str]]] = {}
+
 
 def safe_execute_with_retry(func, max_retries: int = 3, delay: float = 1.0, *args, **kwargs):
     """Execute a function with retry logic and exception handling."""
@@ -43,11 +97,41 @@ def safe_execute_with_retry(func, max_retries: int = 3, delay: float = 1.0, *arg
             raise
 
 
-def click_element_by_js(driver, by_locator, timeout: int = 10, max_retries: int = 3) -> bool:
+def wait_for(driver, by_locator, condition, timeout: int, probe: bool = False):
+    """WebDriverWait on a locator, recording lookup latency and timeouts for the locator report.
+
+    With probe the element may legitimately be missing, and a miss is reported as absent.
+    """
+    started = time.monotonic()
+    try:
+        element = WebDriverWait(driver, timeout).until(condition(by_locator))
+    except TimeoutException:
+        record_lookup(by_locator, time.monotonic() - started, found=False, probe=probe)
+        raise
+    record_lookup(by_locator, time.monotonic() - started, found=True)
+    return element
+
+
+def resolve_profile(profile: Optional[str]) -> str:
+    profile = (profile or DEFAULT_PROFILE).lower()
+    if profile not in (FAST_PROFILE, SAFE_PROFILE):
+        logger.warning(f"Unknown interaction profile '{profile}', using '{SAFE_PROFILE}'")
+        return SAFE_PROFILE
+    return profile
+
+
+def click_element_by_js(driver, by_locator, timeout: int = 10, max_retries: int = 3,
+                        profile: Optional[str] = None) -> bool:
     """Click element using JavaScript with exception handling and retry logic."""
+    fast = resolve_profile(profile) == FAST_PROFILE
+
     def _js_click():
         try:
-            element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
+            element = wait_for(driver, by_locator, EC.element_to_be_clickable, timeout)
+            if fast:
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});"
+                                      "arguments[0].click();", element)
+                return True
             driver.execute_script(
                 "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'nearest'})", element)
             time.sleep(0.5)  # Allow scroll to complete
@@ -68,11 +152,21 @@ def click_element_by_js(driver, by_locator, timeout: int = 10, max_retries: int
         return False
 
 
-def input_element(driver, by_locator, text: str, timeout: int = 10, max_retries: int = 3) -> bool:
+def input_element(driver, by_locator, text: str, timeout: int = 10, max_retries: int = 3,
+                  profile: Optional[str] = None) -> bool:
     """Input text with comprehensive exception handling and validation."""
+    fast = resolve_profile(profile) == FAST_PROFILE
+
     def _input_text():
         try:
-            element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
+            element = wait_for(driver, by_locator, EC.element_to_be_clickable, timeout)
+            if fast:
+                actual_value = driver.execute_script(FAST_INPUT_JS, element, text)
+                if actual_value == text:
+                    return True
+                # Masked or script-guarded fields reject programmatic values; type them instead
+                logger.warning(f"Fast input verification failed for {by_locator}, falling back to typing")
+
             driver.execute_script(
                 "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'nearest'})", element)
             time.sleep(0.5)
@@ -119,14 +213,18 @@ def input_element(driver, by_locator, text: str, timeout: int = 10, max_retries:
         return False
 
 
-def move_to_element(driver, locator, timeout: int = 10, max_retries: int = 3) -> bool:
+def move_to_element(driver, locator, timeout: int = 10, max_retries: int = 3,
+                    profile: Optional[str] = None) -> bool:
     """Move to element with exception handling."""
+    fast = resolve_profile(profile) == FAST_PROFILE
+
     def _move():
         try:
-            element = WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(locator))
+            element = wait_for(driver, locator, EC.visibility_of_element_located, timeout)
             actions = ActionChains(driver)
             actions.move_to_element(element).perform()
-            time.sleep(0.3)
+            if not fast:
+                time.sleep(0.3)
             return True
         except TimeoutException:
             logger.error(f"Element not visible for hover within {timeout} seconds: {locator}")
@@ -145,7 +243,7 @@ def move_to_element(driver, locator, timeout: int = 10, max_retries: int = 3) ->
 def get_element_text(driver, by_locator, timeout: int = 40, default: str = "") -> str:
     """Get element text with exception handling and default value."""
     try:
-        element = WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(by_locator))
+        element = wait_for(driver, by_locator, EC.visibility_of_element_located, timeout)
         text = element.text.strip()
         return text if text else default
     except TimeoutException:
@@ -159,16 +257,26 @@ def get_element_text(driver, by_locator, timeout: int = 40, default: str = "") -
         return default
 
 
-def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optional[webdriver.Chrome]:
-    """Create undetected Chrome driver with comprehensive error handling."""
+def get_undetected_driver(headless: bool = False, max_retries: int = 3,
+                          label: str = "browser") -> Optional[webdriver.Chrome]:
+    """Create undetected Chrome driver with comprehensive error handling.
+
+    In the default 'clone' profile mode each driver runs on its own pruned copy of chrome-dir,
+    so several browsers can run side by side; release it with quit_driver().
+    """
     for attempt in range(max_retries):
         driver = None
+        clone_dir = None
         try:
             options = webdriver.ChromeOptions()
-            path = rf'{BASE_DIR}\chrome-dir'
+            if profile_mode() == "clone":
+                clone_dir = clone_profile(label)
+                path = clone_dir
+            else:
+                path = GOLDEN_PROFILE_DIR
 
             # Ensure chrome-dir exists
-            if not os.path.exists(path):
+            if path and not os.path.exists(path):
                 try:
                     os.makedirs(path, exist_ok=True)
                     logger.info(f"Created chrome directory: {path}")
@@ -195,7 +303,8 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
             options.add_argument("--disable-ipc-flooding-protection")
 
             if headless:
-                options.add_argument("--headless")
+                # The new headless mode is the full browser without a window, so the sites behave as headed
+                options.add_argument("--headless=new")
                 options.add_argument("--disable-gpu")
                 options.add_argument("--window-size=1920,1080")
             else:
@@ -205,12 +314,16 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
 
-            # Initialize Chrome driver
-            service = Service(ChromeDriverManager().install())
+            # Initialize Chrome driver from the locally pinned binary
+            started = time.monotonic()
+            driver_path = resolve_chromedriver()
+            if not driver_path:
+                logger.error("No chromedriver available")
+                return None
+            resolved = time.monotonic()
+            service = Service(driver_path)
             driver = webdriver.Chrome(service=service, options=options)
-
-            # Allow the browser to fully initialize
-            time.sleep(3)
+            driver.profile_clone_dir = clone_dir
 
             # Enhanced fingerprinting protection
             stealth_js = """
@@ -223,7 +336,8 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
 
             # Test driver functionality
             driver.get("data:,")
-            logger.info(f"Chrome driver initialized successfully (attempt {attempt + 1})")
+            logger.info(f"Chrome driver initialized successfully (attempt {attempt + 1}) in "
+                        f"{time.monotonic() - started:.2f}s (driver resolution {resolved - started:.2f}s)")
             return driver
 
         except Exception as e:
@@ -233,6 +347,7 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
                     driver.quit()
                 except:
                     pass
+            release_profile(clone_dir)
 
             if attempt < max_retries - 1:
                 logger.info(f"Retrying driver creation... Attempts left: {max_retries - attempt - 1}")
@@ -244,10 +359,18 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
     return None
 
 
+def quit_driver(driver):
+    """Quit the browser and delete its cloned profile, if it had one."""
+    try:
+        driver.quit()
+    finally:
+        release_profile(getattr(driver, "profile_clone_dir", None))
+
+
 def check_element_exists(driver, by_locator, timeout: int = 3) -> bool:
     """Check if element exists with proper exception handling."""
     try:
-        WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(by_locator))
+        wait_for(driver, by_locator, EC.visibility_of_element_located, timeout, probe=True)
         return True
     except TimeoutException:
         return False
@@ -262,7 +385,7 @@ def select_by_text(driver, by_locator, text: str, timeout: int = 10, max_retries
     """Select dropdown option by text with exception handling."""
     def _select():
         try:
-            select_element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
+            select_element = wait_for(driver, by_locator, EC.element_to_be_clickable, timeout)
             select = Select(select_element)
 
             # Check if option exists
@@ -298,6 +421,54 @@ def select_by_text(driver, by_locator, text: str, timeout: int = 10, max_retries
         return False
 
 
+def select_option(driver, by_locator, text: str, timeout: int = 10) -> bool:
+    """Select a dropdown option by its visible text, setting the cached option value in one call.
+
+    Option values are cached per page and select, and re-read when the option count changes or
+    a cached value no longer shows the text. The call waits only while the select is absent or
+    still empty (a dependent dropdown loading); an option missing from a filled list fails at once.
+    Locators the script cannot resolve (e.g. by name) are selected through select_by_text instead.
+    """
+    if by_locator[0] not in SELECT_OPTION_STRATEGIES:
+        return select_by_text(driver, by_locator, text, timeout)
+
+    key = (urlparse(driver.current_url).path.lower(), by_locator[1])
+    started = time.monotonic()
+    while True:
+        count, values = _option_cache.get(key, (-1, {}))
+        try:
+            outcome = driver.execute_script(SELECT_OPTION_JS, by_locator[0], by_locator[1], text,
+                                            values.get(text), count) or {}
+        except WebDriverException as e:
+            logger.error(f"Select operation failed: {e}")
+            return False
+
+        status = outcome.get("status")
+        if outcome.get("options") is not None:
+            _option_cache[key] = (outcome["count"], dict(outcome["options"]))
+        if status == "ok":
+            record_lookup(by_locator, time.monotonic() - started, found=True)
+            return True
+        if status == "mismatch" and outcome.get("options") is None:
+            # The cached value now belongs to another option; read the options again
+            _option_cache.pop(key, None)
+            continue
+
+        loading = status == "no_select" or (status == "no_option" and outcome.get("count", 0) <= 1)
+        if loading and time.monotonic() - started < timeout:
+            time.sleep(0.1)
+            continue
+
+        record_lookup(by_locator, time.monotonic() - started, found=status != "no_select")
+        if status == "no_select":
+            logger.error(f"Select element not found within {timeout} seconds: {by_locator}")
+        elif status == "no_option":
+            logger.error(f"Option '{text}' not found. Available options: {[option for option, _ in outcome['options']]}")
+        else:
+            logger.warning(f"Selection verification failed. Expected: '{text}'")
+        return False
+
+
 def wait_for_page_load(driver, timeout: int = 30) -> bool:
     """Wait for page to fully load with exception handling."""
     try:
@@ -337,7 +508,7 @@ def safe_navigate_to_url(driver, url: str, max_retries: int = 3) -> bool:
 def get_element_attribute(driver, by_locator, attribute: str, timeout: int = 10, default: str = "") -> str:
     """Get element attribute with exception handling."""
     try:
-        element = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(by_locator))
+        element = wait_for(driver, by_locator, EC.presence_of_element_located, timeout)
         attr_value = element.get_attribute(attribute)
         return attr_value if attr_value is not None else default
     except TimeoutException:
@@ -0,0 +1,200 @@
+"""Command line entry point.
+
+Every subcommand imports what it needs inside its handler, so `status` never loads selenium,
+the course CSV or Tk, and `--help` answers instantly. Pipeline commands run without a display
+when given --headless (or HEADLESS=1).
+
+    python cli.py status
+    python cli.py scan [--plan]
+    python cli.py run-once
+    python cli.py daemon [--ui]
+    python cli.py process-order <order-id>
+    python cli.py bench [--browser]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").lower() in ("1", "true", "yes")
+
+
+def _load_env():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def _start():
+    """Import the automation (selenium, courses, ...) and configure logging."""
+    import main
+    main.start_application()
+    return main
+
+
+def cmd_status(args) -> int:
+    """Progress of a running daemon from the control API, else the state on disk."""
+    import urllib.request
+    import urllib.error
+
+    _load_env()
+    port = int(os.getenv("CONTROL_API_PORT", 8765))
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/status")
+    token = os.getenv("CONTROL_API_TOKEN")
+    if token:
+        request.add_header("X-Control-Token", token)
+
+    try:
+        with urllib.request.urlopen(request, timeout=args.timeout) as response:
+            status = json.load(response)
+        running = True
+    except (urllib.error.URLError, OSError, ValueError):
+        from ui_purchasing_toggle import load_toggle_state
+        status = {"status": "not running", "purchasing_enabled": load_toggle_state()}
+        running = False
+
+    from journal import ActionJournal
+    unresolved = ActionJournal().unresolved(include_pending=not running)
+    status["unresolved_journal_entries"] = len(unresolved)
+
+    if args.json:
+        print(json.dumps(status, indent=2))
+    else:
+        for key, value in status.items():
+            print(f"{key:<28} {value}")
+        for entry in unresolved:
+            print(f"  {entry['id']}  {entry['kind']}  order {entry['order_id']}  {entry['quantity']} x {entry['sku']}")
+    return 0
+
+
+def cmd_scan(args) -> int:
+    """List the orders waiting in TC Product Orders; --plan also reads them and prints the dry-run plan."""
+    main = _start()
+    if args.plan:
+        main.main(dry_run=True, headless=args.headless)
+        return 0
+
+    processor = main.OrderProcessor(args.headless)
+    if not processor.initialize():
+        return 1
+    try:
+        scanned = main.scan_orders(processor)
+    finally:
+        processor.cleanup()
+    if scanned is None:
+        return 1
+
+    rows_to_process, redcross_rows = scanned
+    for kind, order_refs in (("aha", rows_to_process), ("redcross", redcross_rows)):
+        for order_ref in order_refs:
+            print(f"{kind:<9} {order_ref.get('order_id')}  {order_ref.get('detail_url') or '(postback link)'}")
+    print(f"{len(rows_to_process)} AHA and {len(redcross_rows)} Red Cross orders waiting")
+    return 0
+
+
+def cmd_run_once(args) -> int:
+    """A single scheduled cycle, including the summary emails, then exit."""
+    main = _start()
+    main.run_cycle(args.headless)
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    """The 15-minute schedule with the control API. The Tk toggle window is opt-in here."""
+    main = _start()
+    main.run_daemon(show_toggle_ui=args.ui, headless=args.headless)
+    return 0
+
+
+def cmd_process_order(args) -> int:
+    main = _start()
+    return 0 if main.process_order(args.order_id, args.headless) else 1
+
+
+def _timed(label: str, timings: list, action):
+    started = time.perf_counter()
+    result = action()
+    timings.append((label, time.perf_counter() - started))
+    return result
+
+
+def cmd_bench(args) -> int:
+    """Where startup time goes: each import in load order and, with --browser, Chrome start, login and scan."""
+    import importlib
+
+    timings = []
+    # The status command's imports first, then the pipeline's
+    for module in ("journal", "ui_purchasing_toggle", "selenium.webdriver", "requests", "lxml.html",
+                   "courses", "Utils.functions", "main"):
+        try:
+            _timed(f"import {module}", timings, lambda: importlib.import_module(module))
+        except ImportError as e:
+            print(f"import {module} failed: {e}")
+            return 1
+
+    if args.browser:
+        main = sys.modules["main"]
+        from Utils.functions import get_orders_to_process
+        main.setup_logging()
+        processor = main.OrderProcessor(args.headless)
+        try:
+            if not _timed("browser start", timings, processor.initialize):
+                return 1
+            if not _timed("enrollware login", timings,
+                          lambda: main.login_to_enrollware_and_navigate_to_tc_product_orders(processor.driver)):
+                return 1
+            _timed("order scan", timings,
+                   lambda: get_orders_to_process(processor.driver, "non-redcross"))
+        finally:
+            processor.cleanup()
+
+    for label, seconds in timings:
+        print(f"{label:<28} {seconds * 1000:>10.1f} ms")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Enrollware / eCards order automation.")
+    browser = argparse.ArgumentParser(add_help=False)
+    browser.add_argument("--headless", action="store_true", default=_env_flag("HEADLESS"),
+                         help="run Chrome without a window (default from HEADLESS)")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    status = commands.add_parser("status", help="show daemon progress, purchasing state and unresolved journal entries")
+    status.add_argument("--json", action="store_true", help="print JSON")
+    status.add_argument("--timeout", type=float, default=1.0, help="seconds to wait for the control API")
+    status.set_defaults(handler=cmd_status)
+
+    scan = commands.add_parser("scan", parents=[browser], help="list the orders waiting to be processed")
+    scan.add_argument("--plan", action="store_true", help="also read the orders and print the plan (dry run)")
+    scan.set_defaults(handler=cmd_scan)
+
+    run_once = commands.add_parser("run-once", parents=[browser], help="process all waiting orders once and exit")
+    run_once.set_defaults(handler=cmd_run_once)
+
+    daemon = commands.add_parser("daemon", parents=[browser], help="run every 15 minutes with the control API")
+    daemon.add_argument("--ui", action="store_true", help="show the Tk purchasing toggle window")
+    daemon.set_defaults(handler=cmd_daemon)
+
+    process_order = commands.add_parser("process-order", parents=[browser], help="process one order by its ID")
+    process_order.add_argument("order_id")
+    process_order.set_defaults(handler=cmd_process_order)
+
+    bench = commands.add_parser("bench", parents=[browser], help="time startup, imports and optionally browser start, login and scan")
+    bench.add_argument("--browser", action="store_true", help="also start Chrome, log in and scan the order list")
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def run(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,130 @@
+import os
+import json
+import logging
+import threading
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ui_purchasing_toggle import purchasing_enabled, set_purchasing_enabled, toggle_purchasing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTROL_PORT = 8765
+
+# Set by POST /run to cut the scheduler's wait short
+run_now_event = threading.Event()
+
+
+class RunState:
+    """Thread-safe snapshot of the scheduler and current cycle, served by the control API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {
+            "status": "starting",
+            "run_count": 0,
+            "cycle_started_at": None,
+            "next_run_at": None,
+            "current_order": None,
+            "orders_total": 0,
+            "orders_done": 0,
+            "successful": 0,
+            "failed": 0,
+        }
+
+    def update(self, **fields):
+        with self._lock:
+            self._state.update(fields)
+
+    def start_cycle(self, run_count: int):
+        self.update(status="running", run_count=run_count, cycle_started_at=datetime.now().isoformat(timespec="seconds"),
+                    next_run_at=None, current_order=None, orders_total=0, orders_done=0, successful=0, failed=0)
+
+    def record_order(self, success: bool):
+        with self._lock:
+            self._state["orders_done"] += 1
+            self._state["successful" if success else "failed"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._state)
+
+
+run_state = RunState()
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """GET /status, GET|POST /purchasing, POST /purchasing/toggle, POST /run."""
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/status":
+            self._send_json(200, {**run_state.snapshot(), "purchasing_enabled": purchasing_enabled()})
+        elif self.path == "/purchasing":
+            self._send_json(200, {"purchasing_enabled": purchasing_enabled()})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path == "/purchasing":
+            body = self._read_json()
+            if body is None or not isinstance(body.get("enabled"), bool):
+                self._send_json(400, {"error": 'expected JSON body {"enabled": true|false}'})
+                return
+            set_purchasing_enabled(body["enabled"])
+            logger.info(f"Purchasing {'enabled' if body['enabled'] else 'disabled'} via control API")
+            self._send_json(200, {"purchasing_enabled": purchasing_enabled()})
+        elif self.path == "/purchasing/toggle":
+            enabled = toggle_purchasing()
+            logger.info(f"Purchasing toggled via control API: {'enabled' if enabled else 'disabled'}")
+            self._send_json(200, {"purchasing_enabled": enabled})
+        elif self.path == "/run":
+            run_now_event.set()
+            logger.info("Immediate run requested via control API")
+            self._send_json(202, {"run_requested": True, "status": run_state.snapshot()["status"]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _authorized(self) -> bool:
+        token = os.getenv("CONTROL_API_TOKEN")
+        if token and self.headers.get("X-Control-Token") != token:
+            self._send_json(401, {"error": "unauthorized"})
+            return False
+        return True
+
+    def _read_json(self) -> Optional[Dict[str, Any]]:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            return body if isinstance(body, dict) else None
+        except (ValueError, json.JSONDecodeError):
+            return None
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Control API: {format % args}")
+
+
+def start_control_api(port: Optional[int] = None) -> Optional[ThreadingHTTPServer]:
+    """Serve the control API on localhost in a daemon thread. Returns None if the port is taken."""
+    port = port or int(os.getenv("CONTROL_API_PORT", DEFAULT_CONTROL_PORT))
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), ControlRequestHandler)
+    except OSError as e:
+        logger.error(f"Control API could not bind to 127.0.0.1:{port}: {e}")
+        return None
+
+    threading.Thread(target=server.serve_forever, name="control-api", daemon=True).start()
+    logger.info(f"Control API listening on http://127.0.0.1:{port}")
+    return server
@@ -1,99 +1,39 @@
-import csv
-import os
 import logging
 from typing import Dict, Optional, Tuple
+from reference_data import get_reference_data
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def is_acls_pals_course(course_name: str) -> bool:
+    """Check if course is ACLS or PALS based on course name."""
+    if not course_name:
+        return False
+
+    course_upper = course_name.upper()
+    return 'ACLS' in course_upper or 'PALS' in course_upper
+
+
 class AvailableCourses:
+    """Course lookups backed by the compiled reference data bundle (see reference_data.py).
+
+    Raises ReferenceDataError when the course data is malformed, rather than running on a guess.
+    """
+
     def __init__(self):
         self.available_courses = {}
         self.course_categories = {}  # SKU -> True (individual) / False (bundle)
-        self.csv_path = os.path.join('data', 'courses.csv')
-        self._load_courses_from_csv()
-
-    def _load_courses_from_csv(self) -> bool:
-        """Load courses from CSV file with comprehensive error handling."""
-        try:
-            if not os.path.exists(self.csv_path):
-                logger.error(f"Courses CSV file not found: {self.csv_path}")
-                self._load_fallback_courses()
-                return False
-
-            with open(self.csv_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-
-                # Validate CSV headers
-                required_headers = ['SKU', 'Name', 'Category']
-                if not all(header in reader.fieldnames for header in required_headers):
-                    logger.error(f"CSV missing required headers. Expected: {required_headers}, Found: {reader.fieldnames}")
-                    self._load_fallback_courses()
-                    return False
-
-                courses_loaded = 0
-                for row_num, row in enumerate(reader, start=2):  # Start at 2 because of header
-                    try:
-                        sku = row.get('SKU', '').strip()
-                        name = row.get('Name', '').strip()
-                        category_str = row.get('Category', '').strip().lower()
-
-                        # Validate required fields
-                        if not all([sku, name, category_str]):
-                            logger.warning(f"Row {row_num}: Missing required fields - SKU: '{sku}', Name: '{name}', Category: '{category_str}'")
-                            continue
-
-                        # Parse category boolean
-                        if category_str in ['true', '1', 'yes', 'individual']:
-                            category = True
-                        elif category_str in ['false', '0', 'no', 'bundle']:
-                            category = False
-                        else:
-                            logger.warning(f"Row {row_num}: Invalid category value '{category_str}' for SKU {sku}. Expected True/False")
-                            continue
-
-                        # Store course data
-                        self.available_courses[sku] = name
-                        self.course_categories[sku] = category
-                        courses_loaded += 1
-
-                        logger.debug(f"Loaded course: {sku} -> {name} ({'Individual' if category else 'Bundle'})")
-
-                    except Exception as e:
-                        logger.error(f"Error processing CSV row {row_num}: {e}")
-                        continue
-
-                if courses_loaded > 0:
-                    logger.info(f"Successfully loaded {courses_loaded} courses from CSV")
-                    return True
-                else:
-                    logger.error("No valid courses found in CSV file")
-                    self._load_fallback_courses()
-                    return False
-
-        except FileNotFoundError:
-            logger.error(f"Courses CSV file not found: {self.csv_path}")
-            self._load_fallback_courses()
-            return False
-        except Exception as e:
-            logger.error(f"Error reading courses CSV: {e}")
-            self._load_fallback_courses()
-            return False
-
-    def _load_fallback_courses(self):
-        """Load fallback hardcoded courses if CSV fails."""
-        logger.warning("Loading fallback hardcoded courses")
-        self.available_courses = {
-            "20-3001": "BLS Provider",
-            "20-3002": "Heartsaver First Aid CPR AED",
-            "20-3004": "Heartsaver CPR AED",
-            "20-3005": "Heartsaver First Aid",
-            "20-3011": "Heartsaver for K-12 Schools",
-            "20-3016": "BLS Instructor",
-            "20-3018": "Advisor: BLS"
-        }
-        # Assume all fallback courses are individual courses
-        self.course_categories = {sku: True for sku in self.available_courses.keys()}
+        self.shopcpr_hints = {}  # SKU -> {"query": ..., "via_details": ...}
+        self.version = None
+        self._load_courses()
+
+    def _load_courses(self, reload: bool = False):
+        bundle = get_reference_data(reload)
+        courses = bundle["courses"]
+        self.available_courses = {sku: course["name"] for sku, course in courses.items()}
+        self.course_categories = {sku: course["individual"] for sku, course in courses.items()}
+        self.shopcpr_hints = {sku: course["shopcpr"] for sku, course in courses.items()}
+        self.version = bundle["version"]
 
     def is_course_available(self, product_code: str) -> bool:
         """Check if a course is available."""
@@ -133,12 +73,18 @@ class AvailableCourses:
         else:
             return "training_site"
 
+    def shopcpr_search(self, product_code: str) -> Tuple[str, bool]:
+        """Shop CPR search text for a SKU and whether it is added to the cart from its details page."""
+        hint = self.shopcpr_hints.get(product_code)
+        if hint is None:
+            return product_code, not self.is_individual_course(product_code)
+        return hint["query"], hint["via_details"]
+
     def reload_courses(self) -> bool:
-        """Reload courses from CSV file."""
-        logger.info("Reloading courses from CSV file")
-        self.available_courses.clear()
-        self.course_categories.clear()
-        return self._load_courses_from_csv()
+        """Reload courses, recompiling the bundle if the CSV changed."""
+        logger.info("Reloading courses from reference data")
+        self._load_courses(reload=True)
+        return True
 
     def get_all_courses(self) -> Dict[str, Dict[str, any]]:
         """Get all courses with their details."""
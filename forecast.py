@@ -0,0 +1,141 @@
+import os
+import csv
+import math
+import logging
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+from orders import Order
+
+logger = logging.getLogger(__name__)
+
+ORDER_HISTORY_CSV = "order_history.csv"
+FAILED_ORDERS_CSV = "failed_orders.csv"
+HISTORY_FIELDS = ["date", "order_id", "sku", "quantity", "course_name"]
+
+# Days of demand the inventory should cover, and how far back demand is learned from
+COVER_DAYS = 7
+HISTORY_WINDOW_DAYS = 56
+HALF_LIFE_DAYS = 14
+# Each distinct stock-out in failed_orders.csv adds this share of extra safety stock (capped)
+STOCKOUT_SAFETY_STEP = 0.1
+STOCKOUT_SAFETY_CAP = 0.5
+
+
+def _history_order_ids(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return {row.get("order_id", "") for row in csv.DictReader(f)}
+
+
+def record_demand(orders: Iterable[Order], path: str = ORDER_HISTORY_CSV) -> int:
+    """Append the lines of newly seen orders to the demand history (each order ID is recorded once)."""
+    known = _history_order_ids(path)
+    today = date.today().isoformat()
+    new_rows = []
+    for order in orders:
+        if not order.order_id or order.order_id in known:
+            continue
+        for line in order.lines:
+            new_rows.append({
+                "date": today,
+                "order_id": order.order_id,
+                "sku": line.sku,
+                "quantity": line.quantity,
+                "course_name": line.course_name,
+            })
+
+    if not new_rows:
+        return 0
+
+    file_exists = os.path.isfile(path)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=HISTORY_FIELDS)
+        if not file_exists:
+            writer.writeheader()
+        writer.writerows(new_rows)
+    return len(new_rows)
+
+
+class DemandForecaster:
+    """Learn per-SKU daily demand from order history and derive target stock levels."""
+
+    def __init__(self, history_path: str = ORDER_HISTORY_CSV, failed_path: str = FAILED_ORDERS_CSV,
+                 cover_days: int = COVER_DAYS, today: Optional[date] = None):
+        self.history_path = history_path
+        self.failed_path = failed_path
+        self.cover_days = cover_days
+        self.today = today or date.today()
+        self.daily_demand: Dict[str, float] = {}
+        self.stockouts: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        """Exponentially weighted daily demand over the history window, plus stock-out counts."""
+        decay = math.log(2) / HALF_LIFE_DAYS
+        start = self.today - timedelta(days=HISTORY_WINDOW_DAYS)
+        weighted: Dict[str, float] = {}
+
+        if os.path.exists(self.history_path):
+            with open(self.history_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    try:
+                        day = datetime.strptime(row["date"], "%Y-%m-%d").date()
+                        quantity = int(row["quantity"])
+                    except (KeyError, ValueError):
+                        continue
+                    if day < start or day > self.today:
+                        continue
+                    age = (self.today - day).days
+                    weighted[row["sku"]] = weighted.get(row["sku"], 0.0) + quantity * math.exp(-decay * age)
+
+        # Sum of the decay weights over the window turns weighted totals into a per-day rate
+        weight_sum = sum(math.exp(-decay * age) for age in range(HISTORY_WINDOW_DAYS + 1))
+        self.daily_demand = {sku: total / weight_sum for sku, total in weighted.items()}
+
+        if os.path.exists(self.failed_path):
+            seen = set()
+            with open(self.failed_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    reason = (row.get("failure_reason") or "").lower()
+                    if "not available" not in reason and "purchase" not in reason:
+                        continue
+                    # The same failing order is logged every cycle; count it once
+                    key = (row.get("name"), row.get("product_code"), row.get("quantity"))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    sku = row.get("product_code", "")
+                    self.stockouts[sku] = self.stockouts.get(sku, 0) + 1
+                    if sku not in self.daily_demand:
+                        # Demand we never fulfilled still counts, spread over the window
+                        quantity = row.get("quantity", "")
+                        self.daily_demand[sku] = (int(quantity) if quantity.isdigit() else 1) / HISTORY_WINDOW_DAYS
+
+    def target_stock(self, sku: str) -> int:
+        rate = self.daily_demand.get(sku, 0.0)
+        if rate <= 0:
+            return 0
+        safety = min(STOCKOUT_SAFETY_CAP, STOCKOUT_SAFETY_STEP * self.stockouts.get(sku, 0))
+        return math.ceil(rate * self.cover_days * (1 + safety))
+
+    def targets(self) -> Dict[str, int]:
+        targets = {}
+        for sku in self.daily_demand:
+            target = self.target_stock(sku)
+            if target > 0:
+                targets[sku] = target
+        return targets
+
+    def replenishment_needs(self, inventory: Dict[str, int], max_quantity: Optional[int] = None) -> List[Dict[str, Any]]:
+        """SKUs below their target level, as {"sku", "qty"} items (the stock summary format)."""
+        needs = []
+        for sku, target in sorted(self.targets().items()):
+            shortfall = target - inventory.get(sku, 0)
+            if shortfall <= 0:
+                continue
+            if max_quantity:
+                shortfall = min(shortfall, max_quantity)
+            needs.append({"sku": sku, "qty": shortfall})
+        return needs
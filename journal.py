@@ -0,0 +1,298 @@
+import os
+import json
+import uuid
+import logging
+import argparse
+import threading
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = "action_journal.jsonl"
+# Settled entries older than this are dropped on compaction (interrupted ones are always kept)
+RETENTION_DAYS = 7
+
+# Actions that cost money or eCards: an interrupted one may or may not have gone through,
+# so it is never repeated automatically. Status changes and error comments are safe to redo.
+NON_IDEMPOTENT_KINDS = {"purchase", "assignment"}
+
+# Entry states
+PENDING = "pending"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class ActionJournal:
+    """Write-ahead journal of state-changing browser actions (purchases, assignments, status
+    changes, error comments).
+
+    An intent line is fsync'd before the action runs and an outcome line after it, so after a
+    crash every action is known to have succeeded, failed or been interrupted. Interrupted
+    purchases and assignments block the same (order, SKU) until resolved from the command line.
+
+    Only the process holding the journal's lock file (see acquire()) may reconcile, compact or
+    run purchases and assignments; another one running alongside it (e.g. a one-off scan next to
+    the daemon) only reads it.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    @property
+    def owned(self) -> bool:
+        return self._lock_file is not None
+
+    def acquire(self) -> bool:
+        """Take the journal's cross-process lock, held until close() or the process exits.
+
+        Returns False, without waiting, if another process holds it.
+        """
+        if self._lock_file is not None:
+            return True
+        lock_file = open(self.path + ".lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        # What the previous holder wrote since this journal was loaded
+        self._entries = {}
+        self._load()
+        return True
+
+    def close(self):
+        """Release the cross-process lock (closing the file releases it)."""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write; the intent before it is what counts
+                    logger.warning(f"Ignoring unreadable journal line {line_number}")
+                    continue
+                self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]):
+        entry_id = record.get("id")
+        if record.get("event") == "intent":
+            self._entries[entry_id] = {**record, "state": PENDING}
+            return
+        entry = self._entries.get(entry_id)
+        if entry is None:
+            return
+        entry["state"] = record.get("state", entry["state"])
+        for key in ("error", "note", "finished_at"):
+            if key in record:
+                entry[key] = record[key]
+
+    def _append(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            created = not os.path.exists(self.path)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if created:
+                self._fsync_directory()
+            self._apply(record)
+
+    def _fsync_directory(self):
+        if os.name != "posix":
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def begin(self, kind: str, order_id: str, sku: str = "", quantity: Any = "", line: Any = "", **details) -> str:
+        entry_id = uuid.uuid4().hex[:12]
+        self._append({"id": entry_id, "event": "intent", "kind": kind, "order_id": str(order_id or ""),
+                      "sku": sku, "line": str(line), "quantity": str(quantity), "details": details,
+                      "started_at": _now()})
+        return entry_id
+
+    def finish(self, entry_id: str, ok: bool, error: str = ""):
+        record = {"id": entry_id, "event": "outcome", "state": SUCCEEDED if ok else FAILED, "finished_at": _now()}
+        if error:
+            record["error"] = error
+        self._append(record)
+
+    def resolve(self, entry_id: str, done: bool, note: str = "") -> bool:
+        """Settle an interrupted entry after checking the site by hand: done=True if it went through."""
+        if entry_id not in self._entries:
+            return False
+        self._append({"id": entry_id, "event": "outcome", "state": SUCCEEDED if done else FAILED,
+                      "note": note or "resolved manually", "finished_at": _now()})
+        return True
+
+    def latest_state(self, kind: str, order_id: str, sku: str = "", line: Any = "") -> Optional[str]:
+        """State of the most recent entry for this action, or None if it was never attempted.
+
+        line tells apart two lines of one order with the same SKU (e.g. two students on one course).
+        Entries written before lines were journaled have no line and match any.
+        """
+        matching = [entry for entry in self._entries.values()
+                    if entry["kind"] == kind and entry["order_id"] == str(order_id or "") and entry["sku"] == sku
+                    and entry.get("line", str(line)) == str(line)]
+        return matching[-1]["state"] if matching else None
+
+    def unresolved(self, include_pending: bool = False) -> List[Dict[str, Any]]:
+        states = (INTERRUPTED, PENDING) if include_pending else (INTERRUPTED,)
+        return [entry for entry in self._entries.values()
+                if entry["state"] in states and entry["kind"] in NON_IDEMPOTENT_KINDS]
+
+    def reconcile(self) -> List[Dict[str, Any]]:
+        """Run once at startup: mark actions left pending by a crash as interrupted and compact.
+
+        Returns the interrupted purchases and assignments that need a manual check. Without the
+        lock, pending entries may belong to the process that holds it, so nothing is changed.
+        """
+        if not self.owned:
+            logger.warning("Journal is locked by another process; not reconciling it")
+            return self.unresolved()
+        for entry in list(self._entries.values()):
+            if entry["state"] == PENDING:
+                self._append({"id": entry["id"], "event": "outcome", "state": INTERRUPTED, "finished_at": _now()})
+                logger.warning(f"Journal: {entry['kind']} for order {entry['order_id']} {entry['sku']} "
+                               f"was interrupted by a restart (entry {entry['id']})")
+        self.compact()
+
+        unresolved = self.unresolved()
+        for entry in unresolved:
+            logger.error(f"Journal: {entry['kind']} of {entry['quantity']} x {entry['sku']} for order "
+                         f"{entry['order_id']} may or may not have completed. It will not be repeated until "
+                         f"resolved with: python journal.py --resolve {entry['id']} --done|--not-done")
+        return unresolved
+
+    def compact(self):
+        """Drop entries of completed orders and old settled entries, keeping anything unresolved.
+
+        Only done while holding the lock: the rewrite would lose lines another process appends.
+        """
+        if not self.owned:
+            return
+        completed_orders = {entry["order_id"] for entry in self._entries.values()
+                            if entry["kind"] == "status_change" and entry["state"] == SUCCEEDED}
+        cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).isoformat(timespec="seconds")
+        keep = [entry for entry in self._entries.values()
+                if entry["state"] in (PENDING, INTERRUPTED)
+                or (entry["order_id"] not in completed_orders and entry["started_at"] >= cutoff)]
+        if len(keep) == len(self._entries):
+            return
+
+        temp_path = self.path + ".tmp"
+        with self._lock:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for entry in keep:
+                    intent = {key: value for key, value in entry.items()
+                              if key not in ("state", "error", "note", "finished_at")}
+                    f.write(json.dumps(intent, ensure_ascii=False) + "\n")
+                    if entry["state"] != PENDING:
+                        outcome = {"id": entry["id"], "event": "outcome", "state": entry["state"]}
+                        outcome.update({key: entry[key] for key in ("error", "note", "finished_at") if key in entry})
+                        f.write(json.dumps(outcome, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._fsync_directory()
+            self._entries = {entry["id"]: entry for entry in keep}
+
+    def run(self, kind: str, order_id: str, action: Callable[[], bool], sku: str = "",
+            quantity: Any = "", line: Any = "", **details) -> Tuple[bool, str]:
+        """Run action under the journal. Returns (success, note).
+
+        A purchase or assignment that already succeeded for this order, SKU and line is not
+        repeated (returns success); one that was interrupted, or is attempted without holding the
+        journal's lock, is refused. Raises ValueError for a purchase or assignment without an order
+        ID, which could not be told apart from unrelated ones.
+        """
+        if kind in NON_IDEMPOTENT_KINDS:
+            if not order_id:
+                raise ValueError(f"Refusing to journal a {kind} of {sku} without an order ID")
+            if not self.owned:
+                note = (f"{kind} of {sku} for order {order_id} refused: another automation process "
+                        f"holds the action journal")
+                logger.error(note)
+                return False, note
+            state = self.latest_state(kind, order_id, sku, line)
+            if state == SUCCEEDED:
+                note = f"{kind} of {sku} for order {order_id} already completed in an earlier run; not repeating it"
+                logger.info(note)
+                return True, note
+            if state == INTERRUPTED:
+                note = (f"{kind} of {sku} for order {order_id} was interrupted in an earlier run; "
+                        f"verify it and resolve the journal entry before retrying")
+                logger.error(note)
+                return False, note
+
+        entry_id = self.begin(kind, order_id, sku, quantity, line, **details)
+        try:
+            ok = bool(action())
+        except Exception as e:
+            self.finish(entry_id, False, str(e))
+            raise
+        self.finish(entry_id, ok)
+        return ok, ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and resolve the action journal.")
+    parser.add_argument("--path", default=JOURNAL_PATH)
+    parser.add_argument("--resolve", metavar="ENTRY_ID", help="settle an interrupted entry")
+    outcome = parser.add_mutually_exclusive_group()
+    outcome.add_argument("--done", action="store_true", help="the action went through (it will be skipped)")
+    outcome.add_argument("--not-done", action="store_true", help="the action did not happen (it will be retried)")
+    parser.add_argument("--note", default="")
+    args = parser.parse_args()
+
+    journal = ActionJournal(args.path)
+    if args.resolve:
+        if not (args.done or args.not_done):
+            parser.error("--resolve needs --done or --not-done")
+        if not journal.resolve(args.resolve, args.done, args.note):
+            parser.error(f"No journal entry {args.resolve}")
+        print(f"Entry {args.resolve} resolved as {'done' if args.done else 'not done'}")
+        return
+
+    # Pending entries are interrupted ones the automation has not reconciled yet (or in flight right now)
+    unresolved = journal.unresolved(include_pending=True)
+    if not unresolved:
+        print("No unresolved journal entries")
+    for entry in unresolved:
+        print(f"{entry['id']}  {entry['started_at']}  {entry['state']:<11}  {entry['kind']}  "
+              f"order {entry['order_id']}  {entry['quantity']} x {entry['sku']}")
+
+
+if __name__ == "__main__":
+    main()
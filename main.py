@@ -5,30 +5,46 @@ import time
 import logging
 
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from courses import AvailableCourses
-from selenium.webdriver.common.by import By
-from discord_notification import DiscordNotifier
+from orders import Order, OrderLine
+from Utils import locators
 from ui_purchasing_toggle import purchasing_enabled, show_ui
-from Utils.utils import get_undetected_driver, wait_while_element_is_displaying
+from control_api import run_state, run_now_event, start_control_api
+from Utils.utils import get_undetected_driver, quit_driver, wait_while_element_is_displaying
+from Utils.logging_setup import setup_logging, log_context, set_log_context
+from Utils.artifacts import ArtifactCapture
+from Utils.browser_watchdog import BrowserWatchdog, reap_orphaned_chromedrivers
+from Utils.tabs import TabRegistry
+from Utils.instructors import InstructorMatchError
+from Utils.prefetch import create_http_session, fetch_order, fetch_order_list
+from planner import AttemptHistory, OrderPlan, build_plan, execute_plan, plan_scanned, prioritize
+from pipeline import OrderStream, ScannedOrder
+from forecast import DemandForecaster, record_demand
+from journal import ActionJournal
 from Utils.mail_sender.email_sender import send_email
 from Utils.functions import (
-    go_back, create_xpath,
     add_error_log, get_order_data,
     login_to_ecards, get_element_text,
     click_element_by_js, assign_to_instructor,
-    safe_navigate_to_url, check_element_exists,
-    get_indexes_to_process, mark_order_as_complete,
-    get_training_site_name, make_purchase_on_shop_cpr,
+    check_element_exists,
+    scan_order_pages, mark_order_as_complete,
+    navigate_to_order, TC_PRODUCT_ORDERS_URL, ECARDS_INVENTORY_URL,
+    make_purchase_on_shop_cpr, get_inventory_snapshot,
     assign_to_training_center, assign_to_admin_instructor,
     login_to_enrollware_and_navigate_to_tc_product_orders,
 )
 
 last_message = ""
+last_replenishment_message = ""
 quantity_required = []
+replenishment_required = []
+last_replenishment_check = 0.0
+# Inventory is compared with forecast targets at most this often (it costs an eCards login)
+REPLENISH_INTERVAL_SECONDS = int(os.getenv("REPLENISH_INTERVAL_SECONDS", 6 * 60 * 60))
 
 
-def generate_stock_summary(order_data_list):
+def generate_stock_summary(order_data_list, title: str = "You need to purchase the following e-cards"):
     # Return None if the list is empty so no email is generated
     if not order_data_list:
         return None
@@ -43,10 +59,10 @@ def generate_stock_summary(order_data_list):
         else:
             sku_totals[sku] = qty
 
-    html_message = """
+    html_message = f"""
     <div style="font-family: Arial, sans-serif; color: #333; max-width: 600px; margin: 0 auto;">
         <h2 style="color: #2c3e50; border-bottom: 2px solid #2D8CFF; padding-bottom: 5px;">
-            You need to purchase the following e-cards
+            {title}
         </h2>
 
         <table style="width: 100%; border-collapse: collapse; margin-top: 15px; text-align: left;">
@@ -75,92 +91,45 @@ def generate_stock_summary(order_data_list):
 
     return html_message
 
-# Configure logging with simplified output
-def setup_logging():
-    """Setup simplified logging with necessary information only."""
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
-
-    # Create timestamp for log file
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    log_file = f'logs/python_{timestamp}.log'
-
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    )
-    console_formatter = logging.Formatter(
-        '%(levelname)s - %(message)s'
-    )
-
-    # Get root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)  # Changed from DEBUG to INFO
-
-    # Remove any existing handlers
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
-
-    # Console handler with simplified format
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
-
-    # File handler with detailed format
-    file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+logger = logging.getLogger(__name__)
 
-    return log_file
+# Run the browser without a window (servers, scheduled tasks); the --headless CLI flag also sets it
+HEADLESS = os.getenv("HEADLESS", "").lower() in ("1", "true", "yes")
 
-# Setup logging
-log_file = setup_logging()
-logger = logging.getLogger(__name__)
 
-# Log startup information
-print("=" * 50)
-print("ENROLLWARE AUTOMATION STARTING")
-print("=" * 50)
-logger.info(f"Application started - Log file: {log_file}")
+def start_application() -> str:
+    """Configure logging and print the startup banner. Called by entry points, never on import."""
+    log_file = setup_logging()
+    print("=" * 50)
+    print("ENROLLWARE AUTOMATION STARTING")
+    print("=" * 50)
+    logger.info(f"Application started - Log file: {log_file}")
+    return log_file
 
 FAILED_ORDERS_CSV = "failed_orders.csv"
 
-def log_failed_order(order: Dict[str, Any], reason: str):
-    """Append failed order info to failed_orders.csv."""
+def log_failed_order(order: Order, line: OrderLine, reason: str):
+    """Append a failed product line to failed_orders.csv."""
     file_exists = os.path.isfile(FAILED_ORDERS_CSV)
     with open(FAILED_ORDERS_CSV, "a", newline='', encoding='utf-8') as csvfile:
-        fieldnames = list(order.keys()) + ["failure_reason"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        order_row = order.failure_row(line)
+        order_row["failure_reason"] = reason
+        writer = csv.DictWriter(csvfile, fieldnames=list(order_row.keys()))
         if not file_exists:
             writer.writeheader()
-        order_row = dict(order)
-        order_row["failure_reason"] = reason
         writer.writerow(order_row)
 
 
-def is_acls_pals_course(course_name: str) -> bool:
-    """Check if course is ACLS or PALS based on course name."""
-    if not course_name:
-        return False
-
-    course_upper = course_name.upper()
-    return 'ACLS' in course_upper or 'PALS' in course_upper
-
-
-def get_training_site_name_for_order(training_site: str) -> str:
-    """Get training site name for order assignment."""
-    code = training_site.split(' ')[0].strip() if ' ' in training_site else training_site.strip()
-    training_site_name = get_training_site_name(code)
-    return training_site_name if training_site_name else "Unknown Training Site"
-
-
 class OrderProcessor:
-    def __init__(self):
+    def __init__(self, headless: bool = HEADLESS):
+        self.headless = headless
         self.available_courses = None
         self.driver = None
+        self.tabs = None
+        self.artifacts = ArtifactCapture()
+        self.journal = ActionJournal()
+        self.current_order_id = ""
+        self.watchdog = BrowserWatchdog()
 
     def initialize(self) -> bool:
         """Initialize the order processor with safe exception handling."""
@@ -168,8 +137,19 @@ class OrderProcessor:
             logger.info("Initializing automation components...")
             self.available_courses = AvailableCourses()
 
-            self.driver = get_undetected_driver()
+            # Settle actions a previous crash left half-done before touching any order. A process
+            # started next to the daemon (e.g. cli.py scan) must leave its in-flight entries alone.
+            if self.journal.acquire():
+                self.journal.reconcile()
+            else:
+                logger.warning("Another automation process holds the action journal; "
+                               "purchases and assignments are disabled in this one")
+
+            reap_orphaned_chromedrivers()
+            self.driver = get_undetected_driver(headless=self.headless)
             if self.driver:
+                self.tabs = TabRegistry(self.driver)
+                self.tabs.adopt("enrollware")
                 logger.info("Chrome driver initialized successfully")
                 return True
             else:
@@ -179,20 +159,66 @@ class OrderProcessor:
             logger.error(f"Initialization failed: {e}")
             return False
 
+    def journaled(self, kind: str, action, sku: str = "", quantity: Any = "", line: Any = "") -> bool:
+        """Run a state-changing action for the current order through the crash-safe journal.
+
+        line is the order line's number, so two lines with the same SKU are journaled apart.
+        """
+        ok, _ = self.journal.run(kind, self.current_order_id, action, sku=sku, quantity=quantity, line=line)
+        return ok
+
+    def capture_failure(self, label: str, reason: str = ""):
+        """Save page HTML, URL and window handles for a failed step before recovery navigates away."""
+        self.artifacts.capture(self.driver, label, reason)
+
     def cleanup(self):
         """Safely cleanup resources."""
+        self.artifacts.close()
+        self.journal.close()
         if self.driver:
             try:
-                self.driver.quit()
+                quit_driver(self.driver)
                 logger.info("Resources cleaned up successfully")
             except Exception as e:
                 logger.error(f"Error during cleanup: {e}")
 
+    def check_browser_health(self) -> bool:
+        """At an order boundary, restart the browser if it has grown too large or leaked windows."""
+        recycle, reason = self.watchdog.order_finished(self.driver)
+        if not recycle:
+            return True
+        return self.restart_browser(reason)
+
+    def restart_browser(self, reason: str) -> bool:
+        """Replace the browser with a fresh one and restore the Enrollware login.
+
+        eCards is logged into again by setup_eCards_session when the next order needs it.
+        """
+        logger.warning(f"Restarting browser: {reason}")
+        try:
+            quit_driver(self.driver)
+        except Exception as e:
+            logger.warning(f"Browser did not quit cleanly: {e}")
+        reap_orphaned_chromedrivers()
+
+        self.driver = get_undetected_driver(headless=self.headless)
+        if not self.driver:
+            logger.error("Failed to start a new browser")
+            return False
+        self.watchdog.browser_restarted()
+        self.tabs = TabRegistry(self.driver)
+        self.tabs.adopt("enrollware")
+        if not login_to_enrollware_and_navigate_to_tc_product_orders(self.driver):
+            logger.error("Failed to restore Enrollware login after browser restart")
+            return False
+        logger.info("Browser restarted and logged in")
+        return True
+
     def safe_click_back_button(self):
         """Safely click the back button with retry logic."""
         for attempt in range(3):
             try:
-                click_element_by_js(self.driver, (By.ID, "mainContent_backButton"))
+                click_element_by_js(self.driver, locators.ORDER_BACK_BUTTON)
                 return True
             except Exception as e:
                 logger.warning(f"Back button click attempt {attempt + 1} failed: {e}")
@@ -200,47 +226,41 @@ class OrderProcessor:
         return False
 
     def safe_navigate_back(self):
-        """Safely navigate back with multiple attempts."""
+        """Return to the Enrollware tab. The eCards and Shop CPR tabs stay open for the next order."""
         try:
-            go_back(self.driver)
+            self.tabs.close_unregistered()
+            if not self.tabs.switch("enrollware"):
+                logger.warning("Enrollware tab was closed, reopening TC Product Orders")
+                self.tabs.ensure("enrollware", TC_PRODUCT_ORDERS_URL)
         except Exception as e:
-            logger.warning(f"Go back failed, trying alternative: {e}")
+            logger.warning(f"Switching to the Enrollware tab failed, trying alternative: {e}")
             self.safe_click_back_button()
 
-    def should_skip_course(self, course_name: str, product_code: str) -> tuple[bool, str]:
-        """Check if course should be skipped and return reason."""
+    def purchase(self, product_code: str, quantity: int, name: str) -> bool:
+        """Buy on Shop CPR in its own tab, then return to the eCards tab (left on the inventory page)."""
         try:
-            if 'red cross' in course_name.lower() or 'redcross' in course_name.lower():
-                return True, f"Red Cross course: {course_name}"
-
-            if not self.available_courses.is_course_available(product_code):
-                return True, f"Course {product_code} is not available for eCard generation"
+            self.tabs.ensure("shopcpr")
+            return make_purchase_on_shop_cpr(self.driver, product_code, quantity, name)
+        finally:
+            self.tabs.ensure("ecards")
 
-            # Log course category for debugging
-            course_type = "Individual" if self.available_courses.is_individual_course(product_code) else "Bundle"
-            logger.debug(f"Course {product_code} is a {course_type} course")
+    def setup_eCards_session(self, reload: bool = False) -> bool:
+        """Switch to the eCards tab, opening it on first use, and make sure it is logged in.
 
-            return False, ""
-        except Exception as e:
-            logger.error(f"Error checking course availability: {e}")
-            return True, f"Error checking course: {e}"
-
-    def setup_eCards_session(self) -> bool:
-        """Setup eCards session in new tab with retry logic (avoids duplicate eCard tabs)."""
+        With reload the inventory page is loaded again even if the tab is already on it.
+        """
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                self.driver.execute_script("window.open('');")
-                self.driver.switch_to.window(self.driver.window_handles[-1])
-
-                self.driver.get("https://ecards.heart.org/inventory")
-                time.sleep(3)
+                reused = self.tabs.has("ecards")
+                self.tabs.ensure("ecards", ECARDS_INVENTORY_URL, reload=reload)
+                if not reused:
+                    time.sleep(3)
 
-                maintenance_msg = check_element_exists(self.driver, (By.XPATH, "//span[contains(text(), 'Our site will be under maintenance')]"))
+                maintenance_msg = check_element_exists(self.driver, locators.ECARDS_MAINTENANCE_NOTICE)
                 if maintenance_msg:
                     logger.error("eCards site is under maintenance")
-                    self.driver.close()
-                    self.driver.switch_to.window(self.driver.window_handles[0])
+                    self.tabs.close("ecards", then="enrollware")
                     return False
 
                 login_to_ecards(self.driver)
@@ -253,11 +273,9 @@ class OrderProcessor:
 
             except Exception as e:
                 logger.error(f"eCards session setup attempt {attempt + 1} failed: {e}")
-                # Cleanup tab if partially opened
+                # Start over in a fresh tab
                 try:
-                    if len(self.driver.window_handles) > 1:
-                        self.driver.close()
-                        self.driver.switch_to.window(self.driver.window_handles[0])
+                    self.tabs.close("ecards", then="enrollware")
                 except Exception:
                     pass
                 if attempt < max_attempts - 1:
@@ -266,136 +284,259 @@ class OrderProcessor:
         logger.error("Failed to setup eCards session")
         return False
 
-    def process_order_assignment(self, order_data: List[Dict[str, Any]], training_site: str,
-                               available_qyt_selector: str) -> bool:
-        """Process order assignment with proper exception handling and individual order logic."""
+    def take_inventory_snapshot(self) -> Dict[str, int]:
+        """Open eCards once and read available quantities for planning, from a freshly loaded page."""
+        if not self.setup_eCards_session(reload=True):
+            logger.warning("Could not open eCards for an inventory snapshot; planning without stock levels")
+            return {}
+        inventory = get_inventory_snapshot(self.driver)
+        self.safe_navigate_back()
+        return inventory
+
+    def replenish_stock(self) -> List[Dict[str, Any]]:
+        """Compare inventory with forecast target levels and pre-purchase or report the shortfall.
+
+        REPLENISH_MODE selects "report" (default, email only), "purchase" (buy on Shop CPR when
+        purchasing is enabled) or "off". Returns the remaining shortfall as {"sku", "qty"} items.
+        """
+        mode = os.getenv("REPLENISH_MODE", "report").lower()
+        if mode == "off":
+            return []
+
+        forecaster = DemandForecaster()
+        if not forecaster.targets():
+            return []
+
+        set_log_context(stage="replenish")
+        inventory = self.take_inventory_snapshot()
+        if not inventory:
+            logger.warning("Skipping replenishment: inventory snapshot unavailable")
+            return []
+
+        max_quantity = int(os.getenv("REPLENISH_MAX_QTY", 50))
+        needs = forecaster.replenishment_needs(inventory, max_quantity)
+        if not needs:
+            logger.info("All forecast SKUs are at or above target stock")
+            return []
+
+        if mode != "purchase" or not purchasing_enabled():
+            logger.info(f"Replenishment needed for {len(needs)} SKUs (report only)")
+            return needs
+
+        if not self.setup_eCards_session():
+            return needs
+
+        remaining = []
+        # One id per check: a later check the same day may need to buy the same SKU again
+        replenishment_id = f"replenishment-{datetime.now():%Y-%m-%dT%H%M%S}"
+        for need in needs:
+            logger.info(f"Pre-purchasing {need['qty']} of {need['sku']} to reach forecast target")
+            purchased, _ = self.journal.run(
+                "purchase", replenishment_id,
+                lambda: self.purchase(need["sku"], need["qty"], "Stock replenishment"),
+                sku=need["sku"], quantity=need["qty"])
+            if not purchased:
+                remaining.append(need)
+        self.safe_navigate_back()
+        return remaining
+
+    def process_order_assignment(self, order: Order, available_qyt_selector: locators.LocatorTemplate) -> bool:
+        """Process order assignment with proper exception handling and individual order logic.
+
+        Raises InstructorMatchError, after recording the line in failed_orders.csv, when an
+        instructor cannot be picked safely; retrying would not help.
+        """
         all_success = True
-        for order in order_data:
-            product_code = order.get('product_code', '')
-            course_name = order.get('course_name', '')
-            name = order.get('name', '')
-            quantity = order.get('quantity', 0)
+        for line_number, line in enumerate(order.lines, 1):
+            product_code = line.sku
+            quantity = str(line.quantity)
 
-            logger.info(f"Processing individual order: {product_code} - {course_name}")
+            logger.info(f"Processing individual order: {product_code} - {line.course_name}")
+            set_log_context(sku=product_code, stage="assign")
 
             try:
                 # Priority check: ACLS/PALS courses go to Admin Instructor
-                if is_acls_pals_course(course_name):
-                    logger.info(f"ACLS/PALS course {product_code} ({course_name}) assigned to Admin Instructor")
-                    if not assign_to_admin_instructor(self.driver, name, str(quantity), product_code):
+                if line.acls_pals:
+                    logger.info(f"ACLS/PALS course {product_code} ({line.course_name}) assigned to Admin Instructor")
+                    if not self.journaled("assignment", lambda: assign_to_admin_instructor(self.driver, order.name, quantity, product_code),
+                                          product_code, quantity, line_number):
                         reason = f"Failed to assign ACLS/PALS course {product_code} to Admin Instructor"
                         logger.error(reason)
-                        log_failed_order(order, reason)
+                        log_failed_order(order, line, reason)
                         all_success = False
                     continue
 
                 # For non-ACLS/PALS courses, apply individual/bundle logic
-                if self.available_courses.is_individual_course(product_code):
-                    if training_site.startswith("TS"):
+                if line.individual:
+                    if order.ts_site:
                         logger.info(f"Individual course {product_code} assigned to training site due to TS prefix")
-                        if not self.process_single_order(order, available_qyt_selector,
-                                                        lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, get_training_site_name_for_order(training_site))):
+                        if not self.process_single_order(order, line, available_qyt_selector,
+                                                        lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, order.site_name)):
                             reason = f"Failed to assign individual course {product_code} to training site"
                             logger.error(reason)
-                            log_failed_order(order, reason)
+                            log_failed_order(order, line, reason)
                             all_success = False
                     else:
                         logger.info(f"Individual course {product_code} assigned to instructor")
-                        if not self.process_single_order(order, available_qyt_selector, assign_to_instructor):
+                        if not self.process_single_order(order, line, available_qyt_selector, assign_to_instructor):
                             reason = f"Failed to assign individual course {product_code} to instructor"
                             logger.error(reason)
-                            log_failed_order(order, reason)
+                            log_failed_order(order, line, reason)
                             all_success = False
                 else:
                     # Bundle courses: prefer training site assignment
                     logger.info(f"Bundle course {product_code} assigned to training site")
-                    if not self.process_single_order(order, available_qyt_selector,
-                                                    lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, get_training_site_name_for_order(training_site))):
+                    if not self.process_single_order(order, line, available_qyt_selector,
+                                                    lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, order.site_name)):
                         reason = f"Failed to assign bundle course {product_code} to training site"
                         logger.error(reason)
-                        log_failed_order(order, reason)
+                        log_failed_order(order, line, reason)
                         all_success = False
+            except InstructorMatchError as e:
+                # Needs a human: recorded once, and the caller must not run the assignment again
+                logger.error(str(e))
+                log_failed_order(order, line, str(e))
+                raise
             except Exception as e:
                 reason = f"Exception during order assignment: {e}"
                 logger.error(reason)
-                log_failed_order(order, reason)
+                log_failed_order(order, line, reason)
                 all_success = False
 
         return all_success
 
-    def process_admin_instructor_assignment(self, order_data: List[Dict[str, Any]]) -> bool:
+    def process_admin_instructor_assignment(self, order: Order) -> bool:
         """Process Admin Instructor assignment for ACLS/PALS courses with exception handling."""
         try:
             # This method is now only called for ACLS/PALS bypass scenario
             # Individual order processing is handled in process_order_assignment
-            for order in order_data:
-                name = order.get('name', '')
-                product_code = order.get('product_code', '')
-                quantity = order.get('quantity', 0)
-
+            for line_number, line in enumerate(order.lines, 1):
                 # For ACLS/PALS courses, bypass quantity checks and proceed directly
-                if not assign_to_admin_instructor(self.driver, name, str(quantity), product_code):
+                try:
+                    if not self.journaled("assignment", lambda: assign_to_admin_instructor(self.driver, order.name, str(line.quantity), line.sku),
+                                          line.sku, line.quantity, line_number):
+                        return False
+                except InstructorMatchError as e:
+                    logger.error(str(e))
+                    log_failed_order(order, line, str(e))
                     return False
             return True
         except Exception as e:
             logger.error(f"Error in Admin Instructor assignment: {e}")
             return False
 
-    def process_instructor_assignment(self, order_data: List[Dict[str, Any]], available_qyt_selector: str) -> bool:
+    def _assign_acls_pals_lines(self, order: Order) -> bool:
+        """Assign every line of an all-ACLS/PALS order in the batch's eCards session."""
+        for line_number, line in enumerate(order.lines, 1):
+            try:
+                if not self.journaled("assignment",
+                                      lambda: assign_to_admin_instructor(self.driver, order.name, str(line.quantity),
+                                                                         line.sku, batch=True),
+                                      line.sku, line.quantity, line_number):
+                    return False
+            except InstructorMatchError as e:
+                logger.error(str(e))
+                log_failed_order(order, line, str(e))
+                return False
+            except Exception as e:
+                logger.error(f"Error in Admin Instructor assignment: {e}")
+                return False
+        return True
+
+    def process_acls_pals_batch(self, order_plans: List[OrderPlan]) -> Dict[str, bool]:
+        """Fast lane for all-ACLS/PALS orders: every Admin Instructor assignment back to back in one
+        eCards session, then each assigned order is completed in Enrollware.
+
+        Returns the outcome per order ID. An order whose assignment fails is left open, as in
+        process_single_row.
+        """
+        results = {order_plan.order_id: False for order_plan in order_plans}
+        set_log_context(stage="ecards_login")
+        # A reused tab may still show an earlier order's assignment; start from a fresh inventory page
+        if not self.setup_eCards_session(reload=True):
+            logger.error(f"Failed to setup eCards session for {len(order_plans)} ACLS/PALS orders")
+            return results
+
+        assigned = []
+        for order_plan in order_plans:
+            order = order_plan.order
+            self.current_order_id = order_plan.order_id
+            with log_context(order_id=order_plan.order_id, stage="assign_admin"):
+                logger.info(f"Assigning ACLS/PALS order {order_plan.order_id} for {order.name}")
+                if self._assign_acls_pals_lines(order):
+                    assigned.append(order_plan)
+                    continue
+                logger.error(f"✗ Failed to process all ACLS/PALS assignments for order {order_plan.order_id} - no retry")
+                self.capture_failure(f"order{order_plan.order_id}_acls_pals_assignment")
+                # Start the next assignment from a known page
+                self.tabs.ensure("ecards", ECARDS_INVENTORY_URL)
+
+        self.safe_navigate_back()
+        for order_plan in assigned:
+            self.current_order_id = order_plan.order_id
+            with log_context(order_id=order_plan.order_id, stage="complete"):
+                if not navigate_to_order(self.driver, order_plan.order_ref):
+                    self.capture_failure(f"order{order_plan.order_id}_open")
+                    continue
+                results[order_plan.order_id] = self.journaled("status_change", lambda: mark_order_as_complete(self.driver))
+                if results[order_plan.order_id]:
+                    logger.info(f"✓ Successfully completed all ACLS/PALS order {order_plan.order_id}")
+        logger.info(f"ACLS/PALS lane: {sum(results.values())} of {len(order_plans)} orders completed")
+        return results
+
+    def process_instructor_assignment(self, order: Order, available_qyt_selector: locators.LocatorTemplate) -> bool:
         """Process instructor assignment with exception handling."""
         try:
             # This method is now only used for non-mixed order scenarios
-            for order in order_data:
-                if not self.process_single_order(order, available_qyt_selector, assign_to_instructor):
+            for line in order.lines:
+                if not self.process_single_order(order, line, available_qyt_selector, assign_to_instructor):
                     return False
             return True
         except Exception as e:
             logger.error(f"Error in instructor assignment: {e}")
             return False
 
-    def process_training_site_assignment(self, order_data: List[Dict[str, Any]], training_site: str,
-                                       available_qyt_selector: str) -> bool:
+    def process_training_site_assignment(self, order: Order, available_qyt_selector: locators.LocatorTemplate) -> bool:
         """Process training site assignment with exception handling."""
         try:
             # This method is now only used for non-mixed order scenarios
-            code = training_site.split(' ')[0].strip() if ' ' in training_site else training_site.strip()
-            training_site_name = get_training_site_name(code)
-
-            for order in order_data:
-                if not self.process_single_order(order, available_qyt_selector,
-                                                lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, training_site_name)):
+            for line in order.lines:
+                if not self.process_single_order(order, line, available_qyt_selector,
+                                                lambda driver, name, qty, code: assign_to_training_center(driver, name, qty, code, order.site_name)):
                     return False
             return True
         except Exception as e:
             logger.error(f"Error in training site assignment: {e}")
             return False
 
-    def process_single_order(self, order: Dict[str, Any], available_qyt_selector: str,
+    def process_single_order(self, order: Order, line: OrderLine, available_qyt_selector: locators.LocatorTemplate,
                              assignment_func) -> bool:
         """Process a single order with exception handling."""
         global quantity_required
         try:
-            name = order.get('name', '')
-            product_code = order.get('product_code', '')
-            quantity = order.get('quantity', 0)
+            name = order.name
+            product_code = line.sku
+            quantity = str(line.quantity)
 
             # Get available quantity
-            xpath = available_qyt_selector.format(product_code)
-            available_qyt_text = get_element_text(self.driver, (By.XPATH, xpath))
+            available_qyt_text = get_element_text(self.driver, available_qyt_selector(product_code=product_code))
             available_qyt = int(available_qyt_text) if available_qyt_text.isdigit() else 0
-            quantity_int = int(quantity) if str(quantity).isdigit() else 0
+            quantity_int = line.quantity
 
             # Purchase additional if needed
             if available_qyt < quantity_int:
+                set_log_context(stage="purchase")
                 quantity_to_order = quantity_int - available_qyt
                 quantity_required.append({"sku": product_code, "qty": quantity_to_order})
                 if purchasing_enabled():
                     logger.info(f"Purchasing {quantity_to_order} additional eCards for {product_code}")
-                    purchase_success = make_purchase_on_shop_cpr(self.driver, product_code, quantity_to_order, name)
+                    purchase_success = self.journaled(
+                        "purchase", lambda: self.purchase(product_code, quantity_to_order, name),
+                        product_code, quantity_to_order, order.line_number(line))
                     if not purchase_success:
                         reason = f"Failed to purchase {quantity_to_order} eCards for {product_code}"
                         logger.error(reason)
-                        log_failed_order(order, reason)
+                        log_failed_order(order, line, reason)
                         return False
 
                     # Refresh eCards inventory page after successful purchase
@@ -408,106 +549,120 @@ class OrderProcessor:
                     return True
 
             # Assign the order
-            if not assignment_func(self.driver, name, quantity, product_code):
+            set_log_context(stage="assign")
+            if not self.journaled("assignment", lambda: assignment_func(self.driver, name, quantity, product_code),
+                                  product_code, quantity, order.line_number(line)):
                 reason = f"Assignment function failed for {product_code}"
                 logger.error(reason)
-                log_failed_order(order, reason)
+                log_failed_order(order, line, reason)
                 return False
             return True
 
+        except InstructorMatchError:
+            raise
         except Exception as e:
             reason = f"Error processing single order: {e}"
             logger.error(reason)
-            log_failed_order(order, reason)
+            log_failed_order(order, line, reason)
             return False
 
-    def process_single_row(self, index: int) -> bool:
-        """Process a single row with comprehensive exception handling."""
+    def process_single_row(self, order_ref: Dict[str, Any], prefetched: Optional[Order] = None) -> bool:
+        """Process a single row with comprehensive exception handling.
+
+        A prefetched Order is used as-is (its lines are already classified) and a skipped order
+        is never opened in the browser.
+        """
+        order_id = order_ref.get('order_id')
+        self.current_order_id = order_id
         try:
-            logger.info(f"Processing row {index}...")
-            click_element_by_js(self.driver, (By.XPATH, f"//tbody/tr[{index}]/td[7]/a"))
+            logger.info(f"Processing order {order_id}...")
+            set_log_context(stage="read_order")
 
-            # Get order data
-            order_data, num_of_orders = get_order_data(self.driver)
-            if not order_data:
-                logger.warning(f"No order data found for row {index}")
-                self.safe_click_back_button()
-                return False
+            if prefetched:
+                order = prefetched
+            else:
+                if not navigate_to_order(self.driver, order_ref):
+                    self.capture_failure(f"order{order_id}_open")
+                    return False
 
-            # Log all orders in this row
-            logger.info(f"Found {len(order_data)} orders in row {index}:")
-            for i, order in enumerate(order_data, 1):
-                course_name = order.get('course_name', '')
-                product_code = order.get('product_code', '')
-                quantity = order.get('quantity', 0)
-                logger.info(f"  {i}. {quantity} {product_code} {course_name}")
+                # Get order data
+                order = get_order_data(self.driver, order_id)
+                if order is None:
+                    logger.warning(f"No order data found for order {order_id}")
+                    self.capture_failure(f"order{order_id}_no_order_data")
+                    self.safe_click_back_button()
+                    return False
 
-            first_order = order_data[0]
-            name = first_order.get('name', '')
-            training_site = first_order.get('training_site', '')
+            # Log all orders in this row
+            logger.info(f"Found {len(order.lines)} product lines in order {order_id}:")
+            for i, line in enumerate(order.lines, 1):
+                logger.info(f"  {i}. {line.quantity} {line.sku} {line.course_name}")
 
-            logger.info(f"Processing for: {name} - Training Site: {training_site}")
+            logger.info(f"Processing for: {order.name} - Training Site: {order.training_site}")
 
             # Check if any order contains ACLS/PALS
-            has_acls_pals = any(is_acls_pals_course(order.get('course_name', '')) for order in order_data)
-            if has_acls_pals:
-                acls_pals_courses = [order.get('course_name', '') for order in order_data if is_acls_pals_course(order.get('course_name', ''))]
+            if order.has_acls_pals:
+                acls_pals_courses = [line.course_name for line in order.lines if line.acls_pals]
                 logger.info(f"Detected ACLS/PALS courses in order: {acls_pals_courses}")
 
             # Check if any course should be skipped
-            for order in order_data:
-                course_name = order.get('course_name', '')
-                product_code = order.get('product_code', '')
-                should_skip, skip_reason = self.should_skip_course(course_name, product_code)
-                if should_skip:
-                    logger.info(f"Skipping entire order due to: {skip_reason}")
+            if order.skip:
+                logger.info(f"Skipping entire order due to: {order.skip_reason}")
+                if not prefetched:
                     self.safe_click_back_button()
-                    return True  # Not an error, just skipped
+                return True  # Not an error, just skipped
 
-            # Setup eCards session
-            if not self.setup_eCards_session():
-                logger.error(f"Failed to setup eCards session for row {index}")
+            if prefetched and not navigate_to_order(self.driver, order_ref):
+                self.capture_failure(f"order{order_id}_open")
+                return False
+
+            # Setup eCards session; the stock check below must read current quantities, not what
+            # the reused tab showed after an earlier order (or a half-finished assignment)
+            set_log_context(stage="ecards_login")
+            if not self.setup_eCards_session(reload=True):
+                logger.error(f"Failed to setup eCards session for order {order_id}")
+                self.capture_failure(f"order{order_id}_ecards_session")
                 self.safe_click_back_button()
                 return False
 
             # Check if all orders are ACLS/PALS (bypass inventory checks completely)
-            all_acls_pals = all(is_acls_pals_course(order.get('course_name', '')) for order in order_data)
-
-            if all_acls_pals:
+            if order.all_acls_pals:
                 logger.info(f"All courses are ACLS/PALS - bypassing inventory checks completely")
 
                 # Process all ACLS/PALS assignments directly without inventory checks
-                if self.process_admin_instructor_assignment(order_data):
+                if self.process_admin_instructor_assignment(order):
                     # Complete the order
                     self.safe_navigate_back()
-                    mark_order_as_complete(self.driver)
-                    logger.info(f"✓ Successfully completed all ACLS/PALS row {index}")
+                    self.journaled("status_change", lambda: mark_order_as_complete(self.driver))
+                    logger.info(f"✓ Successfully completed all ACLS/PALS order {order_id}")
                     return True
                 else:
-                    logger.error(f"✗ Failed to process all ACLS/PALS assignments for row {index} - no retry")
+                    logger.error(f"✗ Failed to process all ACLS/PALS assignments for order {order_id} - no retry")
+                    self.capture_failure(f"order{order_id}_acls_pals_assignment")
                     self.safe_navigate_back()
                     self.safe_click_back_button()
                     return False
 
             # For mixed orders or non-ACLS/PALS courses, proceed with inventory checks for non-ACLS/PALS items
-            non_acls_pals_orders = [order for order in order_data if not is_acls_pals_course(order.get('course_name', ''))]
+            non_acls_pals_lines = [line for line in order.lines if not line.acls_pals]
 
-            if non_acls_pals_orders:
-                logger.info(f"Checking inventory for {len(non_acls_pals_orders)} non-ACLS/PALS courses")
+            if non_acls_pals_lines:
+                logger.info(f"Checking inventory for {len(non_acls_pals_lines)} non-ACLS/PALS courses")
+                set_log_context(stage="inventory")
 
                 # Check inventory availability for non-ACLS/PALS courses
-                for order in non_acls_pals_orders:
-                    product_code = order.get('product_code', '')
-                    quantity_needed = int(order.get('quantity', 1))
+                for line in non_acls_pals_lines:
+                    product_code = line.sku
+                    quantity_needed = line.quantity
+                    set_log_context(sku=product_code)
 
-                    common_selector = f"//td[contains(text(), '{product_code}')]/preceding-sibling::td"
-                    available_course_selector = f"{common_selector}[@role='button']"
-                    available_quantity_selector = f"{common_selector}[1]"
+                    available_course_selector = locators.INVENTORY_COURSE_BUTTON(product_code=product_code)
+                    available_quantity_selector = locators.INVENTORY_AVAILABLE_QUANTITY(product_code=product_code)
                     available_quantity = 0
                     quantity_to_purchase = 0
-                    available_course = check_element_exists(self.driver, (By.XPATH, available_course_selector))
+                    available_course = check_element_exists(self.driver, available_course_selector)
                     if available_course:
-                        available_quantity_text = get_element_text(self.driver, (By.XPATH, available_quantity_selector))
+                        available_quantity_text = get_element_text(self.driver, available_quantity_selector)
                         available_quantity = int(available_quantity_text) if available_quantity_text.isdigit() else 0
                         quantity_to_purchase = max(0, quantity_needed - available_quantity)
                     if not available_course or available_quantity < quantity_needed:
@@ -515,12 +670,16 @@ class OrderProcessor:
                         quantity_required.append({"sku": product_code, "qty": quantity_to_purchase if quantity_to_purchase > 0 else quantity_needed})
                         # Check if purchasing is enabled before attempting purchase
                         if purchasing_enabled():
+                            set_log_context(stage="purchase")
                             # Purchase the exact quantity needed (no retry logic)
                             quantity_needed = max(0, quantity_needed - available_quantity)
                             logger.info(f"Purchasing {quantity_needed} eCards for {product_code}")
-                            purchase_success = make_purchase_on_shop_cpr(self.driver, product_code, quantity_needed, name)
+                            purchase_success = self.journaled(
+                                "purchase", lambda: self.purchase(product_code, quantity_needed, order.name),
+                                product_code, quantity_needed, order.line_number(line))
                             if not purchase_success:
                                 logger.error(f"Failed to purchase {quantity_needed} eCards for {product_code}")
+                                self.capture_failure(f"order{order_id}_purchase_{product_code}")
                                 self.safe_navigate_back()
                                 self.safe_click_back_button()
                                 return False
@@ -531,232 +690,383 @@ class OrderProcessor:
                             time.sleep(5)  # Wait for inventory to update
 
                             # Check again if course is now available
-                            available_course = check_element_exists(self.driver, (By.XPATH, available_course_selector))
+                            available_course = check_element_exists(self.driver, available_course_selector)
                             if not available_course:
                                 logger.error(f"Course {product_code} still not available after purchase")
+                                self.capture_failure(f"order{order_id}_post_purchase_{product_code}")
                                 self.safe_navigate_back()
                                 self.safe_click_back_button()
                                 return False
                         else:
-                            logger.info(f"Purchasing is OFF. Course {product_code} is not available in inventory and cannot be purchased automatically. Skipping order for {name}.")
+                            logger.info(f"Purchasing is OFF. Course {product_code} is not available in inventory and cannot be purchased automatically. Skipping order for {order.name}.")
                             reason = f"Course {product_code} not available in inventory and purchasing is disabled"
-                            log_failed_order(order, reason)
+                            log_failed_order(order, line, reason)
                             self.safe_navigate_back()
                             self.safe_click_back_button()
                             return False
 
             # Process mixed order assignment (each order individually)
-            common_selector_base = "//td[contains(text(), '{}')]/preceding-sibling::td[1]"
-
             assignment_success = False
             for assignment_attempt in range(2):  # Retry assignment once if it fails
-                if self.process_order_assignment(order_data, training_site, common_selector_base):
-                    assignment_success = True
+                try:
+                    if self.process_order_assignment(order, locators.INVENTORY_AVAILABLE_QUANTITY):
+                        assignment_success = True
+                        break
+                except InstructorMatchError:
+                    # Already in failed_orders.csv; the same instructor list would fail the same way
                     break
-                else:
-                    logger.warning(f"Assignment attempt {assignment_attempt + 1} failed for row {index}")
-                    if assignment_attempt < 1:  # If not last attempt
-                        time.sleep(3)
+                logger.warning(f"Assignment attempt {assignment_attempt + 1} failed for order {order_id}")
+                if assignment_attempt < 1:  # If not last attempt
+                    time.sleep(3)
 
             if not assignment_success:
-                logger.error(f"Failed to process order assignment for row {index} after all attempts")
+                logger.error(f"Failed to process order assignment for order {order_id} after all attempts")
+                self.capture_failure(f"order{order_id}_assignment")
                 self.safe_navigate_back()
                 self.safe_click_back_button()
                 return False
 
             # Complete the order
+            set_log_context(sku=None, stage="complete")
             self.safe_navigate_back()
-            mark_order_as_complete(self.driver)
+            self.journaled("status_change", lambda: mark_order_as_complete(self.driver))
 
-            logger.info(f"✓ Successfully completed row {index} with {len(order_data)} orders")
+            logger.info(f"✓ Successfully completed order {order_id} with {len(order.lines)} orders")
             return True
 
         except Exception as e:
-            logger.error(f"✗ Failed to process row {index}: {e}")
+            logger.error(f"✗ Failed to process order {order_id}: {e}")
+            self.capture_failure(f"order{order_id}_exception", str(e))
             # Attempt recovery
             try:
                 self.safe_navigate_back()
                 self.safe_click_back_button()
             except Exception as recovery_error:
-                logger.error(f"Recovery failed for row {index}: {recovery_error}")
+                logger.error(f"Recovery failed for order {order_id}: {recovery_error}")
             return False
 
-    def process_single_redcross_order(self, index: int) -> bool:
+    def process_single_redcross_order(self, order_ref: Dict[str, Any]) -> bool:
         """Process a single Red Cross order with exception handling."""
+        order_id = order_ref.get('order_id')
+        self.current_order_id = order_id
         try:
-            product_locator = (By.XPATH, f"//tbody/tr[{index}]/td[7]/a")
-            tc_product_orders_page = "https://www.enrollware.com/admin/tc-product-order-list-tc.aspx"
-            if self.driver.current_url != tc_product_orders_page:
-                safe_navigate_to_url(self.driver, tc_product_orders_page)
-                time.sleep(2)
-
-            logger.info(f"Processing Red Cross order at index {index}...")
-            click_element_by_js(self.driver, product_locator)
+            logger.info(f"Processing Red Cross order {order_id}...")
+            if not navigate_to_order(self.driver, order_ref):
+                self.capture_failure(f"redcross{order_id}_open")
+                return False
             time.sleep(1)
 
-            training_site_locator = (By.XPATH, create_xpath('Training Site'))
-            training_site_txt = get_element_text(self.driver, training_site_locator, default="Unknown").strip()
+            training_site_txt = get_element_text(self.driver, locators.ORDER_DETAIL_FIELD(label='Training Site:'),
+                                                 default="Unknown").strip()
             if "wayne halfway" in training_site_txt.lower():
                 logger.info(f"Marking order as completed without processing due to `Wayne Halfway` training site")
-                mark_order_as_complete(self.driver)
+                self.journaled("status_change", lambda: mark_order_as_complete(self.driver))
                 return True
 
-            roaster_element = check_element_exists(self.driver, (By.XPATH, "//a[text()= 'view roster']"))
+            roaster_element = check_element_exists(self.driver, locators.REDCROSS_VIEW_ROSTER)
             if not roaster_element:
-                logger.error(f"No 'view roster' link found for Red Cross order at index {index}")
+                logger.error(f"No 'view roster' link found for Red Cross order {order_id}")
                 err_txt = "No 'view roster' link found"
+                self.capture_failure(f"redcross{order_id}_no_roster", err_txt)
                 # add error log to order
-                add_error_log(self.driver, err_txt)
+                self.journaled("error_comment", lambda: add_error_log(self.driver, err_txt))
                 self.safe_click_back_button()
                 return True
 
-            click_element_by_js(self.driver, (By.XPATH, "//a[text()= 'view roster']"))
+            click_element_by_js(self.driver, locators.REDCROSS_VIEW_ROSTER)
             time.sleep(1)
-            click_element_by_js(self.driver, (By.ID, "mainContent_cardPrint"))
+            click_element_by_js(self.driver, locators.REDCROSS_CARD_PRINT)
             time.sleep(1)
-            click_element_by_js(self.driver, (By.ID, "mainContent_arcSubmitBtn"))
+            click_element_by_js(self.driver, locators.REDCROSS_SUBMIT)
             time.sleep(0.5)
-            wait_while_element_is_displaying(self.driver, By.ID, "arcPleaseWaitRow", timeout=15)
+            wait_while_element_is_displaying(self.driver, *locators.REDCROSS_PLEASE_WAIT, timeout=15)
             time.sleep(1)
 
-            error_element_locator = (By.XPATH, "//div[contains(@class, 'statusbarerror')]")
+            error_element_locator = locators.REDCROSS_STATUS_ERROR
             error_element = check_element_exists(self.driver, error_element_locator)
             if error_element:
                 error_txt = get_element_text(self.driver, error_element_locator)
                 logger.error(f"Error: {error_txt}\nOrder cannot be processed.")
-                safe_navigate_to_url(self.driver, tc_product_orders_page)
-                click_element_by_js(self.driver, product_locator)
+                self.capture_failure(f"redcross{order_id}_card_print", error_txt)
+                navigate_to_order(self.driver, order_ref)
                 time.sleep(1)
                 # add error log to order
-                add_error_log(self.driver, error_txt)
+                self.journaled("error_comment", lambda: add_error_log(self.driver, error_txt))
                 self.safe_click_back_button()
                 return True
 
-            safe_navigate_to_url(self.driver, tc_product_orders_page)
-            click_element_by_js(self.driver, product_locator)
+            navigate_to_order(self.driver, order_ref)
             time.sleep(1)
-            mark_order_as_complete(self.driver)
-            logger.info(f"Successfully processed Red Cross order at index {index}")
+            self.journaled("status_change", lambda: mark_order_as_complete(self.driver))
+            logger.info(f"Successfully processed Red Cross order {order_id}")
             return True
         except Exception as e:
-            logger.error(f"Error processing Red Cross order at index {index}: {e}")
+            logger.error(f"Error processing Red Cross order {order_id}: {e}")
+            self.capture_failure(f"redcross{order_id}_exception", str(e))
             return False
 
 
-def main():
+def scan_orders(processor: OrderProcessor) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Log into Enrollware and return (AHA order refs, Red Cross order refs), or None if login fails."""
+    logger.info("Logging into Enrollware...")
+    if not login_to_enrollware_and_navigate_to_tc_product_orders(processor.driver):
+        logger.error("Failed to login or navigate to TC Product Orders")
+        return None
+
+    logger.info("Scanning for orders to process...")
+    order_refs = list(scan_order_pages(processor.driver))
+    return ([order_ref for order_ref in order_refs if order_ref["kind"] == "aha"],
+            [order_ref for order_ref in order_refs if order_ref["kind"] == "redcross"])
+
+
+def stream_orders(processor: OrderProcessor, session) -> Iterator[ScannedOrder]:
+    """Orders in list order as the scanner finds them, each with its details when they could be fetched.
+
+    If the list cannot be read over HTTP, or its paging fails part way, it is scanned in the
+    browser instead and the orders not yet yielded follow; the details are still fetched on the
+    scanner thread.
+    """
+    def fetch(order_ref):
+        return fetch_order(session, order_ref, processor.available_courses)
+
+    seen = set()
+    stream = OrderStream(lambda: fetch_order_list(session, TC_PRODUCT_ORDERS_URL), fetch)
+    with stream:
+        for order_ref, order in stream:
+            seen.add(order_ref["order_id"] or order_ref["row_key"])
+            yield order_ref, order
+    if stream.error is None:
+        return
+
+    logger.warning(f"Order list could not be read over HTTP after {len(seen)} orders; "
+                   f"scanning the rest in the browser")
+    # The tab is usually on an order by now; start again from the first page of the list
+    processor.tabs.ensure("enrollware", TC_PRODUCT_ORDERS_URL, reload=True)
+    # Paged in the browser here, on this thread; only the detail fetches go to the scanner
+    order_refs = [order_ref for order_ref in scan_order_pages(processor.driver)
+                  if (order_ref["order_id"] or order_ref["row_key"]) not in seen]
+    with OrderStream(lambda: order_refs, fetch) as stream:
+        yield from stream
+
+
+def main(dry_run: bool = False, headless: bool = HEADLESS):
+    """Scan, plan and execute one processing cycle. With dry_run the plan is printed and nothing is clicked."""
     logger.info("Starting automation process...")
 
-    processor = OrderProcessor()
+    processor = OrderProcessor(headless)
     if not processor.initialize():
         logger.error("Failed to initialize order processor")
         return
 
+    session = None
     try:
-        # Login and navigate
+        if not dry_run and not processor.journal.owned:
+            logger.error("Another automation process is running; skipping this cycle")
+            return
+
         logger.info("Logging into Enrollware...")
         if not login_to_enrollware_and_navigate_to_tc_product_orders(processor.driver):
             logger.error("Failed to login or navigate to TC Product Orders")
             return
 
-        logger.info("Scanning for orders to process...")
-        rows_to_process = get_indexes_to_process(processor.driver, "non-redcross")
-        redcross_rows = get_indexes_to_process(processor.driver, "redcross")
+        # The list and order details are read over HTTP on a scanner thread while the browser works
+        session = create_http_session(processor.driver)
+        scanned = stream_orders(processor, session)
+
+        if dry_run:
+            scanned = list(scanned)
+            has_aha = any(order_ref.get("kind") == "aha" for order_ref, _ in scanned)
+            inventory = processor.take_inventory_snapshot() if has_aha else {}
+            plan = build_plan(scanned, inventory, purchasing_enabled(), AttemptHistory().failures)
+            logger.info(plan.format())
+            print(plan.format())
+            return
 
-        if not rows_to_process and not redcross_rows:
+        def planned_orders():
+            inventory = None
+            for position, (order_ref, order) in enumerate(scanned, 1):
+                if inventory is None and order_ref.get("kind") == "aha":
+                    # Stock from one eCards inventory read, taken when the first AHA order arrives
+                    inventory = processor.take_inventory_snapshot()
+                run_state.update(orders_total=position)
+                yield plan_scanned(order_ref, order, inventory or {}, purchasing_enabled())
+
+        attempts = AttemptHistory()
+
+        def run_order(order_plan: OrderPlan) -> bool:
+            run_state.update(current_order=order_plan.order_id)
+            if order_plan.kind == "redcross":
+                with log_context(order_id=order_plan.order_id, stage="redcross"):
+                    success = processor.process_single_redcross_order(order_plan.order_ref)
+            else:
+                with log_context(order_id=order_plan.order_id):
+                    success = processor.process_single_row(order_plan.order_ref, order_plan.order)
+            run_state.record_order(success)
+            attempts.record(order_plan.order_id, success)
+            processor.check_browser_health()
+            return success
+
+        def run_batch(order_plans: List[OrderPlan]) -> Dict[str, bool]:
+            run_state.update(current_order=f"{len(order_plans)} ACLS/PALS orders")
+            outcomes = processor.process_acls_pals_batch(order_plans)
+            for order_plan in order_plans:
+                run_state.record_order(outcomes[order_plan.order_id])
+                attempts.record(order_plan.order_id, outcomes[order_plan.order_id])
+            processor.check_browser_health()
+            return outcomes
+
+        def release(held: List[OrderPlan]) -> List[OrderPlan]:
+            # Held orders were read during the scan; read them and the stock again before they run
+            logger.info(f"Re-reading {len(held)} held orders before running them")
+            has_aha = any(order_plan.kind == "aha" for order_plan in held)
+            inventory = processor.take_inventory_snapshot() if has_aha else {}
+            released = []
+            for order_plan in held:
+                order = order_plan.order
+                if order_plan.kind == "aha":
+                    try:
+                        order = fetch_order(session, order_plan.order_ref, processor.available_courses) or order
+                    except Exception as e:
+                        logger.warning(f"Could not re-read order {order_plan.order_id}, using the scanned details: {e}")
+                released.append(plan_scanned(order_plan.order_ref, order, inventory, purchasing_enabled()))
+            return released
+
+        # Cheap orders run as they are scanned; all-ACLS/PALS orders follow as one batch, and
+        # purchases, failing and blocked orders wait for the end
+        try:
+            plan = execute_plan(prioritize(planned_orders(), attempts.failures, release), run_order, run_batch)
+        finally:
+            attempts.save()
+        if not plan.orders:
             logger.info("No orders found to process")
             return
+        record_demand(order_plan.order for order_plan in plan.orders if order_plan.order and not order_plan.order.skip)
 
-        logger.info(f"Found {len(rows_to_process)} orders to process")
-        aha_successful_rows, aha_failed_rows = 0, 0
-        redcross_successful_rows, redcross_failed_rows = 0, 0
-
-        for i, index in enumerate(rows_to_process, 1):
-            try:
-                logger.info(f"[{i}/{len(rows_to_process)}] Processing order {index}")
-                if processor.process_single_row(index):
-                    aha_successful_rows += 1
-                else:
-                    aha_failed_rows += 1
-            except Exception as e:
-                logger.error(f"Unexpected error processing row {index}: {e}")
-                aha_failed_rows += 1
-                continue
-
-        # Process Red Cross orders
-        logger.info("Processing Red Cross orders...")
-        if redcross_rows:
-            logger.info(f"Found {len(redcross_rows)} Red Cross orders to process")
-            for i, index in enumerate(redcross_rows, 1):
-                try:
-                    logger.info(f"[{i}/{len(redcross_rows)}] Processing Red Cross order {index}")
-                    if processor.process_single_redcross_order(index):
-                        redcross_successful_rows += 1
-                    else:
-                        redcross_failed_rows += 1
-                except Exception as e:
-                    logger.error(f"Unexpected error processing Red Cross row {index}: {e}")
-                    redcross_failed_rows += 1
-                    continue
-        else:
-            logger.info("No Red Cross orders found to process")
+        # Off the critical path: top stock up to forecast targets once this cycle's orders are done
+        global replenishment_required, last_replenishment_check
+        if time.time() - last_replenishment_check >= REPLENISH_INTERVAL_SECONDS:
+            last_replenishment_check = time.time()
+            replenishment_required = processor.replenish_stock()
 
+        aha_orders = [order for order in plan.orders if order.kind == "aha"]
+        redcross_orders = [order for order in plan.orders if order.kind == "redcross"]
         print(f"\n{'='*50}\nPROCESSING SUMMARY\n{'='*50}")
-        print(f"AHA orders processed: {len(rows_to_process)}")
-        print(f"Successful: {aha_successful_rows}")
-        print(f"Failed: {aha_failed_rows}\n{'-'*50}")
-        print(f"Red Cross orders processed: {len(redcross_rows)}")
-        print(f"Successful: {redcross_successful_rows}")
-        print(f"Failed: {redcross_failed_rows}\n{'='*50}")
+        print(f"AHA orders processed: {len(aha_orders)}")
+        print(f"Successful: {sum(1 for order in aha_orders if order.success)}")
+        print(f"Failed: {sum(1 for order in aha_orders if not order.success)}\n{'-'*50}")
+        print(f"Red Cross orders processed: {len(redcross_orders)}")
+        print(f"Successful: {sum(1 for order in redcross_orders if order.success)}")
+        print(f"Failed: {sum(1 for order in redcross_orders if not order.success)}\n{'='*50}")
+        print(plan.format_report())
+        logger.info(plan.format_report())
+        logger.info(locators.locator_report())
 
     except Exception as e:
         logger.error(f"Critical error in main process: {e}")
     finally:
+        if session is not None:
+            session.close()
         processor.cleanup()
 
 
+def process_order(order_id: str, headless: bool = HEADLESS) -> bool:
+    """Process a single order by ID outside the schedule, e.g. to retry one that failed."""
+    processor = OrderProcessor(headless)
+    if not processor.initialize():
+        logger.error("Failed to initialize order processor")
+        return False
+
+    try:
+        if not processor.journal.owned:
+            logger.error(f"Another automation process is running; not processing order {order_id}")
+            return False
+
+        scanned = scan_orders(processor)
+        if scanned is None:
+            return False
+        rows_to_process, redcross_rows = scanned
+
+        for order_ref in rows_to_process:
+            if order_ref.get("order_id") == order_id:
+                with log_context(order_id=order_id):
+                    return processor.process_single_row(order_ref)
+        for order_ref in redcross_rows:
+            if order_ref.get("order_id") == order_id:
+                with log_context(order_id=order_id, stage="redcross"):
+                    return processor.process_single_redcross_order(order_ref)
+
+        logger.error(f"Order {order_id} is not in the TC Product Orders waiting to be processed")
+        return False
+    except Exception as e:
+        logger.error(f"Critical error processing order {order_id}: {e}")
+        return False
+    finally:
+        processor.cleanup()
+
+
+def run_cycle(headless: bool = HEADLESS):
+    """One scheduled run: process all orders, then email the purchase and replenishment summaries."""
+    global last_message, last_replenishment_message
+
+    main(headless=headless)
+    message = generate_stock_summary(quantity_required)
+    if message != last_message:
+        # notifier = DiscordNotifier(os.getenv("DISCORD_WEBHOOK_URL"))
+        send_email(message)
+        last_message = message
+
+    replenishment_message = generate_stock_summary(replenishment_required, "Forecast replenishment: stock below target levels")
+    if replenishment_message and replenishment_message != last_replenishment_message:
+        send_email(replenishment_message)
+        last_replenishment_message = replenishment_message
+
+
 SCHEDULE_INTERVAL_SECONDS = 15 * 60  # 15 minutes
 
-def run_every_15_minutes():
+def run_every_15_minutes(headless: bool = HEADLESS):
     logger.info("Starting scheduled automation (runs every 15 minutes)")
     run_count = 0
 
     while True:
         run_count += 1
         start = time.time()
+        run_now_event.clear()
+        run_state.start_cycle(run_count)
         print(f"\n{'='*50}")
         print(f"SCHEDULED RUN #{run_count}")
         print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*50}")
 
         try:
-            main()  # Existing processing logic
-            message = generate_stock_summary(quantity_required)
-            global last_message
-            if message != last_message:
-                # notifier = DiscordNotifier(os.getenv("DISCORD_WEBHOOK_URL"))
-                send_email(message)
-                last_message = message
+            run_cycle(headless)
         except Exception as e:
             logger.error(f"Unhandled error in scheduled run #{run_count}: {e}")
 
         elapsed = time.time() - start
         remaining = SCHEDULE_INTERVAL_SECONDS - elapsed
+        run_state.update(current_order=None)
 
         if remaining > 0:
             next_run_time = datetime.fromtimestamp(time.time() + remaining).strftime('%Y-%m-%d %H:%M:%S')
             logger.info(f"Run #{run_count} completed in {elapsed:.1f}s")
             logger.info(f"Next run scheduled for: {next_run_time}")
             logger.info(f"Waiting {remaining/60:.1f} minutes...")
-            time.sleep(remaining)
+            run_state.update(status="sleeping", next_run_at=datetime.fromtimestamp(time.time() + remaining).isoformat(timespec="seconds"))
+            # The control API can cut the wait short with POST /run
+            if run_now_event.wait(remaining):
+                logger.info("Immediate run requested, starting next run now")
         else:
             logger.info(f"Run #{run_count} took {elapsed:.1f}s (>= 15 minutes). Starting next run immediately.")
 
 
-if __name__ == "__main__":
+def run_daemon(show_toggle_ui: bool = True, headless: bool = HEADLESS):
+    """Serve the control API and run the 15-minute schedule until interrupted."""
     # Show the purchasing toggle UI only on the very first run of this process
-    show_ui()
+    if show_toggle_ui:
+        show_ui()
+    start_control_api()
     try:
-        run_every_15_minutes()
+        run_every_15_minutes(headless)
     except KeyboardInterrupt:
         print("\nApplication interrupted by user (Ctrl+C)")
         logger.info("Application interrupted by user")
@@ -765,3 +1075,12 @@ if __name__ == "__main__":
     finally:
         print("Application shutting down...")
         logger.info("Application shutdown complete")
+
+
+if __name__ == "__main__":
+    start_application()
+    if "--dry-run" in sys.argv:
+        main(dry_run=True)
+        sys.exit(0)
+
+    run_daemon(show_toggle_ui="--no-ui" not in sys.argv)
@@ -0,0 +1,134 @@
+import re
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+from courses import AvailableCourses, is_acls_pals_course
+from reference_data import get_reference_data
+
+UNKNOWN_TRAINING_SITE = "Unknown Training Site"
+
+
+@dataclass(frozen=True)
+class OrderLine:
+    """One product line of an order, classified once when the order is parsed."""
+    __slots__ = ("quantity", "sku", "course_name", "acls_pals", "individual", "redcross", "available")
+
+    quantity: int
+    sku: str
+    course_name: str
+    acls_pals: bool  # assigned to the Admin Instructor, bypassing inventory
+    individual: bool  # individual course; False for bundles
+    redcross: bool
+    available: bool  # the SKU is in the course catalog
+
+    @property
+    def skip_reason(self) -> str:
+        """Why the whole order must be skipped because of this line, or "" if it can be processed."""
+        if self.redcross:
+            return f"Red Cross course: {self.course_name}"
+        if not self.available:
+            return f"Course {self.sku} is not available for eCard generation"
+        return ""
+
+
+@dataclass(frozen=True)
+class Order:
+    """An Enrollware TC product order: who and which training site once, then its product lines."""
+    __slots__ = ("order_id", "name", "training_site", "site_code", "site_name", "ts_site", "lines",
+                 "has_acls_pals", "all_acls_pals", "skip_reason")
+
+    order_id: str
+    name: str
+    training_site: str  # as shown on the order, e.g. "TS70414 Amazing Grace CPR"
+    site_code: str
+    site_name: str  # name from the reference data, or UNKNOWN_TRAINING_SITE
+    ts_site: bool  # a TS-coded site: individual courses go to the site instead of an instructor
+    lines: Tuple[OrderLine, ...]
+    has_acls_pals: bool
+    all_acls_pals: bool
+    skip_reason: str  # the first line's reason to skip the order, or ""
+
+    @property
+    def skip(self) -> bool:
+        return bool(self.skip_reason)
+
+    def line_number(self, line: OrderLine) -> int:
+        """1-based position of this line object; equal lines (same SKU and quantity) stay distinct."""
+        return next(number for number, candidate in enumerate(self.lines, 1) if candidate is line)
+
+    def failure_row(self, line: OrderLine) -> Dict[str, Any]:
+        """A line in the failed_orders.csv layout (training_site, name, quantity, product_code, course_name)."""
+        return {
+            "training_site": self.training_site,
+            "name": self.name,
+            "quantity": line.quantity,
+            "product_code": line.sku,
+            "course_name": line.course_name,
+        }
+
+
+def parse_order_link(href: str, row_key: str = "") -> Dict[str, Any]:
+    """Build an order reference from the order list link and the row's first column."""
+    detail_url = href if href.lower().startswith("http") else ""
+    match = re.search(r"[?&]id=(\d+)", href, re.IGNORECASE)
+    return {
+        "order_id": match.group(1) if match else row_key,
+        "detail_url": detail_url,
+        "href_id": bool(match),
+        "row_key": row_key,
+    }
+
+
+def list_row_kind(product_text: str, status_text: str) -> Optional[str]:
+    """Kind of an order list row from its product (2nd) and status (4th) columns:
+    "redcross", "aha", or None when the order is complete or cancelled."""
+    status_text = status_text.lower()
+    if "complete" in status_text or "cancelled" in status_text:
+        return None
+    product_text = product_text.lower()
+    return "redcross" if "redcross" in product_text or "red cross" in product_text else "aha"
+
+
+def _quantity(text: str) -> int:
+    text = text.replace(",", "").strip()
+    return int(text) if text.isdigit() else 0
+
+
+def parse_line(quantity: str, sku: str, course_name: str, courses: AvailableCourses) -> OrderLine:
+    lowered = course_name.lower()
+    return OrderLine(
+        quantity=_quantity(quantity),
+        sku=sku,
+        course_name=course_name,
+        acls_pals=is_acls_pals_course(course_name),
+        individual=courses.is_individual_course(sku),
+        redcross="red cross" in lowered or "redcross" in lowered,
+        available=courses.is_course_available(sku),
+    )
+
+
+def parse_order(order_id: str, training_site: str, name: str, rows: Iterable[Tuple[str, str, str]],
+                courses: AvailableCourses) -> Optional[Order]:
+    """Build an Order from the detail page fields and its (quantity, SKU, course name) rows.
+
+    Rows missing any of the three are dropped; returns None if no product line remains.
+    """
+    lines = tuple(parse_line(quantity, sku, course_name, courses)
+                  for quantity, sku, course_name in rows if quantity and sku and course_name)
+    if not lines:
+        return None
+
+    training_site = training_site.strip()
+    site_code = training_site.split(" ")[0].strip()
+    return Order(
+        order_id=str(order_id or ""),
+        name=name,
+        training_site=training_site,
+        site_code=site_code,
+        site_name=get_reference_data()["sites"].get(site_code, UNKNOWN_TRAINING_SITE),
+        ts_site=training_site.startswith("TS"),
+        lines=lines,
+        has_acls_pals=any(line.acls_pals for line in lines),
+        all_acls_pals=all(line.acls_pals for line in lines),
+        skip_reason=next((line.skip_reason for line in lines if line.skip_reason), ""),
+    )
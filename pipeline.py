@@ -0,0 +1,93 @@
+import os
+import queue
+import logging
+import threading
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from orders import Order
+
+logger = logging.getLogger(__name__)
+
+# How many scanned orders may wait, already fetched and parsed, for the browser
+PIPELINE_DEPTH = int(os.getenv("PIPELINE_DEPTH", 3))
+
+ScannedOrder = Tuple[Dict[str, Any], Optional[Order]]
+_DONE = object()
+
+
+class OrderStream:
+    """Scan and parse orders on a background thread while the browser processes earlier ones.
+
+    The scanner walks refs() (order references in list order) and fetches each AHA order's
+    details over HTTP, handing (order_ref, Order or None) pairs to the consumer through a
+    bounded queue. When the browser falls behind the queue fills up and the scanner waits, so
+    at most `depth` orders are read ahead and none goes stale for long. Red Cross orders and
+    orders that could not be fetched are passed on with None and read in the browser.
+    """
+
+    def __init__(self, refs: Callable[[], Iterable[Dict[str, Any]]],
+                 fetch: Callable[[Dict[str, Any]], Optional[Order]], depth: int = PIPELINE_DEPTH):
+        self.refs = refs
+        self.fetch = fetch
+        self.discovered = 0
+        self.error: Optional[Exception] = None
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="order-scanner", daemon=True)
+
+    def start(self) -> "OrderStream":
+        self._thread.start()
+        return self
+
+    def __enter__(self) -> "OrderStream":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self) -> Iterator[ScannedOrder]:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def close(self):
+        """Stop scanning; unblocks the scanner if it is waiting on a full queue."""
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(timeout=0.1)
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            for order_ref in self.refs():
+                if self._stop.is_set():
+                    break
+                self.discovered += 1
+                order = None
+                if order_ref.get("kind", "aha") == "aha":
+                    try:
+                        order = self.fetch(order_ref)
+                    except Exception as e:
+                        logger.warning(f"Could not fetch order {order_ref.get('order_id')}, "
+                                       f"it will be read in the browser: {e}")
+                if not self._put((order_ref, order)):
+                    break
+        except Exception as e:
+            self.error = e
+            logger.warning(f"Order scan stopped after {self.discovered} orders: {e}")
+        finally:
+            self._put(_DONE)
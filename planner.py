@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import logging
+
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from orders import Order
+
+logger = logging.getLogger(__name__)
+
+# Orders expected to take longer than this are run after the cheap ones
+DEFER_ABOVE_SECONDS = int(os.getenv("DEFER_ABOVE_SECONDS", 120))
+# Each earlier failure of an order counts its estimate again
+RETRY_PENALTY = 1.0
+ATTEMPTS_PATH = "order_attempts.json"
+# Failures of orders not seen again for this long are forgotten
+ATTEMPTS_RETENTION_DAYS = 14
+
+# Rough wall-clock cost of each browser action, derived from the fixed waits in Utils/functions.py
+ESTIMATED_SECONDS = {
+    "open_order": 5,
+    "read_order": 15,
+    "ecards_session": 12,
+    "assign_instructor": 20,
+    "assign_training_site": 18,
+    "assign_training_site_switch_account": 60,
+    "assign_admin": 25,
+    "purchase": 90,
+    "complete": 8,
+    "redcross": 25,
+    "skip": 0,
+}
+
+# Training site whose assignment logs out and back in with a second AHA account
+ACCOUNT_SWITCH_SITE = 'Code Blue CPR Services, LLC'
+
+# Orders made up only of ACLS/PALS lines: all assigned to the Admin Instructor back to back in one
+# eCards session, then completed in Enrollware
+ACLS_PALS_LANE = "acls_pals"
+
+
+@dataclass
+class PlannedAction:
+    kind: str
+    estimate: float
+    sku: str = ""
+    quantity: int = 0
+    detail: str = ""
+
+    def describe(self) -> str:
+        parts = [self.kind]
+        if self.sku:
+            parts.append(f"{self.quantity} x {self.sku}")
+        if self.detail:
+            parts.append(self.detail)
+        return " ".join(parts)
+
+
+@dataclass
+class OrderPlan:
+    order_ref: Dict[str, Any]
+    order: Optional[Order]
+    actions: List[PlannedAction] = field(default_factory=list)
+    kind: str = "aha"
+    lane: str = ""  # batched with the other orders of the same lane when set
+    actual: Optional[float] = None
+    success: Optional[bool] = None
+
+    @property
+    def order_id(self) -> str:
+        return self.order_ref.get("order_id", "")
+
+    @property
+    def estimate(self) -> float:
+        return sum(action.estimate for action in self.actions)
+
+    @property
+    def needs_purchase(self) -> bool:
+        return any(action.kind == "purchase" for action in self.actions)
+
+    @property
+    def switches_account(self) -> bool:
+        return any(action.kind == "assign_training_site_switch_account" for action in self.actions)
+
+    @property
+    def is_skip(self) -> bool:
+        return bool(self.actions) and all(action.kind == "skip" for action in self.actions)
+
+    @property
+    def is_blocked(self) -> bool:
+        return any(action.kind == "blocked" for action in self.actions)
+
+    @property
+    def purchase_skus(self) -> Tuple[str, ...]:
+        return tuple(sorted(action.sku for action in self.actions if action.kind == "purchase"))
+
+
+@dataclass
+class RunPlan:
+    orders: List[OrderPlan] = field(default_factory=list)
+
+    @property
+    def estimate(self) -> float:
+        return sum(order.estimate for order in self.orders)
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for order in self.orders:
+            for action in order.actions:
+                counts[action.kind] = counts.get(action.kind, 0) + 1
+        return counts
+
+    def format(self) -> str:
+        lines = [f"RUN PLAN: {len(self.orders)} orders, estimated {self.estimate / 60:.1f} minutes"]
+        for position, order in enumerate(self.orders, 1):
+            kind = f"{order.kind}/{order.lane}" if order.lane else order.kind
+            lines.append(f"{position:>3}. [{kind}] order {order.order_id} (~{order.estimate:.0f}s)")
+            for action in order.actions:
+                lines.append(f"       - {action.describe()}")
+        totals = ", ".join(f"{kind}: {count}" for kind, count in sorted(self.counts().items()))
+        lines.append(f"Totals: {totals}")
+        return "\n".join(lines)
+
+    def format_report(self) -> str:
+        executed = [order for order in self.orders if order.actual is not None]
+        estimated = sum(order.estimate for order in executed)
+        actual = sum(order.actual for order in executed)
+        lines = [f"PLAN vs ACTUAL: {len(executed)} orders, estimated {estimated:.0f}s, actual {actual:.0f}s"]
+        for order in executed:
+            status = "ok" if order.success else "failed"
+            lines.append(f"  order {order.order_id}: estimated {order.estimate:.0f}s, actual {order.actual:.0f}s ({status})")
+        return "\n".join(lines)
+
+
+def plan_order(order_ref: Dict[str, Any], order: Optional[Order], inventory: Dict[str, int],
+               purchasing: bool) -> OrderPlan:
+    """Turn one order's product lines into the browser actions it will need.
+
+    Inventory is consumed as orders are planned so later orders see the remaining stock.
+    """
+    plan = OrderPlan(order_ref, order)
+    if order is None:
+        # Not prefetched: the executor reads the order from the browser and decides then
+        plan.actions.append(PlannedAction("read_order", ESTIMATED_SECONDS["read_order"], detail="details unknown until opened"))
+        return plan
+
+    if order.skip:
+        plan.actions.append(PlannedAction("skip", ESTIMATED_SECONDS["skip"], detail=order.skip_reason))
+        return plan
+
+    plan.actions.append(PlannedAction("open_order", ESTIMATED_SECONDS["open_order"]))
+    if order.all_acls_pals:
+        # The lane's single eCards session is shared by all its orders
+        plan.lane = ACLS_PALS_LANE
+    else:
+        plan.actions.append(PlannedAction("ecards_session", ESTIMATED_SECONDS["ecards_session"]))
+
+    for line in order.lines:
+        sku, quantity = line.sku, line.quantity
+
+        if line.acls_pals:
+            plan.actions.append(PlannedAction("assign_admin", ESTIMATED_SECONDS["assign_admin"], sku, quantity))
+            continue
+
+        available = inventory.get(sku, 0)
+        if available < quantity:
+            shortfall = quantity - available
+            if purchasing:
+                plan.actions.append(PlannedAction("purchase", ESTIMATED_SECONDS["purchase"], sku, shortfall, "Shop CPR"))
+                available += shortfall
+            else:
+                plan.actions.append(PlannedAction("blocked", 0, sku, shortfall, "out of stock, purchasing disabled"))
+                return plan
+        inventory[sku] = available - quantity
+
+        if line.individual and not order.ts_site:
+            plan.actions.append(PlannedAction("assign_instructor", ESTIMATED_SECONDS["assign_instructor"], sku, quantity))
+        else:
+            kind = "assign_training_site_switch_account" if order.site_name == ACCOUNT_SWITCH_SITE else "assign_training_site"
+            plan.actions.append(PlannedAction(kind, ESTIMATED_SECONDS[kind], sku, quantity, order.site_name))
+
+    plan.actions.append(PlannedAction("complete", ESTIMATED_SECONDS["complete"]))
+    return plan
+
+
+def plan_scanned(order_ref: Dict[str, Any], order: Optional[Order], inventory: Dict[str, int],
+                 purchasing: bool) -> OrderPlan:
+    """Plan one order as it comes off the scanner (Red Cross orders get their single action)."""
+    if order_ref.get("kind") == "redcross":
+        return OrderPlan(order_ref, None, [PlannedAction("redcross", ESTIMATED_SECONDS["redcross"])], kind="redcross")
+    return plan_order(order_ref, order, inventory, purchasing)
+
+
+class AttemptHistory:
+    """Failed attempts per order across cycles, so an order that keeps failing stops holding up the rest.
+
+    A success clears the order's record. Kept in a small JSON file; losing it only resets priorities.
+    """
+
+    def __init__(self, path: str = ATTEMPTS_PATH):
+        self.path = path
+        self._failures: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._failures = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable attempt history {path}: {e}")
+
+    def failures(self, order_id: str) -> int:
+        return self._failures.get(order_id, {}).get("failures", 0)
+
+    def record(self, order_id: str, success: bool):
+        if success:
+            self._failures.pop(order_id, None)
+            return
+        entry = self._failures.setdefault(order_id, {"failures": 0})
+        entry["failures"] += 1
+        entry["last_failure"] = datetime.now().isoformat(timespec="seconds")
+
+    def save(self):
+        cutoff = (datetime.now() - timedelta(days=ATTEMPTS_RETENTION_DAYS)).isoformat(timespec="seconds")
+        self._failures = {order_id: entry for order_id, entry in self._failures.items()
+                          if entry.get("last_failure", "") >= cutoff}
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._failures, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def order_cost(order: OrderPlan, failures: int = 0) -> float:
+    """Expected seconds of browser time, weighted up by how often the order failed before."""
+    return order.estimate * (1 + RETRY_PENALTY * failures)
+
+
+def is_deferred(order: OrderPlan, failures: int = 0) -> bool:
+    """Whether the order should wait until the cheap orders of the cycle are done."""
+    return (order.is_blocked or failures > 0 or order.needs_purchase
+            or order_cost(order, failures) > DEFER_ABOVE_SECONDS)
+
+
+def priority(order: OrderPlan, failures: int = 0) -> Tuple:
+    """Sort key, cheapest first: orders served from stock by expected cost, then purchases
+    grouped by SKU so Shop CPR checkouts run back to back, then orders that failed before,
+    and last those blocked on stock (they can only fail again)."""
+    purchase_skus = order.purchase_skus
+    return (order.is_blocked, failures > 0, bool(purchase_skus), purchase_skus, order_cost(order, failures))
+
+
+def prioritize(order_plans: Iterable[OrderPlan],
+               failures: Callable[[str], int] = lambda order_id: 0,
+               release: Optional[Callable[[List[OrderPlan]], List[OrderPlan]]] = None) -> Iterator[OrderPlan]:
+    """Pass cheap orders on as they are planned and hold back the expensive ones until the rest
+    of the cycle is done, then run those in priority() order.
+
+    Orders in a lane are collected and passed on together once the scan is done, ahead of the
+    deferred ones, so execute_plan() can batch them. Held orders were read and planned at scan
+    time; release, if given, gets them all once the scan is done and returns them re-read and
+    re-planned, so they run on current details and stock.
+    """
+    held: List[OrderPlan] = []
+    for order in order_plans:
+        order_failures = failures(order.order_id)
+        if not is_deferred(order, order_failures):
+            if order.lane:
+                held.append(order)
+            else:
+                yield order
+            continue
+        logger.info(f"Deferring order {order.order_id} to the end of the cycle "
+                    f"(~{order_cost(order, order_failures):.0f}s, {order_failures} earlier failures)")
+        held.append(order)
+
+    if held and release:
+        held = release(held)
+
+    lanes: Dict[str, List[OrderPlan]] = {}
+    deferred = []
+    for order in held:
+        order_failures = failures(order.order_id)
+        if order.lane and not is_deferred(order, order_failures):
+            lanes.setdefault(order.lane, []).append(order)
+        else:
+            deferred.append((priority(order, order_failures), len(deferred), order))
+
+    for lane, orders in lanes.items():
+        logger.info(f"Running {len(orders)} orders in the {lane} lane")
+        yield from orders
+
+    deferred.sort(key=lambda item: item[:2])
+    if deferred:
+        logger.info(f"Running {len(deferred)} deferred orders")
+    for _, _, order in deferred:
+        yield order
+
+
+def build_plan(scanned: Iterable[Tuple[Dict[str, Any], Optional[Order]]], inventory: Dict[str, int],
+               purchasing: bool, failures: Callable[[str], int] = lambda order_id: 0) -> RunPlan:
+    """Build the whole cycle's action plan up front (for --dry-run) from scanned orders and an inventory snapshot.
+
+    Orders are listed in the order a run takes them (see prioritize()): cheap orders in list
+    order, then the deferred purchasing, failing and blocked ones.
+    """
+    inventory = dict(inventory)
+    plans = (plan_scanned(order_ref, order, inventory, purchasing) for order_ref, order in scanned)
+    return RunPlan(list(prioritize(plans, failures)))
+
+
+def execute_plan(order_plans: Iterable[OrderPlan], run_order: Callable[[OrderPlan], bool],
+                 run_batch: Optional[Callable[[List[OrderPlan]], Dict[str, bool]]] = None) -> RunPlan:
+    """Run each planned order through run_order as it arrives, recording actual duration and outcome.
+
+    With run_batch, consecutive orders of the same lane are run together by run_batch, which
+    returns the outcome per order ID; the batch's duration is shared evenly between its orders.
+    """
+    plan = RunPlan()
+    batch: List[OrderPlan] = []
+
+    def flush():
+        if not batch:
+            return
+        logger.info(f"Executing {len(batch)} orders of the {batch[0].lane} lane as one batch")
+        started = time.monotonic()
+        try:
+            outcomes = run_batch(list(batch))
+        except Exception as e:
+            logger.error(f"Unexpected error processing the {batch[0].lane} lane: {e}")
+            outcomes = {}
+        share = (time.monotonic() - started) / len(batch)
+        for order in batch:
+            order.success = bool(outcomes.get(order.order_id))
+            order.actual = share
+        batch.clear()
+
+    for position, order in enumerate(order_plans, 1):
+        plan.orders.append(order)
+        if run_batch and order.lane:
+            if batch and batch[0].lane != order.lane:
+                flush()
+            batch.append(order)
+            continue
+        flush()
+        logger.info(f"[{position}] Executing plan for order {order.order_id} (~{order.estimate:.0f}s)")
+        started = time.monotonic()
+        try:
+            order.success = bool(run_order(order))
+        except Exception as e:
+            logger.error(f"Unexpected error processing order {order.order_id}: {e}")
+            order.success = False
+        order.actual = time.monotonic() - started
+    flush()
+    return plan
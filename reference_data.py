@@ -0,0 +1,205 @@
+import os
+import re
+import csv
+import json
+import hashlib
+import logging
+import argparse
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COURSES_CSV = os.path.join("data", "courses.csv")
+TRAINING_SITES_CSV = os.path.join("data", "training_sites.csv")
+BUNDLE_PATH = os.path.join("data", "reference_data.json")
+# Bump when the bundle layout changes; a bundle of another schema is rejected
+SCHEMA_VERSION = 1
+
+SKU_PATTERN = re.compile(r"^\d{2}-\d{4}$")
+SITE_CODE_PATTERN = re.compile(r"^TS\d+$")
+INDIVIDUAL_VALUES = {"true", "1", "yes", "individual"}
+BUNDLE_VALUES = {"false", "0", "no", "bundle"}
+
+_bundle: Optional[Dict[str, Any]] = None
+
+
+class ReferenceDataError(ValueError):
+    """The course or training site data is malformed; the automation must not run on it."""
+
+
+def _read_csv(path: str, required: List[str]) -> Tuple[List[Dict[str, str]], bytes]:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        raise ReferenceDataError(f"Cannot read {path}: {e}") from e
+
+    reader = csv.DictReader(raw.decode("utf-8-sig").splitlines())
+    headers = [header.strip() for header in reader.fieldnames or []]
+    missing = [header for header in required if header not in headers]
+    if missing:
+        raise ReferenceDataError(f"{path} is missing columns {missing} (found {[h for h in headers if h]})")
+    # Spreadsheet exports pad rows with empty columns; only named columns are kept
+    rows = [{(key or "").strip(): (value or "").strip() for key, value in row.items() if key and key.strip()}
+            for row in reader]
+    return rows, raw
+
+
+def _compile_courses(rows: List[Dict[str, str]], path: str, errors: List[str], warnings: List[str]) -> Dict[str, Dict[str, Any]]:
+    courses = {}
+    for row_num, row in enumerate(rows, start=2):  # row 1 is the header
+        if not any(row.values()):
+            continue
+        sku, name, category = row.get("SKU", ""), row.get("Name", ""), row.get("Category", "").lower()
+        if not SKU_PATTERN.match(sku):
+            errors.append(f"{path} row {row_num}: invalid SKU '{sku}'")
+            continue
+        if not name:
+            errors.append(f"{path} row {row_num}: SKU {sku} has no eCard name")
+            continue
+        if category in INDIVIDUAL_VALUES:
+            individual = True
+        elif category in BUNDLE_VALUES:
+            individual = False
+        else:
+            errors.append(f"{path} row {row_num}: invalid Category '{category}' for SKU {sku}")
+            continue
+
+        if sku in courses and courses[sku]["name"] != name:
+            # Same as the old CSV loader: the last row wins
+            warnings.append(f"{path} row {row_num}: SKU {sku} listed again as '{name}' "
+                            f"(was '{courses[sku]['name']}')")
+        courses[sku] = {
+            "name": name,
+            "individual": individual,
+            # Shop CPR search: the optional "ShopCPR Search" column, else the SKU itself.
+            # Bundles are added to the cart from their product details page.
+            "shopcpr": {"query": row.get("ShopCPR Search") or sku, "via_details": not individual},
+        }
+    return courses
+
+
+def _compile_sites(rows: List[Dict[str, str]], path: str, errors: List[str], warnings: List[str]) -> Dict[str, str]:
+    sites = {}
+    for row_num, row in enumerate(rows, start=2):
+        if not any(row.values()):
+            continue
+        code, name = row.get("Code", ""), row.get("Text", "")
+        if not SITE_CODE_PATTERN.match(code):
+            errors.append(f"{path} row {row_num}: invalid site code '{code}'")
+            continue
+        if not name:
+            errors.append(f"{path} row {row_num}: site {code} has no name")
+            continue
+        if code in sites and sites[code] != name:
+            warnings.append(f"{path} row {row_num}: site {code} listed again as '{name}'")
+        sites[code] = name
+    return sites
+
+
+def compile_bundle(courses_csv: str = COURSES_CSV, sites_csv: str = TRAINING_SITES_CSV) -> Dict[str, Any]:
+    """Validate both CSVs and build the bundle. Raises ReferenceDataError listing every bad row."""
+    course_rows, course_bytes = _read_csv(courses_csv, ["SKU", "Name", "Category"])
+    site_rows, site_bytes = _read_csv(sites_csv, ["Code", "Text"])
+
+    errors: List[str] = []
+    warnings: List[str] = []
+    courses = _compile_courses(course_rows, courses_csv, errors, warnings)
+    sites = _compile_sites(site_rows, sites_csv, errors, warnings)
+    if not courses:
+        errors.append(f"{courses_csv} contains no courses")
+    if errors:
+        raise ReferenceDataError("Reference data is invalid:\n  " + "\n  ".join(errors))
+    for warning in warnings:
+        logger.warning(warning)
+
+    digest = hashlib.sha256(course_bytes + b"\0" + site_bytes).hexdigest()
+    return {
+        "schema": SCHEMA_VERSION,
+        "version": digest[:12],
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "courses": courses,
+        "sites": sites,
+    }
+
+
+def write_bundle(bundle: Dict[str, Any], path: str = BUNDLE_PATH):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def validate_bundle(bundle: Any) -> Dict[str, Any]:
+    """Check the bundle's shape (cheap: no per-row work beyond type checks). Raises ReferenceDataError."""
+    schema = bundle.get("schema") if isinstance(bundle, dict) else None
+    if schema != SCHEMA_VERSION:
+        raise ReferenceDataError(f"Reference data bundle has schema {schema}, expected {SCHEMA_VERSION}; "
+                                 f"rebuild it with: python reference_data.py")
+    courses, sites = bundle.get("courses"), bundle.get("sites")
+    if not isinstance(courses, dict) or not courses or not isinstance(sites, dict):
+        raise ReferenceDataError("Reference data bundle has no course or site tables")
+    for sku, course in courses.items():
+        if not (isinstance(course, dict) and isinstance(course.get("name"), str)
+                and isinstance(course.get("individual"), bool) and isinstance(course.get("shopcpr"), dict)):
+            raise ReferenceDataError(f"Reference data bundle entry for SKU {sku} is malformed")
+    return bundle
+
+
+def _is_stale(path: str, sources: List[str]) -> bool:
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return True
+    return any(os.path.exists(source) and os.path.getmtime(source) > built for source in sources)
+
+
+def load_bundle(path: str = BUNDLE_PATH, rebuild_stale: bool = True) -> Dict[str, Any]:
+    """Load the compiled bundle in one read, rebuilding it first if a CSV changed since it was built."""
+    if rebuild_stale and _is_stale(path, [COURSES_CSV, TRAINING_SITES_CSV]):
+        bundle = compile_bundle()
+        write_bundle(bundle, path)
+        logger.info(f"Rebuilt reference data bundle {bundle['version']} "
+                    f"({len(bundle['courses'])} courses, {len(bundle['sites'])} training sites)")
+        return bundle
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            bundle = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ReferenceDataError(f"Cannot read reference data bundle {path}: {e}") from e
+    return validate_bundle(bundle)
+
+
+def get_reference_data(reload: bool = False) -> Dict[str, Any]:
+    """The process-wide bundle, loaded on first use."""
+    global _bundle
+    if _bundle is None or reload:
+        _bundle = load_bundle()
+        logger.info(f"Reference data {_bundle['version']}: {len(_bundle['courses'])} courses, "
+                    f"{len(_bundle['sites'])} training sites")
+    return _bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile data/courses.csv and data/training_sites.csv "
+                                                 "into the reference data bundle.")
+    parser.add_argument("--check", action="store_true", help="validate the CSVs without writing the bundle")
+    parser.add_argument("--output", default=BUNDLE_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+
+    try:
+        bundle = compile_bundle()
+    except ReferenceDataError as e:
+        parser.exit(1, f"{e}\n")
+    if not args.check:
+        write_bundle(bundle, args.output)
+    print(f"Reference data {bundle['version']}: {len(bundle['courses'])} courses, "
+          f"{len(bundle['sites'])} training sites{'' if args.check else ' -> ' + args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-import tkinter as tk
 import os
+import threading
 
 STATE_FILE = "purchasing_toggle_state.txt"
 
@@ -13,15 +13,52 @@ def load_toggle_state():
             return f.read().strip() == "enabled"
     return True  # Default to enabled if no file
 
+def _state_mtime():
+    try:
+        return os.path.getmtime(STATE_FILE)
+    except OSError:
+        return None
+
 _purchasing_enabled = load_toggle_state()
+_state_file_mtime = _state_mtime()
+_state_lock = threading.Lock()
+
+def _reload_if_changed():
+    # Caller holds _state_lock
+    global _purchasing_enabled, _state_file_mtime
+    mtime = _state_mtime()
+    if mtime != _state_file_mtime:
+        _purchasing_enabled = load_toggle_state()
+        _state_file_mtime = mtime
 
 def purchasing_enabled():
+    """Current purchasing mode; picks up edits made to the state file while running."""
+    if _state_mtime() != _state_file_mtime:
+        with _state_lock:
+            _reload_if_changed()
     return _purchasing_enabled
 
+def set_purchasing_enabled(enabled: bool):
+    """Change purchasing at runtime (UI toggle or control API) and persist it."""
+    global _purchasing_enabled, _state_file_mtime
+    with _state_lock:
+        _purchasing_enabled = bool(enabled)
+        save_toggle_state(_purchasing_enabled)
+        _state_file_mtime = _state_mtime()
+
+def toggle_purchasing() -> bool:
+    """Flip purchasing and persist it, reading and writing under one lock so concurrent
+    toggles (UI and control API) cannot lose an update. Returns the new state."""
+    global _purchasing_enabled, _state_file_mtime
+    with _state_lock:
+        _reload_if_changed()
+        _purchasing_enabled = not _purchasing_enabled
+        save_toggle_state(_purchasing_enabled)
+        _state_file_mtime = _state_mtime()
+        return _purchasing_enabled
+
 def _toggle():
-    global _purchasing_enabled
-    _purchasing_enabled = not _purchasing_enabled
-    save_toggle_state(_purchasing_enabled)
+    toggle_purchasing()
     update_toggle_display()
 
 def update_toggle_display():
@@ -36,6 +73,8 @@ def update_toggle_display():
 
 def show_ui():
     global toggle_frame, toggle_circle, status_label
+    # Imported here so headless deployments never need Tk
+    import tkinter as tk
     root = tk.Tk()
     root.title("Purchasing Toggle")
     root.geometry("300x150")